@@ -1,3 +1,9 @@
 
 # from brigks.builder import Builder
-from brigks.guide import Guide
\ No newline at end of file
+try:
+	import maya.cmds
+except ImportError:
+	# Outside of Maya, only the modules not using it can be imported, ie: the client of brigks.utils.service
+	pass
+else:
+	from brigks.guide import Guide
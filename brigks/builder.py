@@ -9,7 +9,8 @@ from maya import cmds
 
 import naming
 import config
-from utils import create, script
+from utils import create, script, graph, modifier, index, precompute, cache, context, spatial, pool
+from utils.profiler import Profiler
 
 HIERARCHY_XML_PATH = os.path.join(os.path.dirname(__file__),"hierarchy.xml")
 
@@ -34,6 +35,7 @@ class Builder():
 		self._settings = copy.deepcopy(guide.settings())
 		self._settings["systems"] = {}
 		self._nodes = {}
+		self._profiler = Profiler(enabled=False)
 		
 		# Search if a model for the rig has already been built
 		# The model is connected to the guide using the "model" attributes
@@ -109,7 +111,7 @@ class Builder():
 	# ----------------------------------------------------------------------------------
 	# BUILD / DELETE
 	# ----------------------------------------------------------------------------------
-	def build(self, systemGuides):
+	def build(self, systemGuides, smart=False, profile=None, fast=None):
 		'''Main method to build the rig.
 
 		This is the method find the systems already built and loops over the system to build. 
@@ -117,52 +119,138 @@ class Builder():
 
 		Args:
 			systemGuides (list of SystemGuide): The system to be built
+			smart (bool): True to only rebuild the systems whose guide data changed since the last build
+			profile (str||None): Path of a json or csv file to write the build profile to. None to not profile
+			fast (bool||None): True to build without undo, refresh and evaluation manager. None to use the guide fastBuild setting
+		'''
+		if fast is None:
+			fast = self.guide.settings("fastBuild")
+
+		self._profiler = Profiler(enabled=profile is not None)
+		self._profiler.start()
+		try:
+			with context.fastEdit(enabled=fast):
+				if not self._model:
+					self._model = self._addModel()
+
+				# Index the nodes of the rig and of the guide once, instead of searching the scene for each object
+				# and the attach meshes once, instead of querying them for each connection
+				with index.indexing(self._model, self.guide.model()), spatial.indexing(), pool.pooling():
+					self._build(systemGuides, smart)
+		finally:
+			self._profiler.stop()
+
+		if profile is not None:
+			self._profiler.write(profile)
+			logging.info("PROFILE {path}".format(path=profile))
+
+	def profiler(self):
+		'''Returns the Profiler of the last build
+
+		Returns:
+			Profiler
+		'''
+		return self._profiler
+
+	def _build(self, systemGuides, smart=False):
+		'''Private Method. Build the given systems, see build()
 		'''
 		self._initCore()
 
 		start = dt.now()
 		superstart = dt.now()
 
-		# Init all the systems that needs to be built
-		self._systems = self._getExistingSystems()
-		toBuild = self._getSystemBuilders(systemGuides)
-		# Init the systems that needs to be connected
-		toConnect, toCreateAttr = self._getSystemsToConnect(toBuild)
-		self._systems.update(toBuild)
-		self._systems.update(toConnect)
-		self._systems.update(toCreateAttr)
+		with self._profiler.record("Init Systems"):
+			# Init all the systems once, they are shared by all the steps of the build
+			self._systems = {}
+			self._getExistingSystems()
+			toBuild = self._getSystemBuilders(systemGuides)
+			if smart:
+				toBuild = self._getChangedSystems(toBuild)
+			# Init the systems that needs to be connected
+			toConnect, toCreateAttr = self._getSystemsToConnect(toBuild)
+			if self.guide.settings("foldBuffers"):
+				# The buffers of the systems already built have been folded, they are rebuilt instead of reconnected
+				while toConnect:
+					toBuild.update(toConnect)
+					toConnect, toCreateAttr = self._getSystemsToConnect(toBuild)
+			# Sort the systems so they are processed after the systems they connect to
+			order = self._sortSystems()
 
 		logging.info("INIT SYSTEMS {time}".format(time=dt.now() - start))
 		start = dt.now()
 
+		# Read the results of the systems already built with the same inputs
+		buildCache = self._getCache()
+		cacheKeys = {}
+		if buildCache is not None:
+			with self._profiler.record("Read Cache"):
+				for key, builder in toBuild.iteritems():
+					cacheKeys[key] = builder.cacheKey()
+					data = buildCache.get(cacheKeys[key])
+					if data is not None:
+						builder.loadCache(data)
+
+		# Compute the transformations of the systems in parallel, before the objects are created
+		workers = self.guide.settings("precomputeWorkers")
+		if workers:
+			with self._profiler.record("Precompute"):
+				results = precompute.compute(toBuild.values(), workers)
+			for key, data in results.iteritems():
+				toBuild[key].precomputed = data
+			logging.info("PRECOMPUTE {time}".format(time=dt.now() - start))
+			start = dt.now()
+
 		# Pre Script
-		script.execute(self.guide.settings("preScriptPath"), self.guide.settings("preScriptValue"),
-			 dict(cmds=cmds, this_model=self._model, this_guide=self.guide))
+		with self._profiler.record("Pre Script"):
+			script.execute(self.guide.settings("preScriptPath"), self.guide.settings("preScriptValue"),
+				 dict(cmds=cmds, this_model=self._model, this_guide=self.guide))
 		logging.info("PRE SCRIPT {time}".format(time=dt.now() - start))
 		start = dt.now()
 
 		# Getting all the building steps and then build
 		if self._systems:
-			self._buildSystems(toBuild, toConnect, toCreateAttr)
+			self._buildSystems(order, toBuild, toConnect, toCreateAttr)
+
+		if self.guide.settings("foldBuffers"):
+			with self._profiler.record("Fold Buffers"):
+				for key, builder in toBuild.iteritems():
+					# The reconciled objects are kept with their buffer
+					if builder.declarative and self.guide.settings("reconcileObjects"):
+						continue
+					builder.foldBuffers()
+			logging.info("FOLD BUFFERS {time}".format(time=dt.now() - start))
+			start = dt.now()
 
 		# Saving the keys of the systems that have been built
 		for key, builder in toBuild.iteritems():
 			builder.setSettings(attributes=builder.attributeNames)
-			self._settings["systems"][key] = builder.settings()
+			self._settings["systems"][key] = dict(builder.settings(), hash=builder.dataHash(), nodes=builder.nodeHashes)
 		self._commit()
 
+		if buildCache is not None:
+			with self._profiler.record("Write Cache"):
+				for key, builder in toBuild.iteritems():
+					data = builder.cacheData()
+					if data:
+						buildCache.set(cacheKeys[key], data)
+				buildCache.evict()
+			stats = buildCache.stats()
+			logging.info("CACHE {h} hits, {m} misses".format(h=stats["hits"], m=stats["misses"]))
+
 		hide = []
 		if self.guide.settings("hideRig"):
-			hide += [x for x in cmds.ls("{}_*".format(config.USE_RIG), type="transform", long=True) if x.startswith("|"+self._model)]
-			hide += [x for x in cmds.ls("{}_*".format(config.USE_BFR), type="transform", long=True) if x.startswith("|"+self._model)]
+			hide += index.find("{}_*".format(config.USE_RIG), self._model)
+			hide += index.find("{}_*".format(config.USE_BFR), self._model)
 		if self.guide.settings("hideJoints"):
-			hide += [x for x in cmds.ls("{}_*".format(config.USE_JNT), type="transform", long=True) if x.startswith("|"+self._model)]
+			hide += index.find("{}_*".format(config.USE_JNT), self._model)
 		for node in hide:
 			cmds.setAttr(node+".lodVisibility", False)
 
 		# Post Script
-		script.execute(self.guide.settings("postScriptPath"), self.guide.settings("postScriptValue"),
-			 dict(cmds=cmds, this_model=self._model, this_guide=self.guide))
+		with self._profiler.record("Post Script"):
+			script.execute(self.guide.settings("postScriptPath"), self.guide.settings("postScriptValue"),
+				 dict(cmds=cmds, this_model=self._model, this_guide=self.guide))
 		logging.info("POST SCRIPT {time}".format(time=dt.now() - start))
 
 		logging.info("DONE {time}".format(time=dt.now() - superstart))
@@ -182,19 +270,32 @@ class Builder():
 		# Filter out the systems that have not been built
 		systemGuides = [g for g in systemGuides if g.key() in self.builtSettings()]
 
-		self._initCore()
-		toDelete = self._getSystemBuilders(systemGuides)
-		for key, system in toDelete.iteritems():
-			system.delete()	
+		with index.indexing(self._model, self.guide.model()):
+			self._initCore()
+			self._systems = {}
+			toDelete = self._getSystemBuilders(systemGuides)
+			for key, system in toDelete.iteritems():
+				system.delete()	
 
-			# Removing system from meta data
-			self.builtSettings().pop(key)
+				# Removing system from meta data
+				self.builtSettings().pop(key)
 
 		self._commit()
 
 	# ----------------------------------------------------------------------------------
 	# BUILD HELPERS
 	# ----------------------------------------------------------------------------------
+	def _getCache(self):
+		'''Private Method. Returns the cache of the systems build results, None if the guide doesn't use one
+
+		Returns:
+			BuildCache||None
+		'''
+		path = self.guide.settings("cachePath")
+		if not path:
+			return
+		return cache.BuildCache(path, self.guide.settings("cacheSize"))
+
 	def _initCore(self):
 		'''Private Method. Create the core hierachy of the rig
 		
@@ -222,10 +323,8 @@ class Builder():
 		name = naming.getObjectName(use, "M", "Root", part)
 
 		# Check if the node was already created
-		for node in cmds.ls(name, type="transform", long=True):
-			if node.startswith(self._model):
-				break
-		else:
+		node = index.get(name, self._model)
+		if node is None:
 			options = dict(
 				icon=xmlNode.get("icon", None))	
 			for x in ["size", "po", "ro", "so", "color"]:
@@ -252,17 +351,16 @@ class Builder():
 		builders = {}
 		# Looping over all the systems that have already been built 
 		for key, settings in self.builtSettings().iteritems():
+			if key in builders:
+				continue
+
+			# Split systems have been built from the X system
 			if settings["split"]:
 				key = key[:-1] + "X"
-				systemGuide = self.guide.findSystem(key)
-				systemGuide.loadMarkers(force=True)
-				leftSystem, rightSystem = systemGuide.split()
-				builders[leftSystem.key()] = leftSystem.builder(self)
-				builders[rightSystem.key()] = rightSystem.builder(self)
-			else:
-				systemGuide = self.guide.findSystem(key)
-				systemGuide.loadMarkers(force=True)
-				builders[key] = systemGuide.builder(self)
+			systemGuide = self.guide.findSystem(key)
+			if systemGuide is None:
+				continue
+			builders.update(self._initSystemBuilders(systemGuide))
 		return builders
 
 	def _getSystemBuilders(self, systemGuides):
@@ -273,19 +371,70 @@ class Builder():
 		'''
 		builders = {}
 		for systemGuide in systemGuides:
-			systemGuide.loadMarkers(force=True)
+			builders.update(self._initSystemBuilders(systemGuide))
+		return builders
+
+	def _initSystemBuilders(self, systemGuide):
+		'''Private Method. Initialize the SystemBuilder of a given SystemGuide
 
-			# If marker is X, we create a Left and Right builder
-			if systemGuide.settings()["location"] == "X":
+		The SystemBuilders are stored in self._systems and shared for the whole build,
+		so the markers are loaded and the X systems are split only once per system.
+
+		Args:
+			systemGuide (SystemGuide): The SystemGuide to initialize the builder from
+
+		Returns:
+			dictionary: The SystemBuilder in a dictionary with the system key for index 
+		'''
+		# If marker is X, we create a Left and Right builder
+		if systemGuide.settings("location") == "X":
+			name = systemGuide.settings("name")
+			keys = [naming.getSystemKey(location, name) for location in "LR"]
+		else:
+			keys = [systemGuide.key()]
+
+		if not all(key in self._systems for key in keys):
+			systemGuide.loadMarkers(force=True)
+			if systemGuide.settings("location") == "X":
 				leftSystem, rightSystem = systemGuide.split()
-				builders[leftSystem.key()] = leftSystem.builder(self)
-				builders[rightSystem.key()] = rightSystem.builder(self)
+				self._systems[leftSystem.key()] = leftSystem.builder(self)
+				self._systems[rightSystem.key()] = rightSystem.builder(self)
 			else:
-				builders[systemGuide.key()] = systemGuide.builder(self)
-		return builders
+				self._systems[systemGuide.key()] = systemGuide.builder(self)
+
+		return {key:self._systems[key] for key in keys}
+
+	def _getChangedSystems(self, toBuild):
+		'''Private Method. Filter the SystemBuilder whose guide data changed since the last build
+
+		A system needs to be rebuilt if it has never been built or if its hash doesn't match the one stored
+		when it was last built. Systems connected to a changed system are rebuilt as well.
+
+		Args:
+			toBuild (dictionary): The SystemBuilder in a dictionary with the system key for index 
+
+		Returns:
+			dictionary: The SystemBuilder in a dictionary with the system key for index 
+		'''
+		changed = {}
+		for key, builder in toBuild.iteritems():
+			if key not in self.builtSettings():
+				changed[key] = builder
+			elif self.builtSettings(key).get("hash") != builder.dataHash():
+				changed[key] = builder
+
+		# Systems connected to the changed systems
+		dependencies = self._getDependencies(toBuild)
+		for key in graph.dependents(dependencies, changed.keys()):
+			changed[key] = toBuild[key]
+
+		logging.info("SMART BUILD {count}/{total} systems changed".format(count=len(changed), total=len(toBuild)))
+		return changed
 
 	def _getSystemsToConnect(self, toBuild):
-		'''Private Method. Initialize the SystemBuilder for systems already built that need to be reconnected
+		'''Private Method. Get the SystemBuilder for systems already built that need to be reconnected
+
+		The SystemBuilders are taken from the ones initialized by _getExistingSystems.
 
 		Returns:
 			tupple of dictionary: First the systems to connect, then the system to createAttr
@@ -293,39 +442,60 @@ class Builder():
 		toConnect = {}
 		toCreateAttr = {}
 		# Looping over all the systems that have already been built 
-		for key, settings in self.builtSettings().iteritems():
-			if key in toBuild:
+		for key in self.builtSettings().keys():
+			if key in toBuild or key not in self._systems:
 				continue
-			
-			# TODO, We're Re-initializing systems that have already been initialized, we can do bette r than that
 
-			if settings["split"]:
-				key = key[:-1] + "X"
-				systemGuide = self.guide.findSystem(key)
-				systemGuide.loadMarkers(force=True)
-				leftSystem, rightSystem = systemGuide.split()
-				toConnect[leftSystem.key()] = leftSystem.builder(self)
-				toConnect[rightSystem.key()] = rightSystem.builder(self)
-			else:
-				systemGuide = self.guide.findSystem(key)
-				systemGuide.loadMarkers(force=True)
-
-				# Check if any of those systems are connected to something we're rebuilding
-				for cnx in systemGuide.connections().values():
-					if key not in toCreateAttr and cnx.type() == "uiHost":
-						for otherKey in cnx.getTargetSystems():
-							if otherKey in toBuild:
-								toCreateAttr[key] = systemGuide.builder(self)
-								break
-					elif key not in toConnect:
-						for otherKey in cnx.getTargetSystems():
-							if otherKey in toBuild:
-								toConnect[key] = systemGuide.builder(self)
-								break
+			# Check if any of those systems are connected to something we're rebuilding
+			builder = self._systems[key]
+			for cnx in builder.guide.connections().values():
+				if key not in toCreateAttr and cnx.type() == "uiHost":
+					for otherKey in cnx.getTargetSystems():
+						if otherKey in toBuild:
+							toCreateAttr[key] = builder
+							break
+				elif key not in toConnect:
+					for otherKey in cnx.getTargetSystems():
+						if otherKey in toBuild:
+							toConnect[key] = builder
+							break
 
 		return toConnect, toCreateAttr
 
-	def _buildSystems(self, toBuild, toConnect, toCreateAttr):
+	def _getDependencies(self, builders=None):
+		'''Private Method. Returns the dependency graph of the systems
+
+		A system depends on all the systems targeted by its connections, including the uiHosts.
+
+		Args:
+			builders (None||dictionary): The SystemBuilder to get the dependencies of. None for all the systems
+
+		Returns:
+			dictionary of set: For each system key, the keys of the systems it depends on
+		'''
+		builders = self._systems if builders is None else builders
+		dependencies = {}
+		for key, builder in builders.iteritems():
+			dependencies[key] = set()
+			for cnx in builder.guide.connections().values():
+				dependencies[key].update(cnx.getTargetSystems())
+		return dependencies
+
+	def _sortSystems(self):
+		'''Private Method. Sort the systems so they are processed after the systems they depend on
+
+		Systems that are part of a dependency cycle are reported and processed last.
+
+		Returns:
+			list of str: The sorted system keys
+		'''
+		order, cycles = graph.topologicalSort(self._getDependencies())
+		if cycles:
+			msg = "Connection cycle found between systems: {keys}"
+			logging.warning(msg.format(keys=", ".join(cycles)))
+		return order + cycles
+
+	def _buildSystems(self, order, toBuild, toConnect, toCreateAttr):
 		'''Private Method. Loop over the system to be built and connect and run each building step
 
 		To guarantee that objects are available, the build process is happening in steps.
@@ -336,21 +506,35 @@ class Builder():
 			Create Operators
 			Connect System
 			Post Script
+
+		For each step, the systems are processed in the given order and skipped if they have nothing to do.
+		If the guide batchEdits setting is True, the connections and values set by the compounds
+		are recorded and applied at once, before the next Maya command or at the end of each step.
+		The edits applied that way can't be undone (See brigks.utils.modifier).
+		The MeshMultiAttach nodes are shared by all the systems of the build (See brigks.utils.pool).
+		The nodes created by each system are registered to it (See SystemBuilder.members).
 		'''
 		steps = self._systems.values()[0].steps.keys()
 		for step in steps:
 			start = dt.now()
 			
 			if step == "Connect System":
-				builders = toBuild.values() + toConnect.values()
+				keys = set(toBuild.keys() + toConnect.keys())
 			elif step == "Create Attributes":
-				builders = toBuild.values() + toCreateAttr.values()
+				keys = set(toBuild.keys() + toCreateAttr.keys())
 			else:
-				builders = toBuild.values()
-
-			for builder in builders:
-				logging.debug("{step}: {key} ({type})".format(key=builder.key(), step=step, type=builder.type()))
-				builder.steps[step]()
+				keys = set(toBuild.keys())
+
+			with modifier.batch(enabled=self.guide.settings("batchEdits")):
+				for key in order:
+					if key not in keys:
+						continue
+					builder = self._systems[key]
+					if builder.skipStep(step):
+						continue
+					logging.debug("{step}: {key} ({type})".format(key=builder.key(), step=step, type=builder.type()))
+					with self._profiler.record(step, key, builder.type()), builder.recordMembers():
+						builder.steps[step]()
 			
 			logging.info("{step}: Completed in {time}".format(step=step, time=dt.now() - start))
 
@@ -402,10 +586,6 @@ class Builder():
 		Returns:
 			str: The transform node
 		'''
-		existing = [x for x in cmds.ls(name, long=True) if x.startswith(self._model)]
-		if existing:
-			node = existing[0]
-
 		node = create.transform(name, parent, color=color)
 		if icon:
 			if size is None:
@@ -7,6 +7,7 @@ from collections import OrderedDict
 
 
 DATA_ATTRIBUTE = "_userProps"
+SYSTEMS_DATA_ATTRIBUTE = "_systemProps"
 BINDPOSE_ATTRIBUTE = "bindMatrix"
 
 USE_ORG = "Org"
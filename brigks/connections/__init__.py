@@ -1,5 +1,5 @@
-
-
+# The classes are resolved once per (type, module)
+_classes = {}
 
 def getSystemConnectionClass(connectionType):
 	return _getClass(connectionType, "connection", "SystemConnection")
@@ -8,11 +8,16 @@ def getConnectionWidgetClass(connectionType):
 	return _getClass(connectionType, "widget", "ConnectionWidget")
 
 def _getClass(connectionType, moduleName, classSuffix):
+	cacheKey = (connectionType, moduleName)
+	if cacheKey in _classes:
+		return _classes[cacheKey]
+
 	# Get Module
-	moduleName = ".".join(["brigks", "connections", connectionType, moduleName])	
+	moduleName = ".".join(["brigks", "connections", connectionType, moduleName])
 	module = __import__(moduleName, globals(), locals(), ["*"], -1)
 
 	className = connectionType[0].upper()+connectionType[1:]+classSuffix
 	Class = getattr(module, className)
 
-	return Class
\ No newline at end of file
+	_classes[cacheKey] = Class
+	return Class
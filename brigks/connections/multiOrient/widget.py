@@ -43,7 +43,7 @@ class MultiOrientConnectionWidget(SystemConnectionWidget):
 		self._connection.setSettings(
 			definitions=definitions, 
 			default=self.uiDefaultCBOX.currentIndex())
-		self._system.guide().commit()
+		self._system.commit()
 
 	def addParent(self):
 		pass
@@ -51,7 +51,7 @@ class MultiOrientConnectionWidget(SystemConnectionWidget):
 	def removeParent(self):
 		index = self.uiParentsTREE.currentIndex()
 		self._connection.settings("definitions").pop(index)
-		self._system.guide().commit()
+		self._system.commit()
 
 		default = self._connection.settings("default")
 		if default == index:
@@ -15,6 +15,7 @@ class MultiParentSystemConnection(SystemConnection):
 			raise RuntimeError("Cannot execture a connection without a Builder")
 
 		masters = []
+		surfaces = []
 		for definition in self._settings["definitions"]:
 			cnxType = definition["type"]
 
@@ -34,14 +35,21 @@ class MultiParentSystemConnection(SystemConnection):
 				kwargs.update(definition)
 				master = getParentFromMesh(**kwargs)
 			elif cnxType == "nurbs":
+				# Attached all at once, once the other masters are found
 				kwargs = dict(
 					position=cmds.xform(child, q=True, translation=True, worldSpace=True)
 					)
 				kwargs.update(definition)
-				master = self.getParentFromSurface(**kwargs)
+				surfaces.append((len(masters), kwargs))
+				master = None
 
-			if master:
-				masters.append(master)
+			masters.append(master)
+
+		if surfaces:
+			attaches = self.getParentsFromSurface([kwargs for i, kwargs in surfaces])
+			for (i, kwargs), attach in zip(surfaces, attaches):
+				masters[i] = attach
+		masters = [master for master in masters if master]
 
 		if len(masters) <= 1:
 			return
@@ -62,21 +70,19 @@ class MultiParentSystemConnection(SystemConnection):
 	def getTargetSystems(self):
 		keys = []
 		for definition in self._settings["definitions"]:
-			if "key" in definition["key"]:
+			if definition.get("key") and definition["key"] != "self":
 				keys.append(definition["key"])
 		return keys
 
 	def split(self, location):
 		definitions = []
 		for definition in self._settings["definitions"]:
-			if "key" in definition["key"]:
+			if definition.get("key") and definition["key"] != "self":
 				key = definition["key"]
 
 				part, otherLocation = key.split("_")
-				if otherLocation != "X":
-					continue
-
-				definition["key"] = "{part}_{location}".format(part=part, location=location)
+				if otherLocation == "X":
+					definition["key"] = "{part}_{location}".format(part=part, location=location)
 
 			definitions.append(definition)
 		self._settings["definitions"] = definitions
@@ -45,7 +45,7 @@ class MultiParentConnectionWidget(SystemConnectionWidget):
 		self._connection.setSettings(
 			definitions=definitions, 
 			default=self.uiDefaultCBOX.currentIndex())
-		self._system.guide().commit()
+		self._system.commit()
 
 	def addParent(self):
 		pass
@@ -53,7 +53,7 @@ class MultiParentConnectionWidget(SystemConnectionWidget):
 	def removeParent(self):
 		index = self.uiParentsTREE.currentIndex()
 		self._connection.settings("definitions").pop(index)
-		self._system.guide().commit()
+		self._system.commit()
 
 		default = self._connection.settings("default")
 		if default == index:
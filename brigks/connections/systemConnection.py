@@ -5,6 +5,7 @@ import logging
 from maya import cmds
 
 from brigks import config
+from brigks.utils import index, membership
 
 class SystemConnection(object):
 
@@ -68,34 +69,56 @@ class SystemConnection(object):
 
 		attachName = self.getObjectName(use=config.USE_RIG, part="MeshAttach")
 		attach = cmds.createNode("transform", name=attachName)
-		cmds.parent(attach, parent)
+		attach = cmds.parent(attach, parent)[0]
+		index.register(attach)
+		membership.register(attach)
 		cmds.xform(attach, translation=position, worldSpace=True)
 
 		self.addCompound("meshMultiAttach", "MeshCnx", attach, mesh, componentType, componentIndex, useOrientation)
 		return attach
 
 	def getParentFromSurface(self, surface, useClosest, u, v, key, slot, position):
-		parent = self.getParentFromSlot(key, slot)
-
-		if not cmds.objExists(surface):
-			return parent
-
-		if useClosest:
-			u, v = None, None
-
-		attachName = self.getObjectName(use=config.USE_RIG, part="MeshAttach")
-		attach = cmds.createNode("transform", name=attachName)
-		cmds.parent(attach, parent)
-		cmds.xform(attach, translation=position, worldSpace=True)
-
-		self.addCompound("surfaceAttach", "SrfCnx", attach, surface, u, v)
-		return attach
+		return self.getParentsFromSurface([dict(surface=surface, useClosest=useClosest, u=u, v=v, key=key, slot=slot, position=position)])[0]
+
+	def getParentsFromSurface(self, definitions):
+		'''Returns an attach for each surface definition
+
+		The attaches to the same surface are driven by a single surfaceAttaches compound.
+
+		Args:
+			definitions (list of dict): The surface, useClosest, u, v, key, slot and position of each attach
+
+		Returns:
+			list of str
+		'''
+		parents = []
+		bySurface = {}
+		for definition in definitions:
+			parent = self.getParentFromSlot(definition["key"], definition["slot"])
+			surface = definition["surface"]
+			if not cmds.objExists(surface):
+				parents.append(parent)
+				continue
+
+			attachName = self.getObjectName(use=config.USE_RIG, part="MeshAttach")
+			attach = cmds.createNode("transform", name=attachName)
+			attach = cmds.parent(attach, parent)[0]
+			index.register(attach)
+			membership.register(attach)
+			cmds.xform(attach, translation=definition["position"], worldSpace=True)
+			parents.append(attach)
+
+			uv = None if definition["useClosest"] else (definition["u"], definition["v"])
+			bySurface.setdefault(surface, ([], []))
+			bySurface[surface][0].append(attach)
+			bySurface[surface][1].append(uv)
+
+		for surface, (attaches, uvs) in bySurface.iteritems():
+			self.addCompound("surfaceAttaches", "SrfCnx", attaches, surface, uvs=uvs)
+		return parents
 
 	def getParentFromName(self, name):
-		model = self._builder.model()
-		for name in [cmds.ls(name, long=True)]:
-			if name.startswith(model):
-				return name
+		return index.get(name, self._builder.model())
 
 	# ----------------------------------------------------------------------------------
 	# CONNECTION HELPERS
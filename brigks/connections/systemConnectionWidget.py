@@ -94,4 +94,4 @@ class SystemConnectionWidget(QWidget):
 
 		if self._connection is not None:
 			self._connection.setSettings(**settings)
-			self._system.guide().commit()
+			self._system.commit()
@@ -12,7 +12,7 @@ def findGuides():
 	guides = []
 	for guideAttr in cmds.ls("*.guide", long=True):
 		guide, attr = guideAttr.split(".")
-		guides.append(Guide(model=guide))
+		guides.append(Guide(model=guide, lazy=True))
 	return guides
 
 def addLayer(parent):
@@ -60,6 +60,7 @@ class GuideSettingsWidget(QWidget):
 		self.uiStopAfter.setCurrentIndex(STEPS.index(self.settings("stopAfter")))
 		self.uiHideRig.setChecked(self.settings("hideRig"))
 		self.uiHideJoints.setChecked(self.settings("hideJoints"))
+		self.uiFastBuild.setChecked(self.settings("fastBuild"))
 
 		# TODO : This is slowing down the loading of the ui.
 		self.uiGroupVisibilityWDG.setGuide(self._guide)
@@ -84,6 +85,7 @@ class GuideSettingsWidget(QWidget):
 		self.uiStopAfter.currentIndexChanged.connect(self.saveDebugSettings)
 		self.uiHideRig.clicked.connect(self.saveDebugSettings)
 		self.uiHideJoints.clicked.connect(self.saveDebugSettings)
+		self.uiFastBuild.clicked.connect(self.saveDebugSettings)
 
 		# Groups
 		self.uiAddGroupBTN.clicked.connect(self.addGroup)
@@ -146,7 +148,8 @@ class GuideSettingsWidget(QWidget):
 		self._guide.setSettings(
 			stopAfter=self.uiStopAfter.currentText(),
 			hideRig=self.uiHideRig.isChecked(),
-			hideJoints=self.uiHideJoints.isChecked()
+			hideJoints=self.uiHideJoints.isChecked(),
+			fastBuild=self.uiFastBuild.isChecked()
 			)
 		self.commit()
 
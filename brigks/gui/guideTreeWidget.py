@@ -69,7 +69,8 @@ class GuideTreeWidget(QTreeWidget):
 		if isinstance(item, LayerTreeWidgetItem):
 			item.object().settings()["expanded"] = item.isExpanded()
 
-		self._guide.commit()
+		# Only the layers settings have changed
+		self._guide.commit(systems=[])
 
 	#------------------------------------------------------
 	# SELECTED ITEMS
@@ -104,7 +104,7 @@ class SystemSettingsWidget(QWidget):
 		self.uiNameLINE.blockSignals(block)
 
 	def commit(self):
-		self._system.guide().commit()
+		self._system.commit()
 
 	# ----------------------------------------------------------------------------------
 	# SYSTEMS
@@ -1,5 +1,7 @@
 from maya import cmds
 import json
+import zlib
+import base64
 import xml.etree.cElementTree as etree
 import getpass
 import datetime
@@ -7,9 +9,10 @@ import logging
 
 import naming
 from layer import Layer
+from systems import getSystemGuideClass
 from builder import Builder
 from utils import create
-from config import DATA_ATTRIBUTE
+from config import DATA_ATTRIBUTE, SYSTEMS_DATA_ATTRIBUTE
 from utils.xmldom import indent
 
 
@@ -39,22 +42,40 @@ class Guide():
 	colorLIk (3 float): 0-1 RGB Default color for Fk controllers on the Left side 
 	groups (list of str): List of groups sotroed in the guide 
 	stopAfter (str): Debug option to stop the build after a specific step
+	fastBuild (bool): Build without undo queue, viewport refresh and evaluation manager. The undo queue is flushed and the build can't be undone
 	hideRig (bool): Debug option to prevent hiding the rig object
 	hideJoints (bool): Debug option to prevent hiding the joints
+	batchEdits (bool): Apply the connections and values of the compounds at once, before the next Maya command or at the end of each build step. The batched edits can't be undone
+	compressData (bool): Compress the systems data stored on the guide model
+	planObjects (bool): Create the objects of the declarative systems at once from a plan (See SystemBuilder.planObjects)
+	reconcileObjects (bool): Only update the objects of the declarative systems that changed (See SystemBuilder.reconcileObjects)
+	precomputeWorkers (int): Number of processes computing the systems transformations before the build. 0 to compute them during the build
+	cachePath (str): Folder of the cache of the systems build results. Empty to not use a cache
+	cacheSize (float): Maximum size of the cache in MB, the least recently used results are evicted first
+	offsetParentMatrix (bool): Constraint the whole transform of the objects thru their offsetParentMatrix, without decomposeMatrix (Maya 2020+)
+	foldBuffers (bool): Fold the buffers into the offsetParentMatrix of their controller after the build (See SystemBuilder.foldBuffers)
 	'''
 
-	def __init__(self, model=None):
+	def __init__(self, model=None, lazy=False):
 		'''Guide Init
 
 		Args:
 			model (str||None): Pass a model to initialize existing guide. None to create a new one
+			lazy (bool): True to only load the systems of a Layer when they are first accessed
 
 		Returns:
 			Guide
 		'''
 		self._model = None
+		self._lazy = lazy
 		self._builder = None
 		self._layers = []
+		self._layerIndex = {} # Name: Top Layer
+		self._systemIndex = {} # Key: SystemGuide, or its Layer if it hasn't been loaded yet
+		self._nameCounters = {} # Key: Next suffix to try, see findNextSystemName()
+		self._chunks = {} # SystemGuide: Index of its data chunk
+		self._chunkData = {} # Index: Data last saved in the chunk
+		self._chunkIndices = set() # Indices of all the chunks stored on the model
 		self._settings = dict(version=[1,0,0],
 							preScriptPath="",
 							preScriptValue=scriptDefaultValue,
@@ -65,8 +86,18 @@ class Guide():
 							colorLFk=[.6,.2,.2],  colorLIk=[1,.35,.35], 
 							groups=dict(),
 							stopAfter="Post Script",
+							fastBuild=False,
 							hideRig=True,
-							hideJoints=True
+							hideJoints=True,
+							batchEdits=False,
+							compressData=False,
+							planObjects=False,
+							reconcileObjects=False,
+							precomputeWorkers=0,
+							cachePath="",
+							cacheSize=500,
+							offsetParentMatrix=False,
+							foldBuffers=False
 							)
 
 		# If we pass a model, then we load the settings
@@ -78,6 +109,7 @@ class Guide():
 			cmds.addAttr(self._model, longName="model", attributeType="bool")
 			cmds.addAttr(self._model, longName="guide", attributeType="bool")
 			cmds.addAttr(self._model, longName=DATA_ATTRIBUTE, dataType="string")
+			cmds.addAttr(self._model, longName=SYSTEMS_DATA_ATTRIBUTE, dataType="string", multi=True)
 
 	def _load(self, model):
 		'''Initialize the guide from given model
@@ -93,11 +125,31 @@ class Guide():
 		data = json.loads(cmds.getAttr(model+"."+DATA_ATTRIBUTE))
 		self._settings.update(data["settings"])
 
+		# The systems data chunks are only read when their Layer is loaded
+		if not cmds.ls(model+"."+SYSTEMS_DATA_ATTRIBUTE):
+			cmds.addAttr(self._model, longName=SYSTEMS_DATA_ATTRIBUTE, dataType="string", multi=True)
+		attr = self._model+"."+SYSTEMS_DATA_ATTRIBUTE
+		self._chunkIndices = set(cmds.getAttr(attr, multiIndices=True) or [])
+
 		# Load Layers
-		for data in data["layers"]:
-			layer = Layer(self, data["name"], data)
+		for layerData in data["layers"]:
+			layer = Layer(self, layerData["name"], layerData)
 			self._layers.append(layer)
 
+		if not self._lazy:
+			self.hydrate()
+
+	def hydrate(self):
+		'''Load the systems of all the Layers that haven't been loaded yet
+
+		This is only needed for Guides initialized with lazy=True.
+		'''
+		layers = list(self._layers)
+		while layers:
+			layer = layers.pop(0)
+			layer._hydrate()
+			layers.extend(layer._layers)
+
 	def builder(self):
 		'''Create or return the Builder from this guide
 
@@ -110,16 +162,19 @@ class Guide():
 			self._builder = Builder(self)
 		return self._builder
 
-	def build(self, systemGuides=None):
+	def build(self, systemGuides=None, smart=False, profile=None, fast=None):
 		'''Build the rig from specified system guides
 
 		Args:
 			systemGuides (list of SystemGuide): SystemGuide to be built
+			smart (bool): True to only rebuild the systems whose guide data changed since the last build
+			profile (str||None): Path of a json or csv file to write the build profile to. None to not profile
+			fast (bool||None): True to build without undo, refresh and evaluation manager. None to use the fastBuild setting
 		'''
 		if systemGuides is None:
 			systemGuides = self._getAllSystems()
 
-		self.builder().build(systemGuides)
+		self.builder().build(systemGuides, smart=smart, profile=profile, fast=fast)
 
 	def delete(self, systemGuides=None, deleteGuide=False):
 		'''Delete specified systems
@@ -140,19 +195,90 @@ class Guide():
 
 			self.commit()
 
-	def commit(self):
+	def commit(self, systems=None):
 		'''Save the guide settings
 
-		The settigns of all the layers and system are stored as one big json string 
+		The settings of the guide and the layers are stored as one json string.
+		Each system is stored in its own chunk, and only the chunks that changed are rewritten.
+
+		Args:
+			systems (list of SystemGuide||None): The systems that have been modified. None to check them all
 		'''
+		allSystems = []
+		layers = list(self._layers)
+		while layers:
+			layer = layers.pop()
+			allSystems.extend(layer._systems)
+			layers.extend(layer._layers)
+
+		# Systems that have never been saved are always saved
+		check = systems is None
+		systems = allSystems if check else systems + [s for s in allSystems if s not in self._chunks]
+
+		# Systems
+		attr = self._model+"."+SYSTEMS_DATA_ATTRIBUTE
+		for system in systems:
+			if system not in self._chunks:
+				self._chunks[system] = self._nextChunkIndex()
+			i = self._chunks[system]
+			chunk = self._encodeChunk(system.dumps())
+			# When checking all the systems, only the ones that changed are saved
+			if check and self._chunkData.get(i) == chunk:
+				continue
+			cmds.setAttr("{a}[{i}]".format(a=attr, i=i), chunk, type="string")
+			self._chunkData[i] = chunk
+
+		# Removed systems
+		removed = set(self._chunks) - set(allSystems)
+		for system in removed:
+			i = self._chunks.pop(system)
+			self._chunkData.pop(i, None)
+			self._chunkIndices.discard(i)
+			cmds.removeMultiInstance("{a}[{i}]".format(a=attr, i=i), b=True)
+
+		# Guide and Layers
 		data = dict(settings=self._settings,
-					layers=[layer.dumps() for layer in self._layers])
+					layers=[layer.dumps(self._chunks) for layer in self._layers])
 		data = json.dumps(data)
 
 		# Saves settings to json in the model data attribute
 		cmds.setAttr(self._model+"."+DATA_ATTRIBUTE, data, type="string")
 		logging.debug("Brigks: Guide Settings Saved")
 
+	def _readChunk(self, i):
+		'''Private Method. Returns the system data stored in the given chunk
+		'''
+		if i not in self._chunkData:
+			attr = self._model+"."+SYSTEMS_DATA_ATTRIBUTE
+			self._chunkData[i] = cmds.getAttr("{a}[{i}]".format(a=attr, i=i))
+		return self._decodeChunk(self._chunkData[i])
+
+	def _nextChunkIndex(self):
+		'''Private Method. Returns the first chunk index not used by a system
+
+		Chunks of systems that haven't been loaded yet are also in use.
+		'''
+		i = 0
+		while i in self._chunkIndices:
+			i += 1
+		self._chunkIndices.add(i)
+		return i
+
+	def _encodeChunk(self, data):
+		'''Private Method. Returns the string stored for the given system data
+		'''
+		data = json.dumps(data)
+		if self._settings["compressData"]:
+			data = "zlib:" + base64.b64encode(zlib.compress(data))
+		return data
+
+	def _decodeChunk(self, chunk):
+		'''Private Method. Returns the system data from a stored string
+		'''
+		if chunk.startswith("zlib:"):
+			chunk = zlib.decompress(base64.b64decode(chunk[5:]))
+		return json.loads(chunk)
+
 	# ----------------------------------------------------------------------------------
 	# LAYERS, SYSTEMS
 	# ----------------------------------------------------------------------------------
@@ -216,10 +342,9 @@ class Guide():
 		Returns:
 			dictionary or Layer
 		'''
-		layers = {layer.name():layer for layer in self._layers}
 		if name is None:
-			return layers
-		return layers[name]
+			return dict(self._layerIndex)
+		return self._layerIndex[name]
 
 	def addLayer(self, name):
 		'''Add a top Layer to the Guide
@@ -244,6 +369,9 @@ class Guide():
 			Layer
 		'''
 		index = self._layers.index(layer)
+		if self._layerIndex.get(layer.name()) is layer:
+			self._layerIndex.pop(layer.name())
+		self._unindexLayer(layer)
 		return self._layers.pop(index)
 
 	def getLayersDepths(self, parent=None, depth=0):
@@ -283,10 +411,20 @@ class Guide():
 		Returns:
 			SystemGuide
 		'''
-		for layer in self._layers:
-			system = layer.findSystem(key)
-			if system:
-				return system
+		system = self._systemIndex.get(key)
+		if isinstance(system, Layer):
+			# The system hasn't been loaded yet
+			layer = system
+			layer._hydrate()
+			system = self._systemIndex.get(key)
+			if system is layer:
+				self._systemIndex.pop(key)
+				return
+		if system is not None and system.key() != key:
+			# The system has been renamed without going thru SystemGuide.rename()
+			self._reindexSystems()
+			system = self._systemIndex.get(key)
+		return system
 
 	def findNextSystemName(self, name, location):
 		'''Return a new unique name for a system
@@ -298,15 +436,89 @@ class Guide():
 		Returns:
 			str
 		'''
+		inputKey = naming.getSystemKey(location, name)
+		if self.findSystem(inputKey) is None:
+			return name
+
+		# Start from the last suffix found, so bulk duplicates don't test all the previous names again
 		inputName = name
-		i = 1
-		key = naming.getSystemKey(location, name)
-		while self.findSystem(key) is not None:
-			name = inputName + str(i)
-			key = naming.getSystemKey(location, name)
+		i = self._nameCounters.get(inputKey, 1)
+		name = inputName + str(i)
+		while self.findSystem(naming.getSystemKey(location, name)) is not None:
 			i += 1
+			name = inputName + str(i)
+		self._nameCounters[inputKey] = i + 1
 		return name
 
+	def _indexSystem(self, system):
+		'''Private Method. Add a system to the key index
+
+		Args:
+			system (SystemGuide): The system
+		'''
+		self._systemIndex[system.key()] = system
+
+	def _unindexSystem(self, system):
+		'''Private Method. Remove a system from the key index
+
+		Args:
+			system (SystemGuide): The system
+		'''
+		if self._systemIndex.get(system.key()) is system:
+			self._systemIndex.pop(system.key())
+
+	def _indexLayer(self, layer):
+		'''Private Method. Add the systems of a Layer and its sub Layers to the key index
+
+		Args:
+			layer (Layer): The Layer
+		'''
+		toVisit = [layer]
+		while toVisit:
+			current = toVisit.pop()
+			if current.isHydrated():
+				for system in current._systems:
+					self._indexSystem(system)
+			else:
+				for systemData in current._systemsData:
+					if "chunk" in systemData:
+						key = systemData["key"]
+					else:
+						key = naming.getSystemKey(systemData["settings"]["location"], systemData["settings"]["name"])
+					self._systemIndex[key] = current
+			toVisit.extend(current._layers)
+
+	def _unindexLayer(self, layer):
+		'''Private Method. Remove the systems of a Layer and its sub Layers from the key index
+
+		Args:
+			layer (Layer): The Layer
+		'''
+		layers = set()
+		toVisit = [layer]
+		while toVisit:
+			current = toVisit.pop()
+			layers.add(current)
+			toVisit.extend(current._layers)
+
+		for key, value in self._systemIndex.items():
+			# The systems that haven't been loaded yet are indexed with their Layer
+			owner = value if isinstance(value, Layer) else value._layer
+			if owner in layers:
+				self._systemIndex.pop(key)
+
+	def _reindexSystems(self):
+		'''Private Method. Rebuild the key index from all the Layers
+		'''
+		self._systemIndex = {}
+		layers = list(self._layers)
+		while layers:
+			layer = layers.pop()
+			layer._hydrate()
+			for system in layer._systems:
+				self._indexSystem(system)
+			layers.extend(layer._layers)
+
 	def systemIsBuilt(self, key):
 		'''Return True if given system key has been built
 
@@ -445,19 +657,59 @@ class Guide():
 		'''
 		guide = cls()
 
-		tree = etree.parse(path)
-		xmlRoot = tree.getroot()
-
-		# Load Settings
-		settings = json.loads(xmlRoot.get("settings", "{}"))
-		# Filtering old Settings
-		settings = {k:v for k,v in settings.iteritems() if k in guide._settings}
-		guide.setSettings(**settings)
-
-		# Load Layers
-		for xmlLayer in xmlRoot:
-			layer = Layer.fromXml(guide, xmlLayer)
+		for layer in guide.iterXml(path):
+			pass
 
 		guide.commit()
 
 		return guide
+
+	def iterXml(self, path):
+		'''Load an xml definition in the Guide, yielding each Layer as soon as it is loaded
+
+		The file is streamed and the elements are freed once loaded, so the memory stays flat
+		on large guides and the first Layers are usable before the whole file is read.
+		The Guide is not committed, see fromXml()
+
+		Args:
+			path (str): Input path for the xml definition 
+
+		Yields:
+			Layer: The Layers, sub Layers first
+		'''
+		parents = []
+		xmlParents = []
+		for event, xmlElement in etree.iterparse(path, events=("start", "end")):
+			if event == "start":
+				# The attributes are available from the start, the children are not
+				if xmlElement.tag == "Guide":
+					# Load Settings
+					settings = json.loads(xmlElement.get("settings", "{}"))
+					# Filtering old Settings
+					settings = {k:v for k,v in settings.iteritems() if k in self._settings}
+					self.setSettings(**settings)
+					parents.append(self)
+				elif xmlElement.tag == "Layer":
+					layer = parents[-1].addLayer(xmlElement.get("name"))
+					layer.setSettings(**json.loads(xmlElement.get("settings", "{}")))
+					parents.append(layer)
+				xmlParents.append(xmlElement)
+				continue
+
+			xmlParents.pop()
+			if xmlElement.tag == "System":
+				# The Markers and Connections are loaded with their System
+				systemType = xmlElement.get("type")
+				systemVersion = xmlElement.get("version", None)
+				SystemClass = getSystemGuideClass(systemType, systemVersion)
+				system = SystemClass.fromXml(parents[-1], xmlElement)
+				parents[-1].appendSystem(system)
+			elif xmlElement.tag == "Layer":
+				yield parents.pop()
+			else:
+				continue
+
+			# Free the loaded element
+			xmlElement.clear()
+			if xmlParents:
+				xmlParents[-1].remove(xmlElement)
@@ -39,7 +39,9 @@ class Layer():
 		self._parent = parent
 		self._name = None
 		self._layers = [] # Sub Layers
+		self._layerIndex = {} # Name: Sub Layer
 		self._systems = []
+		self._systemsData = None # Raw systems data, until the systems are loaded. See _hydrate()
 		self._settings = dict(expanded=False,
 							 color=[.875,.875,.250],
 							 useLayerColor=False,
@@ -58,25 +60,65 @@ class Layer():
 	def load(self, data):
 		'''Load the settings and systems from the data provided
 
+		The systems are only registered by key. They are loaded on first access, see _hydrate()
+
 		Args:
 			data (dict): Extra data to initialize the layer with
 		'''
 		self._settings.update(data["settings"])
 
-		# Loading Systems
-		for systemData in data["systems"]:
-			SystemClass = getSystemGuideClass(systemData["systemType"])
-			system = SystemClass.load(self, systemData)
-			self._systems.append(system)
+		# Systems
+		self._systemsData = list(data["systems"])
+		guide = self.guide()
+		for i, systemData in enumerate(self._systemsData):
+			if not isinstance(systemData, dict):
+				# Chunk index without the key, the key is read from the chunk
+				settings = guide._readChunk(systemData)["settings"]
+				key = naming.getSystemKey(settings["location"], settings["name"])
+				systemData = self._systemsData[i] = dict(chunk=systemData, key=key)
+
+			if "chunk" in systemData:
+				# The system is stored in its own chunk (See Guide.commit)
+				key = systemData["key"]
+			else:
+				key = naming.getSystemKey(systemData["settings"]["location"], systemData["settings"]["name"])
+			guide._systemIndex[key] = self
 
 		# Loading Sub Layers
 		for data in data["layers"]:
 			layer = Layer(self, data["name"], data)
 			self._layers.append(layer)
 
+	def _hydrate(self):
+		'''Private Method. Load the systems of the Layer if they haven't been yet
+		'''
+		if self._systemsData is None:
+			return
+
+		systemsData, self._systemsData = self._systemsData, None
+		guide = self.guide()
+		for systemData in systemsData:
+			chunk = systemData.get("chunk")
+			if chunk is not None:
+				systemData = guide._readChunk(chunk)
+			SystemClass = getSystemGuideClass(systemData["systemType"])
+			system = SystemClass.load(self, systemData)
+			self.appendSystem(system)
+			if chunk is not None:
+				guide._chunks[system] = chunk
+
+	def isHydrated(self):
+		'''Returns True if the systems of the Layer have been loaded
+
+		Returns:
+			bool
+		'''
+		return self._systemsData is None
+
 	def build(self):
 		'''Build all the systems in the Layer
 		'''
+		self._hydrate()
 		self.guide().build(self._systems)
 
 	def delete(self, deleteGuide=False):
@@ -85,28 +127,42 @@ class Layer():
 		Args:
 			deleteGuide (bool): Delete also the SystemGuides and the Layer itself
 		'''
+		self._hydrate()
 		self.guide().delete(self._systems, deleteGuide)
 		if deleteGuide:
 			self._parent.removeLayer(self)
 
-	def dumps(self):
+	def dumps(self, chunks=None):
 		'''Returns the Layer data
 
+		The systems that haven't been loaded are passed thru as they were stored.
+
+		Args:
+			chunks (dict||None): The chunk index of each system. None to include the systems data
+
 		Returns:
 			dictionary
 		'''
+		if chunks is None:
+			self._hydrate()
+			systems = [system.dumps() for system in self._systems]
+		elif self._systemsData is not None:
+			systems = list(self._systemsData)
+		else:
+			systems = [dict(chunk=chunks[system], key=system.key()) for system in self._systems]
+
 		data = dict(name=self._name,
 					settings=self._settings,
-					layers=[layer.dumps() for layer in self._layers],
-					systems=[system.dumps() for system in self._systems] )
+					layers=[layer.dumps(chunks) for layer in self._layers],
+					systems=systems)
 		return data
 
 	def commit(self):
-		'''Save the guide settings
+		'''Save the layer settings
 
-		You cannot save just a single layer, so it will save all the guide definition
+		The systems of the layer are not saved again
 		'''
-		self.guide().commit()
+		self.guide().commit(systems=[])
 
 	# ----------------------------------------------------------------------------------
 	# NAME and LAYERS
@@ -166,6 +222,12 @@ class Layer():
 		if name == self._name:
 			return self._name
 		name = self._findUniqueName(name, self._parent.layers())
+
+		# Keep the index of the parent up to date
+		if self._parent._layerIndex.get(self._name) is self:
+			self._parent._layerIndex.pop(self._name)
+		self._parent._layerIndex[name] = self
+
 		self._name = name
 		return self._name
 
@@ -197,8 +259,7 @@ class Layer():
 		Returns:
 			dictionary or setting value
 		'''
-		layers = {layer.name():layer for layer in self._layers}
-		return layers if name is None else layers[name]
+		return dict(self._layerIndex) if name is None else self._layerIndex[name]
 
 	def addLayer(self, name):
 		'''Add a sub Layer to the Layer
@@ -223,6 +284,9 @@ class Layer():
 			Layer
 		'''
 		index = self._layers.index(layer)
+		if self._layerIndex.get(layer.name()) is layer:
+			self._layerIndex.pop(layer.name())
+		self.guide()._unindexLayer(layer)
 		return self._layers.pop(index)
 
 	def setParent(self, parent=None):
@@ -246,8 +310,12 @@ class Layer():
 		self._parent.removeLayer(self)
 
 		self._parent = parent
-		self.setName(self.name())
+		# Makes sure the name is unique in the new parent
+		name = self._name
+		self._name = None
+		self.setName(name)
 		self._parent._layers.append(self)
+		self.guide()._indexLayer(self)
 
 	def color(self):
 		return self.settings("color")
@@ -281,6 +349,7 @@ class Layer():
 			jnt (bool): True to update USE_JNT objects
 			ctl (bool): True to update USE_CTL objects
 		'''
+		self._hydrate()
 		for system in self._systems:
 			system.setVisible(visible, gde, rig, jnt, ctl)
 
@@ -296,6 +365,7 @@ class Layer():
 		Returns:
 			bool
 		'''
+		self._hydrate()
 		objects  = []
 		for system in self._systems:
 			objects += system.getObjects(gde, rig, jnt, ctl)
@@ -318,6 +388,7 @@ class Layer():
 		Returns:
 			dictionary or setting value
 		'''
+		self._hydrate()
 		systems = {system.key():system for system in self._systems}
 		return systems if key is None else systems[key]
 
@@ -333,6 +404,7 @@ class Layer():
 		Returns:
 			SystemGuide
 		'''
+		self._hydrate()
 		for system in self._systems:
 			if system.key() == key:
 				return system
@@ -359,7 +431,7 @@ class Layer():
 		name = self.guide().findNextSystemName(name, location)
 		SystemClass = getSystemGuideClass(systemType, version)
 		system = SystemClass.create(self, location, name, matrices)
-		self._systems.append(system)
+		self.appendSystem(system)
 
 		return system
 
@@ -369,7 +441,9 @@ class Layer():
 		Args:
 		    system (SystemGuide): The System to add to the Layer
 		'''
+		self._hydrate()
 		self._systems.append(system)
+		self.guide()._indexSystem(system)
 
 	def popSystem(self, system):
 		'''Remove a system from the Layer
@@ -382,7 +456,9 @@ class Layer():
 		Returns:
 			SystemGuide
 		'''
+		self._hydrate()
 		index = self._systems.index(system)
+		self.guide()._unindexSystem(system)
 		return self._systems.pop(index)
 
 	def swapSystem(self, oldSystem, systemType, version=None):
@@ -405,7 +481,7 @@ class Layer():
 		newSystem = SystemClass(self)
 		newSystem.setSettings(**oldSystem.settings())
 
-		self._systems.append(newSystem)
+		self.appendSystem(newSystem)
 		return newSystem
 
 	# ----------------------------------------------------------------------------------
@@ -424,6 +500,7 @@ class Layer():
 		for layer in self._layers:
 			xmlRoot.append(layer.toXml(layer))
 
+		self._hydrate()
 		for system in self._systems:
 			xmlRoot.append(system.toXml())
 
@@ -448,15 +525,13 @@ class Layer():
 
 		for xmlObject in xmlRoot:
 			if xmlObject.tag == "Layer":
-				name = xmlObject.get("name")
-				subLayer = Layer.fromXml(layer, xmlObject)
-				layer._layers.append(subLayer)
+				# addLayer already appends the sub layer
+				Layer.fromXml(layer, xmlObject)
 			elif xmlObject.tag == "System":
-			 	key = xmlObject.get("key")
-			 	systemType = xmlObject.get("type")
-			 	systemVersion = xmlObject.get("version", None)
+				systemType = xmlObject.get("type")
+				systemVersion = xmlObject.get("version", None)
 				SystemClass = getSystemGuideClass(systemType, systemVersion)
 				system = SystemClass.fromXml(layer, xmlObject)
-				layer._systems.append(system)
+				layer.appendSystem(system)
 
 		return layer
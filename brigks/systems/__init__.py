@@ -1,6 +1,13 @@
 import os
+import json
 from collections import defaultdict
 
+MANIFEST_PATH = os.path.join(os.path.dirname(__file__), "manifest.json")
+
+# The classes are resolved once per (type, version, module)
+_classes = {}
+_manifest = None
+
 def getSystemGuideClass(systemType, version=None):
 	return _getClass(systemType, "guide", "SystemGuide", version)
 
@@ -14,6 +21,10 @@ def _getClass(systemType, moduleName, classSuffix, version=None):
 	if version is None:
 		version = getSystemVersions(systemType)[-1]
 
+	cacheKey = (systemType, version, moduleName)
+	if cacheKey in _classes:
+		return _classes[cacheKey]
+
 	# Get Module
 	moduleName = ".".join(["brigks", "systems", systemType, version, moduleName])
 	module = __import__(moduleName, globals(), locals(), ["*"], -1)
@@ -26,32 +37,76 @@ def _getClass(systemType, moduleName, classSuffix, version=None):
 		msg = "'{m}' object has no attribute '{c}'".format(m=moduleName, c=className)
 		raise AttributeError(msg)
 
+	_classes[cacheKey] = Class
 	return Class
 
 
 def getSystemList():
-	folder = os.path.dirname(__file__)
-	for root, dirs, files in os.walk(folder, topdown=True):
-	   	return sorted(dirs)
+	return sorted(_getManifest().keys())
 
 def getSystemListByCategory():
 	categories = defaultdict(list)
-	folder = os.path.dirname(__file__)
-	for root, dirs, files in os.walk(folder, topdown=True):
-	   	for systemType in sorted(dirs):
-			moduleName = ".".join(["brigks", "systems", systemType])
-			module = __import__(moduleName, globals(), locals(), ["*"], -1)
-			for cat in module.categories:
-				categories["ALL"].append(systemType)
-				categories[cat].append(systemType)
-		break
+	for systemType, data in sorted(_getManifest().iteritems()):
+		categories["ALL"].append(systemType)
+		for cat in data["categories"]:
+			categories[cat].append(systemType)
 	return categories
 
 def getSystemVersions(systemType):
+	manifest = _getManifest()
+	if systemType in manifest:
+		return manifest[systemType]["versions"]
+	return _scanSystem(systemType)["versions"]
+
+# ----------------------------------------------------------------------------------
+# MANIFEST
+# ----------------------------------------------------------------------------------
+def writeManifest(path=MANIFEST_PATH):
+	'''Scan the systems and write the manifest of their versions and categories
+
+	The manifest is read instead of importing all the systems packages.
+	It needs to be written again when adding a system or a version.
+
+	Args:
+		path (str): Output path of the manifest
+
+	Returns:
+		dict: The manifest
+	'''
+	global _manifest
+	_manifest = {systemType:_scanSystem(systemType) for systemType in _scanSystemList()}
+	with open(path, "w") as f:
+		json.dump(_manifest, f, indent=4, sort_keys=True)
+	return _manifest
+
+def _getManifest():
+	'''Private Method. Returns the manifest, loaded once. Falls back on scanning the systems
+	'''
+	global _manifest
+	if _manifest is None:
+		if os.path.exists(MANIFEST_PATH):
+			with open(MANIFEST_PATH, "r") as f:
+				_manifest = json.load(f)
+		else:
+			_manifest = {systemType:_scanSystem(systemType) for systemType in _scanSystemList()}
+	return _manifest
+
+def _scanSystemList():
+	'''Private Method. Returns the system types found in the package
+	'''
+	folder = os.path.dirname(__file__)
+	for root, dirs, files in os.walk(folder, topdown=True):
+		return sorted(d for d in dirs if os.path.exists(os.path.join(root, d, "__init__.py")))
+
+def _scanSystem(systemType):
+	'''Private Method. Returns the versions and categories of a system by importing its package
+	'''
 	# Get Module
 	moduleName = ".".join(["brigks", "systems", systemType])
 	module = __import__(moduleName, globals(), locals(), ["*"], -1)
 
 	folder = os.path.dirname(module.__file__)
 	for root, dirs, files in os.walk(folder, topdown=True):
-	   	return sorted(dirs)
\ No newline at end of file
+		versions = sorted(d for d in dirs if os.path.exists(os.path.join(root, d, "__init__.py")))
+		break
+	return dict(versions=versions, categories=list(module.categories))
@@ -14,61 +14,86 @@ class ArmSystemBuilder(SystemBuilder):
 
 	twp = ["Upr", "Lwr"]
 
-	def createObjects(self):
+	@classmethod
+	def computeTransforms(cls, source):
 		# SIZE
-		size = self.translations("Root").distance(self.translations("Elbow"))
-		fkSize = size * .5
-		ikSize = size * .5
-		upvSize = size * .125
-		rootSize = size * .25
+		size = source.translations("Root").distance(source.translations("Elbow"))
 
 		# TRANSFORMATIONS
-		positions = Vector3Array([self.translations("Root"), self.translations("Elbow"), self.translations("Wrist")])
+		positions = Vector3Array([source.translations("Root"), source.translations("Elbow"), source.translations("Wrist")])
 		normal = Vector3.planeNormal(*positions)
 		oriNormal = normal.copy()
-		if self.negate():
+		if source.negate():
 			normal *= -1
 		
 		# distances
-		d = [(positions[i],positions[i+1]) for i in range(2)]
-		self.lengths = [Vector3.distance(a,b) for a,b in d]
-		self.lengths.append(1)
-		ratio = self.lengths[0] / sum(self.lengths[:2])
-		self.setSettings(lengths=self.lengths[:2])
+		lengths = umath.distances(positions)
+		lengths.append(1)
+		ratio = lengths[0] / sum(lengths[:2])
 		
 		# root
-		rootTfm = Transformation.fromParts(translation=self.translations("Root"))
+		rootTfm = Transformation.fromParts(translation=source.translations("Root"))
 
 		# fk
-		fkTfm = TransformationArray.chain(positions, normal, axis="xz", negativeSide=self.negate(), endTransform=False)
-		direction = self.translations("Eff") - self.translations("Wrist")
-		fk2Tfm = Transformation.lookAt(self.translations("Wrist"), direction, self.directions("Wrist", "z"), axis="xz", negativeSide=self.negate())
+		fkTfm = TransformationArray.chain(positions, normal, axis="xz", negativeSide=source.negate(), endTransform=False)
+		direction = source.translations("Eff") - source.translations("Wrist")
+		fk2Tfm = Transformation.lookAt(source.translations("Wrist"), direction, source.directions("Wrist", "z"), axis="xz", negativeSide=source.negate())
 		fkTfm = fkTfm.appended(fk2Tfm)
 
 		bfrTfm = [Transformation.fromParts(translation=tfm.translation, rotation=fkTfm[max(i-1,0)].rotation) for i, tfm in enumerate(fkTfm)]
-		bfrTfm[0] = Transformation.lookAt(self.translations("Root"), constants.AXIS_X, constants.AXIS_Y, axis=self.sign()+"xz", negativeSide=self.negate())
+		bfrTfm[0] = Transformation.lookAt(source.translations("Root"), constants.AXIS_X, constants.AXIS_Y, axis=source.sign()+"xz", negativeSide=source.negate())
 		
 		# ik
-		ikbfrPos = Vector3([self.factor() * sum(self.lengths[:2]), 0, 0]) * rootTfm.asMatrix()
+		ikbfrPos = Vector3([source.factor() * sum(lengths[:2]), 0, 0]) * rootTfm.asMatrix()
 		ikbfrTfm = Transformation.fromParts(translation=ikbfrPos)
-		ikTfm = Transformation.lookAt(self.translations("Wrist"), direction, self.directions("Wrist", "z"), axis=self.sign()+"xy", negativeSide=False)
+		ikTfm = Transformation.lookAt(source.translations("Wrist"), direction, source.directions("Wrist", "z"), axis=source.sign()+"xy", negativeSide=False)
 		
-		upvbfrTfm = Transformation.fromParts(translation=umath.upVector(self.translations("Root"), ikbfrPos, constants.AXIS_Y, ratio, self.negate()))
-		upvTfm = Transformation.fromParts(translation=umath.upVector(self.translations("Root"), self.translations("Wrist"), oriNormal, ratio))
+		upvNormals = [constants.AXIS_NY if source.negate() else constants.AXIS_Y, oriNormal]
+		upvbfrPos, upvPos = umath.upVectors([source.translations("Root")] * 2, [ikbfrPos, source.translations("Wrist")], upvNormals, ratio)
+		upvbfrTfm = Transformation.fromParts(translation=upvbfrPos)
+		upvTfm = Transformation.fromParts(translation=upvPos)
 		
 		# extras
-		scale = Vector3([self.factor(), self.factor(), self.factor()])
+		scale = Vector3([source.factor(), source.factor(), source.factor()])
 		twisterTfm = {}
-		interTfm = {}
-		for i, (p, pos) in enumerate(izip(self.twp, positions[1:3])):
+		for i, (p, pos) in enumerate(izip(cls.twp, positions[1:3])):
 			twisterTfm[p] = [fkTfm[i].copy(scale=scale), fkTfm[i].copy(translation=pos, scale=scale)]
-			interPos = twisterTfm[p][0].translation.lerp(twisterTfm[p][1].translation, .5)
-			interTfm[p] = twisterTfm[p][0].copy(translation=interPos)
+		interPos = umath.lerp([twisterTfm[p][0].translation for p in cls.twp], [twisterTfm[p][1].translation for p in cls.twp], .5)
+		interTfm = {p:twisterTfm[p][0].copy(translation=pos) for p, pos in izip(cls.twp, interPos)}
 			
 		ctrTfm = twisterTfm["Lwr"][0]
 
 		# prop
-		propTfm = Transformation.lookAt(self.translations("Prop"), self.directions("Prop", "y"), self.directions("Prop", "z"), axis="yz", negativeSide=False)
+		propTfm = Transformation.lookAt(source.translations("Prop"), source.directions("Prop", "y"), source.directions("Prop", "z"), axis="yz", negativeSide=False)
+
+		return dict(size=size, lengths=lengths, rootTfm=rootTfm, fkTfm=fkTfm, bfrTfm=bfrTfm, ikbfrTfm=ikbfrTfm, ikTfm=ikTfm,
+				upvbfrTfm=upvbfrTfm, upvTfm=upvTfm, twisterTfm=twisterTfm, interTfm=interTfm, ctrTfm=ctrTfm, propTfm=propTfm)
+
+	def createObjects(self):
+		data = self.transformsData()
+
+		# SIZE
+		size = data["size"]
+		fkSize = size * .5
+		ikSize = size * .5
+		upvSize = size * .125
+		rootSize = size * .25
+
+		# TRANSFORMATIONS
+		self.lengths = data["lengths"]
+		self.setSettings(lengths=self.lengths[:2])
+
+		rootTfm = data["rootTfm"]
+		fkTfm = data["fkTfm"]
+		bfrTfm = data["bfrTfm"]
+		ikbfrTfm = data["ikbfrTfm"]
+		ikTfm = data["ikTfm"]
+		upvbfrTfm = data["upvbfrTfm"]
+		upvTfm = data["upvTfm"]
+		twisterTfm = data["twisterTfm"]
+		interTfm = data["interTfm"]
+		ctrTfm = data["ctrTfm"]
+		propTfm = data["propTfm"]
 
 
 		# CONTROLLERS
@@ -10,6 +10,8 @@ from brigks import config
 
 class BasicSystemBuilder(SystemBuilder):
 
+	declarative = True
+
 	def createObjects(self):
 		self.bfr = []
 		self.ctl = []
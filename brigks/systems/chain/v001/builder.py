@@ -10,52 +10,65 @@ from math3d.transformation import Transformation, TransformationArray
 from math3d.vectorN import Vector3, Vector3Array
 
 class ChainSystemBuilder(SystemBuilder):
-	
-	def createObjects(self):
-		# Settings
-		self.isFk = "FK" in self.settings("kinematic")
-		self.isIk = "IK" in self.settings("kinematic")
-		self.isFkIk = self.isFk and self.isIk
-		
-		# TRANSFORMATION
+
+	@classmethod
+	def computeTransforms(cls, source):
 		# Positions 
-		positions = self.translations("Part")
+		positions = source.translations("Part")
 
 		# Normal
-		if self.count("Part") > 2:
+		if source.count("Part") > 2:
 			normal = Vector3.planeNormal(*positions[:3])
 			if normal.length() < 1E-6:
-				normal = self.directions("Part1", "z")
-			if self.negate(): 
+				normal = source.directions("Part1", "z")
+			if source.negate(): 
 				normal *= -1
 		else:
-			normal = self.directions("Part1", "z")
+			normal = source.directions("Part1", "z")
 
-		boneTfm = TransformationArray.chain(positions, normal, axis="xz", negativeSide=self.negate(), endTransform=False)
-		d = [(positions[i],positions[i+1]) for i in range(self.count("Part")-1)]
-		boneLen = [Vector3.distance(a,b) for a,b in d]
+		boneTfm = TransformationArray.chain(positions, normal, axis="xz", negativeSide=source.negate(), endTransform=False)
+		boneLen = umath.distances(positions)
 
-		self.setSettings(count=len(boneLen), lengths=boneLen)
-		
-		if self.settings("setNeutralPose"):
+		if source.settings("setNeutralPose"):
 			bfrTfm = boneTfm
 		else:
 			bfrTfm = [tfm.copy(rotation=boneTfm[max(i-1,0)].rotation) for i, tfm in enumerate(boneTfm)]
-		
-		if self.isIk:
-			ikTfm = boneTfm[-1].copy(translation=positions[-1])
+
+		data = dict(positions=positions, normal=normal, boneTfm=boneTfm, boneLen=boneLen, bfrTfm=bfrTfm)
+
+		if "IK" in source.settings("kinematic"):
+			data["ikTfm"] = boneTfm[-1].copy(translation=positions[-1])
 			
 			# Up Vector
-			if self.count("Part") > 2:
-				upvTfm = Transformation.fromParts(translation=umath.upVector(positions[0], positions[2], normal, ratio=1, negate=self.negate()))
+			if source.count("Part") > 2:
+				data["upvTfm"] = Transformation.fromParts(translation=umath.upVector(positions[0], positions[2], normal, ratio=1, negate=source.negate()))
 			else:
-				upvTfm = Transformation.fromParts(translation=umath.upVector(positions[0], positions[1], normal, ratio=1, negate=self.negate()))
-			
+				data["upvTfm"] = Transformation.fromParts(translation=umath.upVector(positions[0], positions[1], normal, ratio=1, negate=source.negate()))
 
-		if self.settings("dynamic"):
+		if source.settings("dynamic"):
 			tgtTfm = boneTfm[1:]
-			tgtTfm = tgtTfm.appended(boneTfm[-1].copy(translation=positions[-1]))
-			
+			data["tgtTfm"] = tgtTfm.appended(boneTfm[-1].copy(translation=positions[-1]))
+
+		return data
+	
+	def createObjects(self):
+		# Settings
+		self.isFk = "FK" in self.settings("kinematic")
+		self.isIk = "IK" in self.settings("kinematic")
+		self.isFkIk = self.isFk and self.isIk
+		
+		# TRANSFORMATION
+		data = self.transformsData()
+		positions = data["positions"]
+		normal = data["normal"]
+		boneTfm = data["boneTfm"]
+		boneLen = data["boneLen"]
+		bfrTfm = data["bfrTfm"]
+		ikTfm = data.get("ikTfm")
+		upvTfm = data.get("upvTfm")
+		tgtTfm = data.get("tgtTfm")
+
+		self.setSettings(count=len(boneLen), lengths=boneLen)
 
 		# OBJECTS
 
@@ -14,68 +14,91 @@ class LegSystemBuilder(SystemBuilder):
 
 	twp = ["Upr", "Lwr"]
 
-	def createObjects(self):
+	@classmethod
+	def computeTransforms(cls, source):
 		# SIZE
-		size = self.translations("Root").distance(self.translations("Knee"))
-		fkSize = size * .25
-		ikSize = size * .25
-		upvSize = size * .1
-		rootSize = size * .15
+		size = source.translations("Root").distance(source.translations("Knee"))
 
 		# TRANSFORMATIONS
-		positions = Vector3Array([self.translations("Root"), self.translations("Knee"), self.translations("Ankle")])
+		positions = Vector3Array([source.translations("Root"), source.translations("Knee"), source.translations("Ankle")])
 		normal = Vector3.planeNormal(*positions)
 		oriNormal = normal.copy()
-		if self.negate():
+		if source.negate():
 			normal *= -1
 
 		isInversed = constants.AXIS_X.dot(oriNormal) >= 0
 		
-		d = [(positions[i],positions[i+1]) for i in range(2)]
-		self.lengths = [Vector3.distance(a,b) for a,b in d]
-		self.lengths.append(1)
-		ratio = self.lengths[0] / sum(self.lengths[:2])
-		self.setSettings(lengths=self.lengths[:2])
+		lengths = umath.distances(positions)
+		lengths.append(1)
+		ratio = lengths[0] / sum(lengths[:2])
 		
 		# root
-		rootTfm = Transformation.fromParts(translation=self.translations("Root"))
+		rootTfm = Transformation.fromParts(translation=source.translations("Root"))
 
 		# fk
-		fkTfm = TransformationArray.chain(positions, normal, axis="xz", negativeSide=self.negate(), endTransform=False)
+		fkTfm = TransformationArray.chain(positions, normal, axis="xz", negativeSide=source.negate(), endTransform=False)
 		axis = "-y-x" if isInversed else "y-x"
-		if self.settings("ankleUpVector") == "World Y":
+		if source.settings("ankleUpVector") == "World Y":
 			upaxis = constants.AXIS_Y
 		else:
-			upaxis = -1 * self.directions("Ankle", "z")
+			upaxis = -1 * source.directions("Ankle", "z")
 
-		direction = self.translations("Eff") - self.translations("Ankle")
-		fk2Tfm = Transformation.lookAt(self.translations("Ankle"), direction, upaxis, axis, self.negate())
+		direction = source.translations("Eff") - source.translations("Ankle")
+		fk2Tfm = Transformation.lookAt(source.translations("Ankle"), direction, upaxis, axis, source.negate())
 		fkTfm = fkTfm.appended(fk2Tfm)
 
 		bfrTfm = [tfm.copy(rotation=fkTfm[max(i-1,0)].rotation) for i, tfm in enumerate(fkTfm)]
 		xaxis = constants.AXIS_NX if isInversed else constants.AXIS_X
-		bfrTfm[0] = Transformation.lookAt(self.translations("Root"), constants.AXIS_NY, xaxis, "x"+self.nsign()+"z", self.negate())
+		bfrTfm[0] = Transformation.lookAt(source.translations("Root"), constants.AXIS_NY, xaxis, "x"+source.nsign()+"z", source.negate())
 
 		
 		# ik
-		ikbfr_pos = Vector3([self.translations("Root").x, self.translations("Ankle").y, self.translations("Root").z])
+		ikbfr_pos = Vector3([source.translations("Root").x, source.translations("Ankle").y, source.translations("Root").z])
 		
 		ikbfrTfm = Transformation.fromParts(translation=ikbfr_pos)
-		ikTfm = Transformation.lookAt(self.translations("Ankle"), direction, upaxis, "zy", False)
+		ikTfm = Transformation.lookAt(source.translations("Ankle"), direction, upaxis, "zy", False)
 		
-		upvbfrTfm = Transformation.fromParts(translation=umath.upVector(self.translations("Root"), ikbfr_pos, constants.AXIS_NX, ratio, False))
-		upvTfm = Transformation.fromParts(translation=umath.upVector(self.translations("Root"), self.translations("Ankle"), oriNormal, ratio))
+		upvbfrPos, upvPos = umath.upVectors([source.translations("Root")] * 2, [ikbfr_pos, source.translations("Ankle")], [constants.AXIS_NX, oriNormal], ratio)
+		upvbfrTfm = Transformation.fromParts(translation=upvbfrPos)
+		upvTfm = Transformation.fromParts(translation=upvPos)
 		
 		# extras
 		scale = Vector3([1,1,1])
 		twisterTfm = {}
-		interTfm = {}
-		for i, (p, pos) in enumerate(izip(self.twp, positions[1:3])):
+		for i, (p, pos) in enumerate(izip(cls.twp, positions[1:3])):
 			twisterTfm[p] = [fkTfm[i].copy(scale=scale), fkTfm[i].copy(translation=pos, scale=scale)]
-			inter_pos = twisterTfm[p][0].translation.lerp(twisterTfm[p][1].translation, .5)
-			interTfm[p] = twisterTfm[p][0].copy(translation=inter_pos)
+		inter_pos = umath.lerp([twisterTfm[p][0].translation for p in cls.twp], [twisterTfm[p][1].translation for p in cls.twp], .5)
+		interTfm = {p:twisterTfm[p][0].copy(translation=pos) for p, pos in izip(cls.twp, inter_pos)}
 			
 		ctrTfm = twisterTfm["Lwr"][0]
+
+		return dict(size=size, lengths=lengths, rootTfm=rootTfm, fkTfm=fkTfm, bfrTfm=bfrTfm, ikbfrTfm=ikbfrTfm, ikTfm=ikTfm,
+				upvbfrTfm=upvbfrTfm, upvTfm=upvTfm, twisterTfm=twisterTfm, interTfm=interTfm, ctrTfm=ctrTfm)
+
+	def createObjects(self):
+		data = self.transformsData()
+
+		# SIZE
+		size = data["size"]
+		fkSize = size * .25
+		ikSize = size * .25
+		upvSize = size * .1
+		rootSize = size * .15
+
+		# TRANSFORMATIONS
+		self.lengths = data["lengths"]
+		self.setSettings(lengths=self.lengths[:2])
+
+		rootTfm = data["rootTfm"]
+		fkTfm = data["fkTfm"]
+		bfrTfm = data["bfrTfm"]
+		ikbfrTfm = data["ikbfrTfm"]
+		ikTfm = data["ikTfm"]
+		upvbfrTfm = data["upvbfrTfm"]
+		upvTfm = data["upvTfm"]
+		twisterTfm = data["twisterTfm"]
+		interTfm = data["interTfm"]
+		ctrTfm = data["ctrTfm"]
 		
 		
 		# CONTROLLERS
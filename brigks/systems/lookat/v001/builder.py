@@ -10,6 +10,8 @@ from brigks import config
 
 class LookatSystemBuilder(SystemBuilder):
 
+	declarative = True
+
 	def createObjects(self):
 		# Search for optional Upv marker to determine normal
 		if "Upv" in self.translations():
@@ -7,6 +7,8 @@ from brigks.systems.systemBuilder import SystemBuilder
 
 class PistonSystemBuilder(SystemBuilder):
 
+	declarative = True
+
 	def createObjects(self):
 	
 		# Normal
@@ -10,6 +10,8 @@ from brigks import config
 
 class SliderSystemBuilder(SystemBuilder):
 
+	declarative = True
+
 	def createObjects(self):
 		# TRANSFORMATION
 		rootTfm = self.transforms("Rail")
@@ -12,26 +12,34 @@ from brigks import config
 class SpineSystemBuilder(SystemBuilder):
 	ctl_count = 5
 
+	@classmethod
+	def computeTransforms(cls, source):
+		size = source.translations("Root").distance(source.translations("Eff"))
+
+		normal = source.directions("Root", "z")
+		
+		# All the controllers share the same orientation, along the spine
+		lookat = source.translations("Eff") - source.translations("Root")
+		tfm = Transformation.lookAt(source.translations("Root"), lookat, normal, source.settings("axis").lower(), source.negate())
+
+		ratios = [i/(cls.ctl_count-1.0) for i in range(cls.ctl_count)]
+		positions = umath.lerp([source.translations("Root")] * cls.ctl_count, [source.translations("Eff")] * cls.ctl_count, ratios)
+		transforms = [tfm.copy(translation=position) for position in positions]
+
+		return dict(size=size, positions=positions, transforms=transforms)
+
 	def createObjects(self):
+		data = self.transformsData()
 
 		# SIZE
-		size = self.translations("Root").distance(self.translations("Eff"))
+		size = data["size"]
 		fkSize = size * .8
 		ikSize = size *.75
 		hipSize = size * 1.25
 
 		# TRANSFORMATION
-		normal = self.directions("Root", "z")
-		
-		positions = []
-		transforms = []
-
-		for i in range(self.ctl_count):
-			lookat = self.translations("Eff") - self.translations("Root")
-			t = Transformation.lookAt(self.translations("Root"), lookat, normal, self.settings("axis").lower(), self.negate())
-			t.translation = self.translations("Root").lerp(self.translations("Eff"), i/(self.ctl_count-1.0))
-			positions.append(t.translation)
-			transforms.append(t)
+		positions = data["positions"]
+		transforms = data["transforms"]
 
 		# OBJECTS
 		self.root = self.addRig(None, "Root")
@@ -40,7 +48,7 @@ class SpineSystemBuilder(SystemBuilder):
 		points = [positions[i] for i in [0,2,2,4]]
 		self.crvA = create.curve(self.getObjectName(config.USE_RIG, "CrvA"), points, closed=False, degree=3, parent=self.root)
 
-		points = [positions[0].lerp(positions[-1], i/6.0) for i in xrange(7)]
+		points = umath.lerp([positions[0]] * 7, [positions[-1]] * 7, [i/6.0 for i in xrange(7)])
 		self.crvB = create.bezier(self.getObjectName(config.USE_RIG, "CrvB"), self.root, points)
 		
 		# Controllers
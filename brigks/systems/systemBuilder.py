@@ -1,10 +1,16 @@
 import os.path
+import sys
 import itertools
+import json
+import hashlib
 from collections import OrderedDict
 
 from maya import cmds
 
-from brigks.utils import attributes, create, compounds, script
+import math3d
+from math3d.matrixN import Matrix4
+
+from brigks.utils import attributes, create, compounds, script, modifier, index, plan, cache, membership, umath
 from brigks import naming, config
 
 class SystemBuilder():
@@ -25,7 +31,10 @@ class SystemBuilder():
 	type (str):
 
 	steps (OrderedDict):
+
+	declarative (bool): True if createObjects only uses the helpers, so its objects can be planned (See planObjects)
 	'''
+	declarative = False
 
 	def __init__(self, coreBuilder, guide):
 		'''Builder Init
@@ -45,6 +54,10 @@ class SystemBuilder():
 		self.setSettings = self.guide.setSettings
 		self._connections = self.guide._connections
 		self.attributeNames = []
+		self.nodeHashes = {}
+		self.precomputed = None
+		self._cachedObjects = None
+		self._cacheData = {}
 		self._uiHosts = {}
 
 		self.key = self.guide.key
@@ -125,6 +138,132 @@ class SystemBuilder():
 			connections = {k:v for k, v in self._connections.iteritems() if v.type() != "uiHost"}
 		return connections if key is None else connections[key]
 		
+	def dataHash(self):
+		'''Returns a hash of the guide data used to build the system
+
+		The hash covers the system type and version, the settings, the colors inherited from the layers,
+		the connections settings and the markers matrices. It is used to detect which systems need to be rebuilt.
+
+		Returns:
+			str
+		'''
+		settings = {k:v for k, v in self.settings().iteritems() if k not in ["attributes", "hash"]}
+		data = dict(type=self.type(),
+					version=self.guide.version(),
+					settings=settings,
+					colors=dict(ik=list(self.colorIk()), fk=list(self.colorFk())),
+					connections={slot:cnx.dumps() for slot, cnx in self._connections.iteritems()},
+					markers={part:[round(v, 5) for v in marker.matrix()] for part, marker in self.markers().iteritems()})
+		return hashlib.md5(json.dumps(data, sort_keys=True)).hexdigest()
+
+	def snapshot(self):
+		'''Returns a plain copy of the settings and markers used by computeTransforms
+
+		Returns:
+			dict
+		'''
+		markers = {part:marker.transformWithScale().asMatrix().flattened() for part, marker in self.markers().iteritems()}
+		multi = {name:[marker.part() for marker in self.markers(name)] for name in self.guide.markerMinMax}
+		return dict(settings=dict(self.settings()), markers=markers, multi=multi)
+
+	@classmethod
+	def computeTransforms(cls, source):
+		'''Reimplement. Compute the transformations of the objects of that specific system
+
+		Only math3d should be used, as this can run in another process (See brigks.utils.precompute).
+
+		Args:
+			source (SystemBuilder||SnapshotGuide): Gives access to the settings and markers of the system
+
+		Returns:
+			dict||None
+		'''
+		return None
+
+	def transformsData(self):
+		'''Returns the result of computeTransforms, computed here if it hasn't been precomputed
+
+		Returns:
+			dict||None
+		'''
+		if self.precomputed is None:
+			self.precomputed = self.computeTransforms(self)
+		return self.precomputed
+
+	# ----------------------------------------------------------------------------------
+	#  CACHE
+	# ----------------------------------------------------------------------------------
+	def cacheKey(self):
+		'''Returns the key of the build results of that system in the cache (See brigks.utils.cache)
+
+		The key covers the guide data of the system (See dataHash), the code of its builder
+		and the code of the modules creating its objects and computing its transformations.
+
+		Returns:
+			str
+		'''
+		modules = [sys.modules[__name__], create, plan, attributes, naming, config, umath]
+		data = self.dataHash() + cache.codeHash(type(self)) + "".join(cache.moduleHash(module) for module in modules)
+		# The transformations are computed with math3d (See computeTransforms)
+		data += cache.packageHash(math3d)
+		return hashlib.md5(data).hexdigest()
+
+	def loadCache(self, data):
+		'''Use the build results read from the cache
+
+		Args:
+			data (dict): The data returned by cacheData() when the system was built with the same inputs
+		'''
+		if "transforms" in data:
+			self.precomputed = data["transforms"]
+		if "objects" in data:
+			self._cachedObjects = data["objects"]
+
+	def cacheData(self):
+		'''Returns the build results to store in the cache
+
+		Returns:
+			dict: The transformations (See computeTransforms) and the plan of the objects (See planObjects)
+		'''
+		data = dict(self._cacheData)
+		if self.precomputed is not None:
+			data["transforms"] = self.precomputed
+		if self._cachedObjects is not None:
+			data["objects"] = self._cachedObjects
+		return data
+
+	def skipStep(self, step):
+		'''Returns True if the system has nothing to do for the given building step
+
+		Args:
+			step (str): Name of the building step (See self.steps)
+
+		Returns:
+			bool
+		'''
+		if step == "Pre Script":
+			return not self._hasScript("preScriptPath", "preScriptValue")
+		elif step == "Post Script":
+			return not self._hasScript("postScriptPath", "postScriptValue")
+		elif step == "Connect System":
+			return not self.connections(includeUIHosts=False)
+		return False
+
+	def _hasScript(self, pathKey, valueKey):
+		'''Private Method. Returns True if the script has code to execute
+
+		Args:
+			pathKey (str): Setting key of the script path
+			valueKey (str): Setting key of the script code
+
+		Returns:
+			bool
+		'''
+		if os.path.exists(self.settings(pathKey)):
+			return True
+		lines = self.settings(valueKey).splitlines()
+		return any(line.strip() and not line.strip().startswith("#") for line in lines)
+
 	# ----------------------------------------------------------------------------------
 	# BUILDING STEPS
 	# ----------------------------------------------------------------------------------
@@ -138,8 +277,29 @@ class SystemBuilder():
 		'''Building Step. Delete and create objects 
 		'''
 		self.preDeleteObjects()
-		self.deleteObjects()
-		self.createObjects()
+		if self.declarative and self.coreBuilder.guide.settings("reconcileObjects"):
+			# Only the objects that changed are updated
+			self.deleteJoints()
+			self.deleteUtilityNodes()
+			self.reconcileObjects()
+		elif self.declarative and self.coreBuilder.guide.settings("planObjects"):
+			self.deleteObjects()
+			if self._cachedObjects is not None:
+				# Replay the plan from the cache, and restore what createObjects stored on the builder
+				buildPlan = plan.BuildPlan(self._cachedObjects["plan"])
+				buildPlan.apply()
+				vars(self).update(self._cachedObjects["attributes"])
+			else:
+				# The objects are created at once when the plan is closed
+				before = dict(vars(self))
+				with plan.planning() as buildPlan:
+					self.createObjects()
+				attrs = {k:v for k, v in vars(self).iteritems() if k not in before or before[k] is not v}
+				self._cacheData["objects"] = dict(plan=buildPlan.data(), attributes=attrs)
+			self.nodeHashes = buildPlan.nodeHashes()
+		else:
+			self.deleteObjects()
+			self.createObjects()
 		if self.settings("createJoints"):
 			self.createJoints()
 
@@ -188,9 +348,7 @@ class SystemBuilder():
 	def deleteObjects(self):
 		'''Delete all the objects of that system
 		'''
-		search = self.getObjectName("*", "*")
-		parent = cmds.ls(self.nodes("local"), long=True)[0]
-		toDelete = [x for x in cmds.ls(search, type="transform", long=True) if x.startswith(parent)]
+		toDelete = self._findObjects()
 		if toDelete:
 			# Unparent all the children
 			children = cmds.listRelatives(toDelete, children=True, type="transform", path=True)
@@ -201,23 +359,89 @@ class SystemBuilder():
 			# Delete objects
 			cmds.delete(cmds.ls(toDelete, long=True))
 
-		# Delete Utility Nodes
-		search = self.getObjectName(config.USE_NDE, "*")
-		toDelete = cmds.ls(search, long=True)
+		self.deleteUtilityNodes()
+
+	def deleteUtilityNodes(self):
+		'''Delete all the utility nodes of that system
+		'''
+		members = self.members()
+		if members is None:
+			# Built before the members were tracked
+			search = self.getObjectName(config.USE_NDE, "*")
+			toDelete = cmds.ls(search, long=True)
+		else:
+			toDelete = list(set(members) - set(cmds.ls(members, type="dagNode", long=True)))
+
 		if toDelete:
 			cmds.delete(toDelete)
 
+	def _findObjects(self):
+		'''Private Method. Returns the objects of that system under the local node
+
+		Returns:
+			list of str
+		'''
+		parent = cmds.ls(self.nodes("local"), long=True)[0]
+		members = self.members("transform")
+		if members is None:
+			# Built before the members were tracked
+			search = self.getObjectName("*", "*")
+			members = index.find(search, self.model())
+		return [x for x in members if x.startswith(parent+"|")]
+
 	def createObjects(self):
 		'''Reimplement. Create the objects for that specific system
 		'''
 		pass
 
+	def planObjects(self):
+		'''Returns the plan of the objects of that system, without creating them
+
+		Returns:
+			BuildPlan
+		'''
+		if not self.declarative:
+			msg = "{t} objects can't be planned"
+			raise RuntimeError(msg.format(t=self.type()))
+
+		with plan.planning(apply=False) as buildPlan:
+			self.createObjects()
+		return buildPlan
+
+	def reconcileObjects(self):
+		'''Update the objects of that system to match its plan
+
+		Instead of deleting and creating all the objects, the objects that are already built
+		are kept with their external connections, and only the ones whose plan changed since
+		the last build are updated. The missing objects are created, the extra ones deleted.
+		'''
+		buildPlan = self.planObjects()
+
+		previous = {}
+		if self.key() in self.coreBuilder.builtSettings():
+			previous = self.coreBuilder.builtSettings(self.key()).get("nodes", {})
+
+		# The joints have been deleted and are created again (See stepObjects)
+		buildPlan.reconcile(self._findObjects(), previous, self.nodes("local"))
+		self.nodeHashes = buildPlan.nodeHashes()
+
+		# The objects kept from a build where the members were not tracked are registered now
+		if self.membersTag() is None:
+			for name in buildPlan.nodes():
+				node = index.get(name, self.model())
+				if node:
+					membership.register(node)
+
 	def deleteJoints(self):
 		'''Delete all the joints of that system
 		'''
-		search = self.getObjectName(config.USE_JNT, "*")
 		parent = cmds.ls(self.nodes("local"), long=True)[0]
-		toDelete = [x for x in cmds.ls(search, type="joint", long=True) if x.startswith(parent)]
+		members = self.members("joint")
+		if members is None:
+			# Built before the members were tracked
+			search = self.getObjectName(config.USE_JNT, "*")
+			members = cmds.ls(index.find(search, self.model()), type="joint", long=True)
+		toDelete = [x for x in members if x.startswith(parent+"|")]
 		if toDelete:
 			# Unparent all the children
 			children = cmds.listRelatives(toDelete, children=True, type="transform", path=True)
@@ -244,7 +468,7 @@ class SystemBuilder():
 		if self.key() in self.coreBuilder.builtSettings():
 			settings = self.coreBuilder.builtSettings(self.key())
 			for name in settings["attributes"]:
-				attr = cmds.ls("*."+name)
+				attr = index.getAttribute(name, self.model())
 				if attr:
 					cmds.deleteAttr(attr)
 
@@ -265,6 +489,84 @@ class SystemBuilder():
 		self.deleteJoints()
 		self.deleteAttributes()
 
+		tag = self.membersTag()
+		if tag:
+			cmds.delete(tag)
+
+	def foldBuffers(self):
+		'''Fold the buffers of that system into the offsetParentMatrix of their controller
+
+		Only the buffers with a single child controller and no connections are folded.
+		The controller is moved under the parent of the buffer, with the same world transform, and the buffer is deleted.
+		The buffers can't be reconnected after that, the system has to be rebuilt.
+
+		Returns:
+			list of str: The controllers whose buffer was folded
+		'''
+		members = self.members("transform") or []
+		buffers = [x for x in members if x.split("|")[-1].startswith(config.USE_BFR+"_")]
+		tag = self.membersTag()
+
+		folded = []
+		# Deepest first, so the paths of the other buffers are not changed
+		for bfr in sorted(buffers, key=lambda x: x.count("|"), reverse=True):
+			children = cmds.listRelatives(bfr, children=True, type="transform", fullPath=True) or []
+			if len(children) != 1 or not children[0].split("|")[-1].startswith(config.USE_CTL+"_"):
+				continue
+			ctl = children[0]
+
+			connections = cmds.listConnections(bfr, source=True, destination=True) or []
+			if [x for x in connections if x != tag]:
+				continue
+			if not cmds.getAttr(bfr+".inheritsTransform") or not cmds.getAttr(ctl+".inheritsTransform"):
+				continue
+
+			# The transform of the buffer relative to its parent
+			bfrMatrix = Matrix4(cmds.getAttr(bfr+".worldMatrix[0]"))
+			bfrMatrix = bfrMatrix * Matrix4(cmds.getAttr(bfr+".parentInverseMatrix[0]"))
+			offset = Matrix4(cmds.getAttr(ctl+".offsetParentMatrix")) * bfrMatrix
+
+			parent = cmds.listRelatives(bfr, parent=True, fullPath=True)
+			if parent:
+				ctl = cmds.parent(ctl, parent[0], relative=True)[0]
+			else:
+				ctl = cmds.parent(ctl, world=True, relative=True)[0]
+			cmds.setAttr(ctl+".offsetParentMatrix", offset.flattened(), type="matrix")
+			cmds.delete(bfr)
+			folded.append(ctl)
+
+		return folded
+
+	# ----------------------------------------------------------------------------------
+	#  MEMBERS
+	# ----------------------------------------------------------------------------------
+	def membersTag(self):
+		'''Returns the node tracking the nodes created by that system
+
+		Returns:
+			str||None: None if the system was built before the members were tracked
+		'''
+		return membership.getTag(self.model(), self.key())
+
+	def recordMembers(self):
+		'''Returns a context registering the nodes created to that system
+
+		Returns:
+			contextmanager
+		'''
+		return membership.recording(self.model(), self.key(), self.getObjectName(config.USE_NDE, "Members"))
+
+	def members(self, nodeType=None):
+		'''Returns the nodes created by that system
+
+		Args:
+			nodeType (str||None): Only returns the nodes of this type. None for all the nodes
+
+		Returns:
+			list of str||None: None if the system was built before the members were tracked
+		'''
+		return membership.getMembers(self.model(), self.key(), nodeType)
+
 	# ----------------------------------------------------------------------------------
 	#  HELPERS to CREATE OBJECTS / ATTRIBUTES
 	# ----------------------------------------------------------------------------------
@@ -420,20 +722,18 @@ class SystemBuilder():
 		joints = [self.addJnt(parent, "{}{}".format(part,i)) for i in xrange(1, count+1)]
 		
 		# Disconnect the deformer if there is a left over constraint
-		for jnt in joints:
-			connections = cmds.listConnections(jnt, destination=True)
-			if connections:
-				srfAttach = [node for node in connections if cmds.nodeType(node) == "SurfaceMultiAttach"]
-				if srfAttach:
-					cmds.delete(srfAttach)
+		connections = set(cmds.listConnections(joints, destination=True) or [])
+		srfAttach = [node for node in connections if cmds.nodeType(node) == "SurfaceMultiAttach"]
+		if srfAttach:
+			cmds.delete(srfAttach)
 
 		# 0 Parametric, 1 Percentage, 2 Fixed Length
 		self.addCompound("surfaceMultiAttach", "JntSrf", [joints], surface, attach=0, evenly=True)
 
 		for jnt in joints:
-			cmds.connectAttr(self.nodes("local")+".sx" ,jnt+".sx")
-			cmds.connectAttr(self.nodes("local")+".sx" ,jnt+".sy")
-			cmds.connectAttr(self.nodes("local")+".sx" ,jnt+".sz")
+			modifier.connectAttr(self.nodes("local")+".sx" ,jnt+".sx")
+			modifier.connectAttr(self.nodes("local")+".sx" ,jnt+".sy")
+			modifier.connectAttr(self.nodes("local")+".sx" ,jnt+".sz")
 
 		return joints
 
@@ -462,6 +762,7 @@ class SystemBuilder():
 		a = attributes.create(host, longName, attrType, value, minValue, maxValue,
 					keyable, writable, readable, channelBox, name)
 		self.attributeNames.append(longName)
+		index.registerAttribute(host, longName)
 		return a
 
 	def addAnimAttr(self, name, attrType, value,
@@ -529,7 +830,7 @@ class SystemBuilder():
 			str
 		'''
 		name = self.getObjectName(config.USE_NDE, name)
-		return cmds.createNode(nodeType, name=name)
+		return modifier.createNode(nodeType, name=name)
 
 	def addCompound(self, compoundType, name, *args, **kwargs):
 		'''Helper Method. Create a compound with the right naming convention
@@ -547,6 +848,8 @@ class SystemBuilder():
 		'''
 		method = compounds.__dict__[compoundType]
 		name = self.getObjectName(config.USE_NDE, name+"{node}")
+		if compoundType == "blendMatrix" and self.coreBuilder.guide.settings("offsetParentMatrix"):
+			kwargs.setdefault("useOffsetParentMatrix", True)
 		return method(name, *args, **kwargs)
 
 	# ----------------------------------------------------------------------------------
@@ -579,9 +882,7 @@ class SystemBuilder():
 			str
 		'''
 		name = self.getObjectName(use, part)
-		objects = [x for x in cmds.ls(name, type="transform", long=True) if x.startswith(self.model())]
-		if objects:
-			return cmds.ls(objects)[0]
+		return index.get(name, self.model(), long=False)
 
 	def getObjectFromSlot(self, slot):
 		'''Returns the system object attached to a specific slot for connection
@@ -607,7 +908,5 @@ class SystemBuilder():
 			str
 		'''
 		longName = self.getObjectName(config.USE_RIG, name)
-		attributes = [x for x in cmds.ls("*."+longName, long=True) if x.startswith(self.model())]
-		if attributes:
-			return attributes[0]
+		return index.getAttribute(longName, self.model())
 
@@ -1,17 +1,24 @@
 from maya import cmds
+import maya.OpenMaya as om
 import copy
+import array
+import math
 import xml.etree.cElementTree as etree
 import json
 
 from math3d.transformation import Transformation, TransformationArray
-from math3d.vectorN import Vector3Array
+from math3d.matrixN import Matrix4
+from math3d.vectorN import Vector3, Vector3Array
 
 from brigks.connections import getSystemConnectionClass
 from brigks import naming, config
-from brigks.utils import create, pick, compounds
+from brigks.utils import create, pick, compounds, index
 from brigks.systems.systemMarker import SystemMarker, checkMarkersMinMax
 
 
+# Signs of the matrix values once mirrored on the YZ plane (Mirror * Matrix * Mirror)
+MIRROR_SIGNS = [-1 if (row == 0) != (column == 0) else 1 for row in xrange(4) for column in xrange(4)]
+
 scriptDefaultValue = '''# cmds returns the maya.cmds module
 # this_model returns the root node
 # this_guide returns the system guide
@@ -88,6 +95,8 @@ class SystemGuide(object):
 					createJoints=True)
 		self._markers = None
 		self._multiMarkers = dict() 
+		self._matrices = None
+		self._matrixIndices = dict()
 		self._connections = {}
 		self.addSettings()
 
@@ -142,7 +151,7 @@ class SystemGuide(object):
 		return data
 
 	def commit(self):
-		self.guide().commit()
+		self.guide().commit(systems=[self])
 
 	# ----------------------------------------------------------------------------------
 	# 
@@ -170,8 +179,8 @@ class SystemGuide(object):
 			return 
 
 		self._layer.popSystem(self)
-		layer._systems.append(self)
 		self._layer = layer
+		layer.appendSystem(self)
 
 	def isBuilt(self):
 		return self.guide().systemIsBuilt(self.key())
@@ -438,8 +447,7 @@ class SystemGuide(object):
 			markers = []
 			for part in parts:
 				search = part+"*" if part in self.markerNames else part
-				result = cmds.ls(self.getMarkerName(search), type="transform", long=True)
-				result = [x for x in result if x.startswith(self.model())]
+				result = index.find(self.getMarkerName(search), self.model())
 				result = sorted(result, key=lambda x:x.split("|")[-1])
 				markers += result
 
@@ -506,8 +514,11 @@ class SystemGuide(object):
 			newName = self.getMarkerName(part, location, name)
 			marker.rename(newName)
 
+		# The Guide indexes the systems by key
+		self.guide()._unindexSystem(self)
 		self._settings["location"] = location
 		self._settings["name"] = name
+		self.guide()._indexSystem(self)
 
 		# TODO Rename Connections
 		# # Connections
@@ -520,9 +531,9 @@ class SystemGuide(object):
 		if self._markers is None or force:
 			self._markers = dict()
 			self._multiMarkers = dict()
+			self._matrices = None
 			search = self.getMarkerName("*")
-			markers = cmds.ls(search, type="transform", long=True)
-			markers = [m for m in markers if m.startswith(self.model())]
+			markers = index.find(search, self.model())
 			for marker in markers:
 				part = marker.split("_")[-1]
 				self._markers[part] = SystemMarker(marker, self)
@@ -569,11 +580,34 @@ class SystemGuide(object):
 	# ----------------------------------------------------------------------------------
 	# MARKER TRANSFORMS
 	# ----------------------------------------------------------------------------------
+	def markerMatrix(self, part):
+		'''Returns the world matrix of a marker
+
+		The matrices of all the markers are fetched at once, the first time one is needed
+
+		Args:
+			part (str): Unique part of the marker
+
+		Returns:
+			list of float||None: The 16 values of the matrix, None if the marker is unknown
+		'''
+		if self._matrices is None:
+			self._loadMatrices()
+		if part not in self._matrixIndices:
+			return
+		i = self._matrixIndices[part] * 16
+		return self._matrices[i:i+16].tolist()
+
 	def transforms(self, name=None):
 		if name is None:
 			return {k:m.transform() for k,m in self.markers().iteritems()}
 		elif name in self.markerMinMax:
-			return TransformationArray([m.transform() for m in self.markers(name)])
+			tfms = []
+			for matrix in self._markerMatrices(self.markers(name)):
+				tfm = Matrix4(matrix).asTransform()
+				tfm.scale = Vector3([1,1,1])
+				tfms.append(tfm)
+			return TransformationArray(tfms)
 		else:
 			return self.markers(name).transform()
 
@@ -581,7 +615,7 @@ class SystemGuide(object):
 		if name is None:
 			return {k:m.translation() for k,m in self.markers().iteritems()}
 		elif name in self.markerMinMax:
-			return Vector3Array([m.translation() for m in self.markers(name)])
+			return Vector3Array(self._matrixRows(self.markers(name), 3))
 		else:
 			return self.markers(name).translation()
 
@@ -589,7 +623,7 @@ class SystemGuide(object):
 		if name is None:
 			return {k:m.direction(axis) for k,m in self.markers().iteritems()}
 		elif name in self.markerMinMax:
-			return Vector3Array([m.direction(axis) for m in self.markers(name)])
+			return Vector3Array(self._matrixRows(self.markers(name), "xyz".index(axis)))
 		else:
 			return self.markers(name).direction(axis)
 
@@ -597,7 +631,8 @@ class SystemGuide(object):
 		if name is None:
 			return {k:m.scale() for k,m in self.markers().iteritems()}
 		elif name in self.markerMinMax:
-			return Vector3Array([m.scale() for m in self.markers(name)])
+			matrices = self._markerMatrices(self.markers(name))
+			return Vector3Array([[math.sqrt(sum(v*v for v in m[r*4:r*4+3])) for r in xrange(3)] for m in matrices])
 		else:
 			return self.markers(name).scale()
 
@@ -614,6 +649,67 @@ class SystemGuide(object):
 			raise RuntimeError("Can't count single Markers")
 		return len(self.markers(part))
 
+	def _loadMatrices(self):
+		'''Private Method. Fetch the world matrices of all the markers in one pass
+
+		The matrices are stored in a contiguous array of doubles, 16 values per marker,
+		self._matrixIndices gives the position of each marker in that array.
+		'''
+		markers = self.markers()
+		self._matrices = array.array("d")
+		self._matrixIndices = dict()
+		if not markers:
+			return
+
+		parts = sorted(markers.keys())
+		selectionList = om.MSelectionList()
+		for part in parts:
+			selectionList.add(markers[part].name())
+
+		dagPath = om.MDagPath()
+		for i, part in enumerate(parts):
+			selectionList.getDagPath(i, dagPath)
+			matrix = dagPath.inclusiveMatrix()
+			self._matrices.extend(matrix(row, column) for row in xrange(4) for column in xrange(4))
+			self._matrixIndices[part] = i
+
+	def _markerMatrices(self, markers):
+		'''Private Method. Returns the world matrix of each given markers
+
+		The mirrored markers are mirrored on the YZ plane, like SystemMarker.transform() does
+
+		Args:
+			markers (list of SystemMarker): The markers
+
+		Returns:
+			list of list of float: The 16 values of each matrix
+		'''
+		if self._matrices is None:
+			self._loadMatrices()
+		matrices = []
+		for marker in markers:
+			i = self._matrixIndices.get(marker.part())
+			if i is None:
+				matrix = marker.matrix()
+			else:
+				matrix = self._matrices[i*16:i*16+16].tolist()
+			if marker.mirrored():
+				matrix = [v * s for v, s in zip(matrix, MIRROR_SIGNS)]
+			matrices.append(matrix)
+		return matrices
+
+	def _matrixRows(self, markers, row):
+		'''Private Method. Returns the same row of the world matrix of each given markers
+
+		Args:
+			markers (list of SystemMarker): The markers
+			row (int): 0, 1, 2 for the x, y, z axis, 3 for the translation
+
+		Returns:
+			list of list of float
+		'''
+		return [matrix[row*4:row*4+3] for matrix in self._markerMatrices(markers)]
+
 	# ----------------------------------------------------------------------------------
 	# MISC
 	# ----------------------------------------------------------------------------------
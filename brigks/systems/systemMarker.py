@@ -7,7 +7,7 @@ from math3d.matrixN import Matrix4
 from math3d.vectorN import Vector3
 
 from brigks import naming
-from brigks.utils import create
+from brigks.utils import create, index
 
 class SystemMarker(object):
 
@@ -26,7 +26,7 @@ class SystemMarker(object):
 	def setMirrored(self, mirrored):
 		self._mirrored = mirrored
 		# Makes sure that the transform wasn't stored
-		self._matrix = None
+		# The world matrix is kept, it is mirrored when computing the transform
 		self._transformWithScale = None
 		self._transform = None
 		self._translation = None
@@ -56,6 +56,12 @@ class SystemMarker(object):
 	def name(self):
 		return self._marker
 
+	def part(self):
+		return self._marker.split("_")[-1]
+
+	def mirrored(self):
+		return self._mirrored
+
 	def rename(self, newName):
 		self._marker = self._find()
 		self._marker = cmds.rename(self._marker, newName)
@@ -70,7 +76,7 @@ class SystemMarker(object):
 	def _find(self):
 		modelName = self._marker.split("|")[1]
 		shortName = self._marker.split("|")[-1]
-		return [m for m in cmds.ls(shortName, long=True) if m.startswith("|"+modelName)][0]
+		return index.get(shortName, "|"+modelName)
 
 	# ----------------------------------------------------------------------------------
 	#  TRANSFORM
@@ -81,7 +87,10 @@ class SystemMarker(object):
 
 	def matrix(self):
 		if self._matrix is None:
-			self.transform()
+			# The system fetches the matrices of all its markers at once
+			self._matrix = self._system.markerMatrix(self.part())
+			if self._matrix is None:
+				self._matrix = cmds.xform(self._marker, q=True, matrix=True, worldSpace=True)
 		return self._matrix
 
 	def transformWithScale(self):
@@ -91,22 +100,20 @@ class SystemMarker(object):
 
 	def transform(self):
 		if self._transform is None:
-			self._matrix = cmds.xform(self._marker, q=True, matrix=True, worldSpace=True)
-			self._transformWithScale = Matrix4(self._matrix).asTransform()
+			self._transformWithScale = Matrix4(self.matrix()).asTransform()
 			if self._mirrored:
 				self._transformWithScale = self._transformWithScale.mirrored()
 
 			self._transform = copy(self._transformWithScale)
 			self._transform.scale = Vector3([1,1,1])
 			self._translation = self._transform.translation
-			self._scale = self._transform.scale
+			self._scale = self._transformWithScale.scale
 
 		return self._transform
 
 	def translation(self):
 		if self._translation is None:
-			translation = cmds.xform(self._marker, q=True, translation=True, worldSpace=True)
-			self._translation = Vector3(translation)
+			self._translation = Vector3(self.matrix()[12:15])
 			if self._mirrored:
 				self._translation.x = -self._translation.x
 
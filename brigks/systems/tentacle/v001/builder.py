@@ -6,72 +6,85 @@ from math3d.transformation import Transformation, TransformationArray
 from math3d.vectorN import Vector3
 
 from brigks import config
-from brigks.utils import attributes, create
+from brigks.utils import attributes, create, umath
 from brigks.systems.systemBuilder import SystemBuilder
 
 class TentacleSystemBuilder(SystemBuilder):
 	
-	def createObjects(self):
-
-		# Settings
-		self.isFk = "FK" in self.settings("kinematic")
-		self.isIk = "IK" in self.settings("kinematic")
-		self.isFkIk = self.isFk and self.isIk
-		self.isNotIk = self.isFk and not self.isIk
-		self.isNotFk = not self.isFk and self.isIk
-		
-		size = self.translations("Part")[0].distance(self.translations("Part")[1]) * 0.25
+	@classmethod
+	def computeTransforms(cls, source):
+		positions = source.translations("Part")
+		size = positions[0].distance(positions[1]) * 0.25
 		
 		# TRANSFORMATION
 		# Normal
-		if self.count("Part") > 2:
-			normal = Vector3.planeNormal(*self.translations("Part")[:3])
-			direction = self.translations("Part")[-1] - self.translations("Part")[0]
+		if source.count("Part") > 2:
+			normal = Vector3.planeNormal(*positions[:3])
+			direction = positions[-1] - positions[0]
 			if normal.length() < 1E-6:
-				normal = self.directions("Part1", "z")
-			if self.negate(): 
+				normal = source.directions("Part1", "z")
+			if source.negate(): 
 				normal *= -1
 		else:
-			direction = self.directions("Part1", "x")
-			normal = self.directions("Part1", "z")
+			direction = source.directions("Part1", "x")
+			normal = source.directions("Part1", "z")
 
-		boneTfm = TransformationArray.chain(self.translations("Part"), normal, negativeSide=self.negate(), endTransform=False)
+		boneTfm = TransformationArray.chain(positions, normal, negativeSide=source.negate(), endTransform=False)
 
-		d = [(self.translations("Part")[i],self.translations("Part")[i+1]) for i in range(self.count("Part")-1)]
-		self.distances = [Vector3.distance(a,b) for a,b in d]
+		distances = umath.distances(positions)
 		
-		endTfm = boneTfm[-1].copy(translation=self.translations("Part")[-1])
+		endTfm = boneTfm[-1].copy(translation=positions[-1])
 		boneTfm = boneTfm.appended(endTfm)
-		self.distances.append(0.0)
+		distances.append(0.0)
 
 		# Create extra transforms on end points
-		for i in xrange(self.settings("extraControllers")):
-			extraPos = Vector(self.settings("extraControllerSpacing")*(i+1),0,0) * endTfm
+		for i in xrange(source.settings("extraControllers")):
+			extraPos = Vector(source.settings("extraControllerSpacing")*(i+1),0,0) * endTfm
 			extraTfm = endTfm.copy(translation=extraPos)
 			boneTfm = boneTfm.appended(extraTfm)
-			self.distances.append(0.0)
+			distances.append(0.0)
 
-
-		self.setSettings(count=len(self.distances), lengths=self.distances)
-
-		self.initialCount = self.count("Part")
-		
-		if self.settings("setNeutralPose"):
+		if source.settings("setNeutralPose"):
 			bfrTfm = boneTfm
 		else:
 			bfrTfm = [tfm.copy(rotation=boneTfm[max(i-1,0)].quaternion) for i, tfm in enumerate(boneTfm)]
 
-		if self.settings("dynamic"):
+		if source.settings("dynamic"):
 			
 			dynTfm = []
-			for i, posA in enumerate(self.translations()[:-1]):
-				posB = self.translations()[i+1]
-				dynTfm.append(Transform.LookingAt(posA, posB, normal, self.nsign()+"yz", self.negate()))
-
-		self.normal = normal.copy()
-		self.normal.normalize()
-		self.direction = direction.copy()
-		self.direction.normalize()
+			for i, posA in enumerate(source.translations()[:-1]):
+				posB = source.translations()[i+1]
+				dynTfm.append(Transform.LookingAt(posA, posB, normal, source.nsign()+"yz", source.negate()))
+
+		normal = normal.copy()
+		normal.normalize()
+		direction = direction.copy()
+		direction.normalize()
+
+		return dict(size=size, distances=distances, boneTfm=boneTfm, bfrTfm=bfrTfm, normal=normal, direction=direction)
+	
+	def createObjects(self):
+
+		# Settings
+		self.isFk = "FK" in self.settings("kinematic")
+		self.isIk = "IK" in self.settings("kinematic")
+		self.isFkIk = self.isFk and self.isIk
+		self.isNotIk = self.isFk and not self.isIk
+		self.isNotFk = not self.isFk and self.isIk
+		
+		# TRANSFORMATION
+		data = self.transformsData()
+		size = data["size"]
+		boneTfm = data["boneTfm"]
+		bfrTfm = data["bfrTfm"]
+
+		self.distances = data["distances"]
+		self.setSettings(count=len(self.distances), lengths=self.distances)
+
+		self.initialCount = self.count("Part")
+
+		self.normal = data["normal"]
+		self.direction = data["direction"]
 
 		# OBJECTS
 
@@ -9,28 +9,40 @@ from brigks import config
 
 class TwistSystemBuilder(SystemBuilder):
 
-	def createObjects(self):
-
-		self.axis = self.settings("axis").lower()
+	@classmethod
+	def computeTransforms(cls, source):
+		axis = source.settings("axis").lower()
 
 		# TRANSFORMATIONS
-		positions = self.translations("Part")
+		positions = source.translations("Part")
 
 		# Normal
-		if self.count("Part") > 2:
+		if source.count("Part") > 2:
 			normal = Vector3.planeNormal(*positions[:3])
 			if normal.length() < 1E-6:
-				normal = self.directions("Part1", "z")
+				normal = source.directions("Part1", "z")
 		else:
-			normal = self.directions("Part1", "z")
+			normal = source.directions("Part1", "z")
 
-		ctlTfm = TransformationArray.chain(positions, normal, axis=self.axis+"z", negativeSide=self.negate(), endTransform=True)
+		ctlTfm = TransformationArray.chain(positions, normal, axis=axis+"z", negativeSide=source.negate(), endTransform=True)
 
 		divTfm = Transformation()
-		if self.negate():
+		if source.negate():
 			divTfm.scaling = Vector3([-1,-1,-1])
 
-		length = self.translations("Part1").distance(self.translations("Part2")) / 5.0
+		length = source.translations("Part1").distance(source.translations("Part2")) / 5.0
+
+		return dict(ctlTfm=ctlTfm, divTfm=divTfm, length=length)
+
+	def createObjects(self):
+
+		self.axis = self.settings("axis").lower()
+
+		# TRANSFORMATIONS
+		data = self.transformsData()
+		ctlTfm = data["ctlTfm"]
+		divTfm = data["divTfm"]
+		length = data["length"]
 
 
 		# CONTROLLERS
@@ -161,6 +173,9 @@ class TwistSystemBuilder(SystemBuilder):
 			cmds.connectAttr(lengthRatioNode+".input1X", lengthRatioNode+".input2Y")
 			cmds.connectAttr(lengthRatioNode+".input2X", lengthRatioNode+".input1Y")
 
+		if self.settings("scaleWithControllers") and self.settings("scaleWithInterControllers"):
+			centerPositions = Vector3Array([cmds.xform(ctr, q=True, worldSpace=True, translation=True) for ctr in self._centers])
+
 		# Divisions
 		step = 1.0 / (self.settings("interDeformers") + 1.0)
 		for i, div in enumerate(self.interDiv, start=self.start_iter):
@@ -199,10 +214,7 @@ class TwistSystemBuilder(SystemBuilder):
 			if self.settings("scaleWithControllers"):
 				if self.settings("scaleWithInterControllers"):
 					dt = Vector3(cmds.xform(div, q=True, worldSpace=True, translation=True))
-					ct = [cmds.xform(ctr, q=True, worldSpace=True, translation=True) for ctr in self._centers]
-					ct = [Vector3(x) for x in ct]
-
-					lengths = [dt.distance(v) for v in ct]
+					lengths = umath.distancesTo(dt, centerPositions)
 					sortedLengths = sorted(lengths)
 
 					refA = lengths.index(sortedLengths[0])
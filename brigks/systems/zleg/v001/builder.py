@@ -15,64 +15,89 @@ class ZlegSystemBuilder(SystemBuilder):
 
 	twp = ["Upr", "Mid", "Lwr"]
 
-	def createObjects(self):
+	@classmethod
+	def computeTransforms(cls, source):
 
 		# TRANSFORMATIONS
-		positions = Vector3Array([self.translations("Root"), self.translations("Knee"), self.translations("Ankle"), self.translations("Toe")])
+		positions = Vector3Array([source.translations("Root"), source.translations("Knee"), source.translations("Ankle"), source.translations("Toe")])
 		normal = Vector3.planeNormal(*positions[:3])
 		oriNormal = normal.copy()
-		if self.negate():
+		if source.negate():
 			normal *= -1
 		
 		d = [(positions[i],positions[i+1]) for i in range(3)]
-		self.lengths = [Vector3.distance(a,b) for a,b in d]
-		self.lengths.append(1)
-		ratio = self.lengths[0] / sum(self.lengths[:2])
-		self.setSettings(lengths=self.lengths[:3])
+		lengths = [Vector3.distance(a,b) for a,b in d]
+		lengths.append(1)
+		ratio = lengths[0] / sum(lengths[:2])
 		
 		# root
-		rootTfm = Transformation.fromParts(translation=self.translations("Root"))
+		rootTfm = Transformation.fromParts(translation=source.translations("Root"))
 
 		# fk
-		fkTfm = TransformationArray.chain(positions, normal, axis="xz", negativeSide=self.negate(), endTransform=False)
-		lookAtEff = self.translations("Eff") - self.translations("Toe")
-		fk3Tfm = Transformation.lookAt(self.translations("Toe"), lookAtEff, constants.AXIS_Y, "y-x", self.negate())
+		fkTfm = TransformationArray.chain(positions, normal, axis="xz", negativeSide=source.negate(), endTransform=False)
+		lookAtEff = source.translations("Eff") - source.translations("Toe")
+		fk3Tfm = Transformation.lookAt(source.translations("Toe"), lookAtEff, constants.AXIS_Y, "y-x", source.negate())
 		fkTfm = fkTfm.appended(fk3Tfm)
-		for tfm, dist in izip(fkTfm, self.lengths):
-			tfm.scale = Vector3([dist * self.factor(), self.factor(), self.factor()])
+		for tfm, dist in izip(fkTfm, lengths):
+			tfm.scale = Vector3([dist * source.factor(), source.factor(), source.factor()])
 		bfrTfm = [tfm.copy(rotation=fkTfm[max(i-1,0)].rotation) for i, tfm in enumerate(fkTfm)]
-		bfrTfm[0] = Transformation.lookAt(self.translations("Root"), constants.AXIS_NY, constants.AXIS_X, "x"+self.nsign()+"z", self.negate())
+		bfrTfm[0] = Transformation.lookAt(source.translations("Root"), constants.AXIS_NY, constants.AXIS_X, "x"+source.nsign()+"z", source.negate())
 		scale = bfrTfm[0].scale
-		scale.x *= self.lengths[0]
+		scale.x *= lengths[0]
 		bfrTfm[0].scale = scale
 		
 		# ik
-		ikbfrPos = Vector3([self.translations("Root").x, self.translations("Toe").y, self.translations("Root").z])
+		ikbfrPos = Vector3([source.translations("Root").x, source.translations("Toe").y, source.translations("Root").z])
 		ikbfrTfm = Transformation.fromParts(translation=ikbfrPos)
-		ikTfm = Transformation.lookAt(self.translations("Toe"), lookAtEff, constants.AXIS_Y, "zy", False)
+		ikTfm = Transformation.lookAt(source.translations("Toe"), lookAtEff, constants.AXIS_Y, "zy", False)
 		
-		upvbfrTfm = Transformation.fromParts(translation=umath.upVector(self.translations("Root"), ikbfrPos, constants.AXIS_NX, ratio, False))
-		upvTfm = Transformation.fromParts(translation=umath.upVector(self.translations("Root"), self.translations("Ankle"), oriNormal, ratio))
+		upvbfrTfm = Transformation.fromParts(translation=umath.upVector(source.translations("Root"), ikbfrPos, constants.AXIS_NX, ratio, False))
+		upvTfm = Transformation.fromParts(translation=umath.upVector(source.translations("Root"), source.translations("Ankle"), oriNormal, ratio))
 		
-		rollNormal = Vector3.planeNormal(self.translations("Root"), upvTfm.translation, self.translations("Toe"))
-		if self.negate():
+		rollNormal = Vector3.planeNormal(source.translations("Root"), upvTfm.translation, source.translations("Toe"))
+		if source.negate():
 			rollNormal *= -1
-		direction = self.translations("Root") - self.translations("Toe") 
-		rollbfrTfm = Transformation.lookAt(self.translations("Toe"), direction, rollNormal, "y-x", self.negate())
-		direction = self.translations("Ankle") - self.translations("Toe") 
-		rollTfm = Transformation.lookAt(self.translations("Toe"), direction, normal, "y-x", self.negate())
+		direction = source.translations("Root") - source.translations("Toe") 
+		rollbfrTfm = Transformation.lookAt(source.translations("Toe"), direction, rollNormal, "y-x", source.negate())
+		direction = source.translations("Ankle") - source.translations("Toe") 
+		rollTfm = Transformation.lookAt(source.translations("Toe"), direction, normal, "y-x", source.negate())
 
 		# extras
-		scale = Vector3([self.factor(), self.factor(), self.factor()])
+		scale = Vector3([source.factor(), source.factor(), source.factor()])
 		twisterTfm = {}
 		interTfm = {}
-		for i, (p, pos) in enumerate(izip(self.twp, positions[1:4])):
+		for i, (p, pos) in enumerate(izip(cls.twp, positions[1:4])):
 			twisterTfm[p] = [fkTfm[i].copy(scale=scale), fkTfm[i].copy(translation=pos, scale=scale)]
 			interPos = twisterTfm[p][0].translation.lerp(twisterTfm[p][1].translation, .5)
 			interTfm[p] = twisterTfm[p][0].copy(translation=interPos)
 			
 		ctrATfm = twisterTfm["Mid"][0]
 		ctrBTfm = twisterTfm["Lwr"][0]
+
+		return dict(lengths=lengths, rootTfm=rootTfm, fkTfm=fkTfm, bfrTfm=bfrTfm, ikbfrTfm=ikbfrTfm, ikTfm=ikTfm,
+				upvbfrTfm=upvbfrTfm, upvTfm=upvTfm, rollbfrTfm=rollbfrTfm, rollTfm=rollTfm,
+				twisterTfm=twisterTfm, interTfm=interTfm, ctrATfm=ctrATfm, ctrBTfm=ctrBTfm)
+
+	def createObjects(self):
+		data = self.transformsData()
+
+		# TRANSFORMATIONS
+		self.lengths = data["lengths"]
+		self.setSettings(lengths=self.lengths[:3])
+
+		rootTfm = data["rootTfm"]
+		fkTfm = data["fkTfm"]
+		bfrTfm = data["bfrTfm"]
+		ikbfrTfm = data["ikbfrTfm"]
+		ikTfm = data["ikTfm"]
+		upvbfrTfm = data["upvbfrTfm"]
+		upvTfm = data["upvTfm"]
+		rollbfrTfm = data["rollbfrTfm"]
+		rollTfm = data["rollTfm"]
+		twisterTfm = data["twisterTfm"]
+		interTfm = data["interTfm"]
+		ctrATfm = data["ctrATfm"]
+		ctrBTfm = data["ctrBTfm"]
 		
 		
 		# CONTROLLERS
@@ -188,7 +188,7 @@ class TreeWidget(QTreeWidget):
 
 @context.command()
 def fromHarbie():
-	from brigks.utils.convert import convertXmlHarbie
+	from brigks.utils.convert import convertXmlHarbieFile
 	# Convert the Harbie template to Brigks
 	path = r"K:\Departments\Rigging\Prefab\Harbie\Templates\biped_AllXML.xml"
 	outputFPath = r"\\source\source\dev\passerin\brigks\brigks\tests\harbieFullBiped.xml"
@@ -196,8 +196,7 @@ def fromHarbie():
 
 	start = dt.now()
 
-	xmlHarbie = etree.parse(path).getroot()
-	xmlRoot = convertXmlHarbie(xmlHarbie, useSymmetrySystems=False)
+	xmlRoot = convertXmlHarbieFile(path, useSymmetrySystems=False)
 	xmldom.indent(xmlRoot)
 	tree = etree.ElementTree(xmlRoot)
 	tree.write(outputFPath)
@@ -205,7 +204,7 @@ def fromHarbie():
 	logging.info("Conversion Full {t}".format(t=(dt.now() - start)))
 	start = dt.now()
 
-	xmlRoot = convertXmlHarbie(xmlHarbie, useSymmetrySystems=True)
+	xmlRoot = convertXmlHarbieFile(path, useSymmetrySystems=True)
 	xmldom.indent(xmlRoot)
 	tree = etree.ElementTree(xmlRoot)
 	tree.write(outputXPath)
@@ -0,0 +1,236 @@
+'''Benchmark Module
+
+Time the main stages of Brigks on the bundled templates and on synthetic guides.
+Results are saved by label (ie: the commit hash) so scaling curves can be compared between commits.
+
+This is meant to run headless in mayapy, but also works in an interactive session
+
+	import maya.standalone
+	maya.standalone.initialize()
+
+	from brigks.tests import benchmark
+	results = benchmark.run("c00a352")
+	benchmark.save(results, r"C:/temp/brigksBenchmark.json")
+	benchmark.compare(r"C:/temp/brigksBenchmark.json", "a5043ef", "c00a352")
+'''
+import os.path
+import json
+import time
+import datetime
+import logging
+import contextlib
+import xml.etree.cElementTree as etree
+from collections import OrderedDict
+
+from maya import cmds
+
+from math3d.transformation import Transformation
+from math3d.vectorN import Vector3
+
+import brigks
+from brigks import Guide
+
+TEMPLATES = ["harbie_biped", "harbie_biped_X"]
+SIZES = [10, 30, 100, 300, 1000]
+HARBIE_PATH = os.path.join(os.path.dirname(__file__), "harbieFullBiped.xml")
+
+def run(label, templates=TEMPLATES, sizes=SIZES, harbiePath=HARBIE_PATH):
+	'''Run the benchmarks
+
+	Args:
+		label (str): Label of the results, ie: the commit hash
+		templates (list of str): Name of the templates to benchmark (See brigks/templates)
+		sizes (list of int): Number of systems of the synthetic guides to benchmark
+		harbiePath (str||None): Path to a Harbie xml to benchmark the conversion. Defaults to the bundled full biped. None to skip it
+
+	Returns:
+		dict: The results
+	'''
+	results = OrderedDict()
+	results["label"] = label
+	results["date"] = str(datetime.datetime.now())
+	results["maya"] = cmds.about(version=True)
+	results["cases"] = OrderedDict()
+
+	if harbiePath:
+		results["cases"]["convert"] = benchmarkConvert(harbiePath)
+
+	root = brigks.__path__[0]
+	for template in templates:
+		path = os.path.join(root, "templates", template+".xml")
+		results["cases"][template] = benchmarkTemplate(path)
+
+	for size in sizes:
+		results["cases"]["synthetic{}".format(size)] = benchmarkSynthetic(size)
+
+	return results
+
+def benchmarkConvert(path):
+	'''Time the conversion of a Harbie xml to a Brigks Guide
+
+	Args:
+		path (str): Path to the Harbie xml
+
+	Returns:
+		dict: Time of each stage in seconds
+	'''
+	from brigks.utils.convert import convertXmlHarbie, convertXmlHarbieFile
+
+	timings = OrderedDict()
+	with _timer(timings, "parse"):
+		xmlHarbie = etree.parse(path).getroot()
+	with _timer(timings, "convert"):
+		convertXmlHarbie(xmlHarbie, useSymmetrySystems=False)
+	with _timer(timings, "convertX"):
+		convertXmlHarbie(xmlHarbie, useSymmetrySystems=True)
+	with _timer(timings, "convertFile"):
+		convertXmlHarbieFile(path, useSymmetrySystems=False)
+	return timings
+
+def benchmarkTemplate(path):
+	'''Time the load, build, rebuild and delete of a Guide template
+
+	The Guide is loaded again from its model, with and without lazy loading of the systems
+
+	Args:
+		path (str): Path to the Guide xml
+
+	Returns:
+		dict: Time of each stage in seconds
+	'''
+	cmds.file(new=True, force=True)
+
+	timings = OrderedDict()
+	with _timer(timings, "fromXml"):
+		guide = Guide.fromXml(path)
+	timings["systems"] = len(guide._getAllSystems())
+	with _timer(timings, "load"):
+		Guide(guide.model())
+	with _timer(timings, "loadLazy"):
+		Guide(guide.model(), lazy=True)
+
+	_benchmarkBuild(guide, timings)
+	return timings
+
+def benchmarkSynthetic(count):
+	'''Time the creation, build, rebuild and delete of a synthetic Guide
+
+	Args:
+		count (int): Number of systems in the Guide
+
+	Returns:
+		dict: Time of each stage in seconds
+	'''
+	cmds.file(new=True, force=True)
+
+	timings = OrderedDict()
+	with _timer(timings, "create"):
+		guide = createSyntheticGuide(count)
+	timings["systems"] = count
+
+	_benchmarkBuild(guide, timings)
+	return timings
+
+def createSyntheticGuide(count, columns=10):
+	'''Create a Guide with a grid of Basic systems, each connected to the previous one
+
+	Args:
+		count (int): Number of systems in the Guide
+		columns (int): Number of systems per row
+
+	Returns:
+		Guide
+	'''
+	guide = Guide()
+	layer = guide.addLayer("Synthetic")
+
+	previous = None
+	for i in xrange(count):
+		x = (i % columns) * 4
+		y = (i // columns) * 4
+		matrices = dict(
+			Part1=Transformation.fromParts(translation=Vector3([x, y, 0])),
+			Part2=Transformation.fromParts(translation=Vector3([x+2, y, 0])),
+			)
+		system = layer.addSystem("basic", "M", "Basic{}".format(i), matrices)
+		if previous is not None:
+			system.addConnection("Part1", "slotParent", key=previous.key(), slot="Part2")
+		previous = system
+
+	guide.commit()
+	return guide
+
+def save(results, path):
+	'''Add the results to a json file. Results with the same label are replaced
+
+	Args:
+		results (dict): The results returned by run()
+		path (str): Path of the json file
+	'''
+	data = OrderedDict()
+	if os.path.exists(path):
+		with open(path, "r") as f:
+			data = json.load(f, object_pairs_hook=OrderedDict)
+
+	data[results["label"]] = results
+	with open(path, "w") as f:
+		json.dump(data, f, indent=4)
+
+def compare(path, labelA, labelB):
+	'''Log the ratio between two results for each case and stage
+
+	Args:
+		path (str): Path of the json file
+		labelA (str): Label of the reference results
+		labelB (str): Label of the results to compare
+
+	Returns:
+		dict of dict: For each case and stage, the ratio B/A
+	'''
+	with open(path, "r") as f:
+		data = json.load(f, object_pairs_hook=OrderedDict)
+
+	casesA = data[labelA]["cases"]
+	casesB = data[labelB]["cases"]
+
+	ratios = OrderedDict()
+	for case, timingsA in casesA.iteritems():
+		if case not in casesB:
+			continue
+		ratios[case] = OrderedDict()
+		for stage, timeA in timingsA.iteritems():
+			if stage == "systems" or stage not in casesB[case] or not timeA:
+				continue
+			ratios[case][stage] = casesB[case][stage] / timeA
+			msg = "{c} {s}: {a:.3f}s -> {b:.3f}s (x{r:.2f})"
+			logging.info(msg.format(c=case, s=stage, a=timeA, b=casesB[case][stage], r=ratios[case][stage]))
+
+	return ratios
+
+# ----------------------------------------------------------------------------------
+# PRIVATE
+# ----------------------------------------------------------------------------------
+def _benchmarkBuild(guide, timings):
+	'''Private Method. Time the build, rebuild and delete of the Guide, then the build and rebuild without undo
+	'''
+	with _timer(timings, "build"):
+		guide.build(fast=False)
+	with _timer(timings, "rebuild"):
+		guide.build(fast=False)
+	with _timer(timings, "delete"):
+		guide.delete()
+
+	with _timer(timings, "buildFast"):
+		guide.build(fast=True)
+	with _timer(timings, "rebuildFast"):
+		guide.build(fast=True)
+	guide.delete()
+
+@contextlib.contextmanager
+def _timer(timings, stage):
+	'''Private Method. A context storing the time spent in seconds
+	'''
+	start = time.time()
+	yield
+	timings[stage] = time.time() - start
+	logging.info("{s} {t:.3f}s".format(s=stage, t=timings[stage]))
@@ -0,0 +1,204 @@
+'''Service Test Module
+
+Tests the build service with a stand-in runner, so it runs without Maya.
+The real runner is tested with a stand-in of maya.cmds and of the Guide, installed by the worker initializer.
+The tests are imported from this folder, not from the brigks.tests package which needs Maya.
+
+	python -m unittest discover -s brigks/tests -p "test_*.py"
+'''
+import os
+import sys
+import time
+import json
+import types
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+import xml.etree.cElementTree as etree
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT not in sys.path:
+	sys.path.insert(0, ROOT)
+
+from brigks.utils import service
+
+RUNNER = "test_service.standInJob"
+INITIALIZER = "test_service.initStandInMaya"
+TEMPLATE = os.path.join(ROOT, "brigks", "templates", "harbie_biped.xml")
+WORKERS = 2
+DURATION = .5
+
+def standInJob(guidePath, scenePath):
+	'''Stand-in of buildJob. Waits instead of building, and fails for the "failed.xml" guide
+
+	Returns:
+		dict: The timings of the stages of the job
+	'''
+	if guidePath == "failed.xml":
+		raise ValueError("Stand-in failure")
+	time.sleep(DURATION)
+	return dict(build=DURATION)
+
+class StandInCmds(object):
+	'''Stand-in of maya.cmds. Records the created nodes and saves them as json
+	'''
+	def __init__(self):
+		self.path = None
+		self.nodes = []
+
+	def file(self, *args, **kwargs):
+		if kwargs.get("new"):
+			self.path = None
+			self.nodes = []
+		elif "rename" in kwargs:
+			self.path = kwargs["rename"]
+		elif kwargs.get("save"):
+			with open(self.path, "w") as f:
+				json.dump(dict(type=kwargs["type"], nodes=self.nodes), f)
+
+	def createNode(self, nodeType, name=None, **kwargs):
+		self.nodes.append(name)
+		return name
+
+class StandInGuide(object):
+	'''Stand-in of the Guide, which needs the Maya API and math3d. Creates one node per system
+	'''
+	def __init__(self, keys):
+		self._keys = keys
+
+	@classmethod
+	def fromXml(cls, path):
+		return cls([xmlSystem.get("key") for xmlSystem in etree.parse(path).iter("System")])
+
+	def build(self):
+		from maya import cmds
+		for key in self._keys:
+			cmds.createNode("transform", name=key)
+
+def initStandInMaya():
+	'''Stand-in of initMaya. Installs the stand-ins of maya.cmds and of the Guide in the worker
+	'''
+	import brigks
+
+	maya = types.ModuleType("maya")
+	maya.cmds = StandInCmds()
+	sys.modules["maya"] = maya
+	sys.modules["maya.cmds"] = maya.cmds
+	brigks.Guide = StandInGuide
+
+def _getFreePort():
+	'''Returns a port available on the local host
+	'''
+	sock = socket.socket()
+	sock.bind(("localhost", 0))
+	port = sock.getsockname()[1]
+	sock.close()
+	return port
+
+class BuildServiceTest(unittest.TestCase):
+
+	def setUp(self):
+		self.service = service.BuildService(workers=WORKERS, runner=RUNNER, initializer=None)
+
+	def tearDown(self):
+		self.service.stop()
+
+	def test_concurrentJobs(self):
+		start = time.time()
+		jobIds = [self.service.submit("guide%s.xml"%i, "scene%s.ma"%i) for i in xrange(WORKERS)]
+		results = [self.service.result(jobId) for jobId in jobIds]
+
+		# The jobs ran at the same time, one per worker
+		self.assertLess(time.time() - start, DURATION * WORKERS)
+		self.assertEqual(len(set(result["pid"] for result in results)), WORKERS)
+		for i, result in enumerate(results):
+			self.assertEqual(result["status"], "done")
+			self.assertEqual(result["guide"], "guide%s.xml"%i)
+			self.assertEqual(result["timings"]["build"], DURATION)
+		self.assertEqual(self.service.pending(), [])
+
+	def test_failedJob(self):
+		result = self.service.result(self.service.submit("failed.xml", "scene.ma"))
+		self.assertEqual(result["status"], "failed")
+		self.assertEqual(result["error"], "ValueError: Stand-in failure")
+
+	def test_pendingJob(self):
+		jobId = self.service.submit("guide.xml", "scene.ma")
+		self.assertIsNone(self.service.result(jobId, timeout=0))
+		self.assertEqual(self.service.pending(), [jobId])
+		self.assertEqual(self.service.result(jobId)["status"], "done")
+
+	def test_unknownJob(self):
+		self.assertRaises(KeyError, self.service.result, "unknown")
+
+class BuildClientTest(unittest.TestCase):
+
+	def setUp(self):
+		self.address = ("localhost", _getFreePort())
+		self.service = service.BuildService(workers=WORKERS, address=self.address, runner=RUNNER, initializer=None)
+		self.thread = threading.Thread(target=self.service.serve)
+		self.thread.daemon = True
+		self.thread.start()
+		self.client = self._connect()
+
+	def tearDown(self):
+		if self.thread.is_alive():
+			self._connect().stop()
+			self.thread.join(10)
+
+	def _connect(self):
+		'''Connects to the service, once it's listening
+		'''
+		for i in xrange(50):
+			try:
+				return service.BuildClient(self.address)
+			except socket.error:
+				time.sleep(.1)
+		self.fail("The service is not listening")
+
+	def test_build(self):
+		jobIds = [self.client.build("guide%s.xml"%i, "scene%s.ma"%i) for i in xrange(WORKERS)]
+		jobIds.append(self.client.build("failed.xml", "scene.ma"))
+
+		results = [self.client.result(jobId) for jobId in jobIds]
+		self.assertEqual([result["status"] for result in results], ["done"] * WORKERS + ["failed"])
+		self.assertEqual(self.client.pending(), [])
+		self.client.close()
+
+	def test_unknownAction(self):
+		self.assertRaises(RuntimeError, self.client._request, action="unknown")
+		self.client.close()
+
+	def test_stop(self):
+		self.client.stop()
+		self.thread.join(10)
+		self.assertFalse(self.thread.is_alive())
+
+class BuildJobTest(unittest.TestCase):
+
+	def setUp(self):
+		self.folder = tempfile.mkdtemp()
+		self.service = service.BuildService(workers=1, initializer=INITIALIZER)
+
+	def tearDown(self):
+		self.service.stop()
+		shutil.rmtree(self.folder)
+
+	def test_buildJob(self):
+		keys = [xmlSystem.get("key") for xmlSystem in etree.parse(TEMPLATE).iter("System")]
+		for ext, sceneType in [(".ma", "mayaAscii"), (".mb", "mayaBinary")]:
+			scenePath = os.path.join(self.folder, "scene"+ext)
+			result = self.service.result(self.service.submit(TEMPLATE, scenePath))
+			self.assertEqual(result["status"], "done", result["error"])
+			self.assertEqual(sorted(result["timings"]), ["build", "load", "new", "save", "total", "wait"])
+
+			# The new scene only has the nodes of the guide
+			with open(scenePath) as f:
+				scene = json.load(f)
+			self.assertEqual(scene["type"], sceneType)
+			self.assertEqual(scene["nodes"], keys)
+
+if __name__ == "__main__":
+	unittest.main()
@@ -9,7 +9,7 @@ from math3d.transformation import TransformationArray, Transformation
 from math3d.vectorN import Vector3
 from math3d.matrixN import Matrix4
 
-from brigks.utils import constants
+from brigks.utils import constants, plan
 
 # ----------------------------------------------------------------------------------
 # ATTRIBUTES
@@ -99,6 +99,10 @@ def setKeyables(node, attrs=None, lock=True):
 		node (str): Node to update
 		attrs (list of str): The transform attributes to make keyable. The attribute not in this list will be non-keyable
 	'''
+	if plan.planned(node):
+		plan.active().setKeyables(node, attrs, lock)
+		return
+
 	if attrs is None:
 		attrs = constants.ATTRS_TRS
 
@@ -118,6 +122,10 @@ def setRotOrder(node, rotOrder):
 		node (str): Node to update
 		rotOrder (str): rotation order ["xyz", "yzx", "zxy", "xzy", "yxz", "zyx"]
 	'''
+	if plan.planned(node):
+		plan.active().setRotOrder(node, rotOrder)
+		return
+
 	matrix = cmds.xform(node, q=True, matrix=True, worldSpace=True)
 	cmds.setAttr(node+".rotateOrder", constants.ROT_ORDERS.index(rotOrder.lower()))
 	cmds.xform(node, matrix=matrix, worldSpace=True)
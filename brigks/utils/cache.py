@@ -0,0 +1,213 @@
+'''Cache Module
+
+This modules provides an on disk cache of the results of the systems builds.
+The entries are keyed by a hash of everything the build of a system depends on
+(See SystemBuilder.cacheKey), so the same system built with the same inputs is read from the cache.
+
+The size of the cache is bounded, the least recently used entries are evicted first.
+
+	cache = BuildCache(r"C:/temp/brigksCache", maxSize=500)
+	data = cache.get(key)
+	if data is None:
+		cache.set(key, computeData())
+	cache.evict()
+'''
+import os
+import sys
+import hashlib
+import cPickle as pickle
+import logging
+
+EXTENSION = ".pkl"
+
+_codeHashes = {}
+
+class BuildCache(object):
+	'''Content addressed cache of the systems build results, with LRU eviction
+	'''
+	def __init__(self, folder, maxSize=500):
+		'''BuildCache Init
+
+		Args:
+			folder (str): Folder of the cache. Created if needed
+			maxSize (float): Maximum size of the cache in MB
+
+		Returns:
+			BuildCache
+		'''
+		self._folder = folder
+		self._maxSize = maxSize * 1024 * 1024
+		self._hits = 0
+		self._misses = 0
+		if not os.path.exists(folder):
+			os.makedirs(folder)
+
+	def folder(self):
+		return self._folder
+
+	def stats(self):
+		'''Returns the number of hits and misses since the cache was opened
+
+		Returns:
+			dict
+		'''
+		return dict(hits=self._hits, misses=self._misses)
+
+	def get(self, key):
+		'''Returns the data stored for the given key
+
+		Args:
+			key (str): The hash of the inputs
+
+		Returns:
+			any||None: None if the key is not in the cache
+		'''
+		path = self._path(key)
+		try:
+			with open(path, "rb") as f:
+				data = pickle.load(f)
+		except (IOError, EOFError, pickle.UnpicklingError):
+			self._misses += 1
+			return
+
+		# The modification time is the last time the entry was used
+		os.utime(path, None)
+		self._hits += 1
+		return data
+
+	def set(self, key, data):
+		'''Store the data for the given key
+
+		Args:
+			key (str): The hash of the inputs
+			data (any): Data to store. Must be picklable
+
+		Returns:
+			bool: False if the data couldn't be stored
+		'''
+		path = self._path(key)
+		tmpPath = path + ".tmp"
+		try:
+			with open(tmpPath, "wb") as f:
+				pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+		except (IOError, pickle.PicklingError, TypeError) as e:
+			logging.warning("Brigks: Can't cache {k}: {e}".format(k=key, e=e))
+			if os.path.exists(tmpPath):
+				os.remove(tmpPath)
+			return False
+
+		# Replaces the entry at once, so concurrent builds never read a partial file
+		if os.path.exists(path):
+			os.remove(path)
+		os.rename(tmpPath, path)
+		return True
+
+	def evict(self):
+		'''Delete the least recently used entries until the cache fits its maximum size
+
+		Returns:
+			int: The number of entries deleted
+		'''
+		entries = []
+		for name in os.listdir(self._folder):
+			if not name.endswith(EXTENSION):
+				continue
+			path = os.path.join(self._folder, name)
+			stat = os.stat(path)
+			entries.append((stat.st_mtime, stat.st_size, path))
+
+		total = sum(size for _, size, _ in entries)
+		count = 0
+		for _, size, path in sorted(entries):
+			if total <= self._maxSize:
+				break
+			try:
+				os.remove(path)
+			except OSError:
+				continue
+			total -= size
+			count += 1
+		return count
+
+	def clear(self):
+		'''Delete all the entries of the cache
+		'''
+		for name in os.listdir(self._folder):
+			if name.endswith(EXTENSION):
+				os.remove(os.path.join(self._folder, name))
+
+	def _path(self, key):
+		'''Private Method. Returns the path of the file of the given key
+		'''
+		return os.path.join(self._folder, key+EXTENSION)
+
+# ----------------------------------------------------------------------------------
+# HASH
+# ----------------------------------------------------------------------------------
+def codeHash(cls):
+	'''Returns a hash of the source file of the given class
+
+	This is part of the cache keys, so the entries of a builder are not used anymore once its code changed.
+
+	Args:
+		cls (class): The class
+
+	Returns:
+		str
+	'''
+	return moduleHash(sys.modules[cls.__module__])
+
+def moduleHash(module):
+	'''Returns a hash of the source file of the given module
+
+	Args:
+		module (module): The module
+
+	Returns:
+		str
+	'''
+	if module.__name__ not in _codeHashes:
+		_codeHashes[module.__name__] = _fileHash(_sourcePath(module.__file__))
+	return _codeHashes[module.__name__]
+
+def packageHash(package):
+	'''Returns a hash of the source files of the given package and of its sub packages
+
+	This covers the modules of the package that are imported by the others.
+
+	Args:
+		package (module): The package, ie: math3d
+
+	Returns:
+		str
+	'''
+	if package.__name__ not in _codeHashes:
+		folder = os.path.dirname(package.__file__)
+		paths = set()
+		for root, dirs, files in os.walk(folder):
+			for f in files:
+				if os.path.splitext(f)[1].lower() in (".py", ".pyc", ".pyd", ".so"):
+					paths.add(_sourcePath(os.path.join(root, f)))
+
+		data = getattr(package, "__version__", "")
+		for path in sorted(paths):
+			data += os.path.relpath(path, folder) + _fileHash(path)
+		_codeHashes[package.__name__] = hashlib.md5(data).hexdigest()
+	return _codeHashes[package.__name__]
+
+# ----------------------------------------------------------------------------------
+# PRIVATE
+# ----------------------------------------------------------------------------------
+def _sourcePath(path):
+	'''Private Method. Returns the source file of a module file, or the file itself if it's compiled only
+	'''
+	base, ext = os.path.splitext(path)
+	if ext.lower() in (".pyc", ".pyo") and os.path.exists(base + ".py"):
+		return base + ".py"
+	return path
+
+def _fileHash(path):
+	'''Private Method. Returns the md5 hash of the content of a file
+	'''
+	with open(path, "rb") as f:
+		return hashlib.md5(f.read()).hexdigest()
@@ -10,7 +10,7 @@ from maya import OpenMaya as om
 
 from math3d.matrixN import Matrix4
 
-from brigks.utils import attributes, cast
+from brigks.utils import attributes, cast, constants, modifier, pool
 
 POINTAT_AXIS = ["X", "Y", "Z", "-X", "-Y", "-Z"]
 COMPARE_OPS = ["==", "!=", ">", ">=", "<", "<="]
@@ -33,32 +33,37 @@ def compare(name, first, second, operation):
 	if "{node}" not in name:
 		name += "{node}"
 
-	node = cmds.createNode("condition", name=name.format(node="Cond"))
+	node = modifier.createNode("condition", name=name.format(node="Cond"))
 
 	if isinstance(first, float) or isinstance(first, int):
-		cmds.setAttr(node+".firstTerm", first)
+		modifier.setAttr(node+".firstTerm", first)
 	else:
-		cmds.connectAttr(first, node+".firstTerm")
+		modifier.connectAttr(first, node+".firstTerm")
 
 	if isinstance(second, float) or isinstance(second, int):
-		cmds.setAttr(node+".secondTerm", second)
+		modifier.setAttr(node+".secondTerm", second)
 	else:
 		second = attribute.get(*second)
-		cmds.connectAttr(second, node+".secondTerm")
+		modifier.connectAttr(second, node+".secondTerm")
 
-	cmds.setAttr(node+".operation", COMPARE_OPS.index(operation))
+	modifier.setAttr(node+".operation", COMPARE_OPS.index(operation))
 
-	cmds.setAttr(node+".colorIfTrueR", 1)
-	cmds.setAttr(node+".colorIfFalseR", 0)
+	modifier.setAttr(node+".colorIfTrueR", 1)
+	modifier.setAttr(node+".colorIfFalseR", 0)
 
 	return node
 
 # ----------------------------------------------------------------------------------
 # TRANSFORMS - CONSTRAINTS
 # ----------------------------------------------------------------------------------
-def blendMatrix(name, slave, masters, maintainOffset=False, translate=True, rotate=True, scale=True, useJointOrient=False):
+def blendMatrix(name, slave, masters, maintainOffset=False, translate=True, rotate=True, scale=True, useJointOrient=False, useOffsetParentMatrix=False):
 	'''	Create a BlendMatrix nodes compound
 
+	With useOffsetParentMatrix, the blendMatrix drives the offsetParentMatrix of the slave directly,
+	without the multMatrix and decomposeMatrix nodes. The slave doesn't inherit the transform of its parent
+	and its local transform is reset. This is only possible when the whole transform is constrained,
+	the other cases are using the decomposeMatrix.
+
 	Args:
 		name (str): Name of the nodes
 		slave (str): The node to constraint
@@ -68,6 +73,7 @@ def blendMatrix(name, slave, masters, maintainOffset=False, translate=True, rota
 		rotate (bool): True to connect the rotate
 		scale (bool): True to connect the scale
 		useJointOrient (bool): For joints, True to connect the rotation to the jointOrient instead of the rotate
+		useOffsetParentMatrix (bool): True to drive the offsetParentMatrix of the slave (Maya 2020+)
 
 	Returns:
 		str: The blendMatrix node
@@ -75,13 +81,9 @@ def blendMatrix(name, slave, masters, maintainOffset=False, translate=True, rota
 	if "{node}" not in name:
 		name += "{node}"
 
-	bmNode = cmds.createNode("blendMatrix", name=name.format(node="BlendMatrix"))
-	mmNode = cmds.createNode("multMatrix", name=name.format(node="MulMatrix"))
-	dmNode = cmds.createNode("decomposeMatrix", name=name.format(node="DcpMatrix"))
+	isJoint = cmds.nodeType(slave) == "joint"
 
-	cmds.connectAttr(bmNode+".outputMatrix", mmNode+".matrixIn[0]")
-	cmds.connectAttr(slave+".parentInverseMatrix[0]", mmNode+".matrixIn[1]")
-	cmds.connectAttr(mmNode+".matrixSum", dmNode+".inputMatrix")
+	bmNode = modifier.createNode("blendMatrix", name=name.format(node="BlendMatrix"))
 
 	# Input
 	slaveMatrix = cmds.xform(slave, q=True, matrix=True, worldSpace=True)
@@ -92,25 +94,45 @@ def blendMatrix(name, slave, masters, maintainOffset=False, translate=True, rota
 			masterMatrix = Matrix4(masterMatrix)
 			offset = slaveMatrix * masterMatrix.inverse()
 
-			offNode = cmds.createNode("multMatrix", name=name+"{i}".format(node="Offset", i=i))
-			cmds.setAttr(offNode+".matrixIn[0]", offset.flattened(), type="matrix")
-			cmds.connectAttr(master+".worldMatrix[0]", offNode+".matrixIn[1]")
-			cmds.connectAttr(offNode+".matrixSum", bmNode+".target[{}].targetMatrix".format(i))
+			offNode = modifier.createNode("multMatrix", name=(name+"{i}").format(node="Offset", i=i))
+			modifier.setAttr(offNode+".matrixIn[0]", offset.flattened(), attrType="matrix")
+			modifier.connectAttr(master+".worldMatrix[0]", offNode+".matrixIn[1]")
+			modifier.connectAttr(offNode+".matrixSum", bmNode+".target[{}].targetMatrix".format(i))
 		else:
-			cmds.connectAttr(master+".worldMatrix[0]", bmNode+".target[{}].targetMatrix".format(i))
+			modifier.connectAttr(master+".worldMatrix[0]", bmNode+".target[{}].targetMatrix".format(i))
 
 	# Output
+	if useOffsetParentMatrix and translate and rotate and scale and not (isJoint and useJointOrient):
+		# The world matrix of the slave is the output of the blendMatrix
+		attributes.inheritsTransform(slave, False)
+		for attr in constants.ATTRS_TRS:
+			modifier.setAttr(slave+"."+attr, 1.0 if attr.startswith("s") else 0.0)
+		for attr in ["shearXY", "shearXZ", "shearYZ"]:
+			modifier.setAttr(slave+"."+attr, 0.0)
+		if isJoint:
+			for axis in "XYZ":
+				modifier.setAttr(slave+".jointOrient"+axis, 0.0)
+		modifier.connectAttr(bmNode+".outputMatrix", slave+".offsetParentMatrix", force=True)
+		return bmNode
+
+	mmNode = modifier.createNode("multMatrix", name=name.format(node="MulMatrix"))
+	dmNode = modifier.createNode("decomposeMatrix", name=name.format(node="DcpMatrix"))
+
+	modifier.connectAttr(bmNode+".outputMatrix", mmNode+".matrixIn[0]")
+	modifier.connectAttr(slave+".parentInverseMatrix[0]", mmNode+".matrixIn[1]")
+	modifier.connectAttr(mmNode+".matrixSum", dmNode+".inputMatrix")
+
 	if translate:
-		cmds.connectAttr(dmNode+".outputTranslate", slave+".translate", force=True)
+		modifier.connectAttr(dmNode+".outputTranslate", slave+".translate", force=True)
 	if rotate:
-		if cmds.nodeType(slave) == "joint" and useJointOrient:
-			cmds.connectAttr(dmNode+".outputRotate", slave+".jointOrient", force=True)
+		if isJoint and useJointOrient:
+			modifier.connectAttr(dmNode+".outputRotate", slave+".jointOrient", force=True)
 		else:
-			cmds.connectAttr(dmNode+".outputRotate", slave+".rotate", force=True)
+			modifier.connectAttr(dmNode+".outputRotate", slave+".rotate", force=True)
 
 	if scale:
-		cmds.connectAttr(dmNode+".outputScale", slave+".scale", force=True)
-		cmds.connectAttr(dmNode+".outputShear", slave+".shear", force=True)
+		modifier.connectAttr(dmNode+".outputScale", slave+".scale", force=True)
+		modifier.connectAttr(dmNode+".outputShear", slave+".shear", force=True)
 
 	return bmNode
 
@@ -132,32 +154,32 @@ def fkik2Bones(name, iks, fks, bones, lenA, lenB, neg):
 	if not cmds.pluginInfo("HarbieNodes", q=True, loaded=True):
 		cmds.loadPlugin("HarbieNodes")
 
-	fkikNode = cmds.createNode("FkIk2Bones", name=name.format(node="FKIK"))
+	fkikNode = modifier.createNode("FkIk2Bones", name=name.format(node="FKIK"))
 
 	for ctl, attr in izip(iks, ["Root", "effector", "upVector"]):
-		cmds.connectAttr(ctl+".worldMatrix[0]", fkikNode+"."+attr+"[0]")
+		modifier.connectAttr(ctl+".worldMatrix[0]", fkikNode+"."+attr+"[0]")
 
 	for ctl, attr in izip(fks, ["FkA", "FkB", "FkC"]):
-		cmds.connectAttr(ctl+".worldMatrix[0]", fkikNode+"."+attr+"[0]")
+		modifier.connectAttr(ctl+".worldMatrix[0]", fkikNode+"."+attr+"[0]")
 
-	cmds.setAttr(fkikNode+".lengthA", lenA)
-	cmds.setAttr(fkikNode+".lengthB", lenB)
-	cmds.setAttr(fkikNode+".negate", neg)
+	modifier.setAttr(fkikNode+".lengthA", lenA)
+	modifier.setAttr(fkikNode+".lengthB", lenB)
+	modifier.setAttr(fkikNode+".negate", neg)
 
 
 	for bone, s in izip(bones, "ABC"):
 		attributes.inheritsTransform(bone, False)
-		cmds.setAttr(bone+".shearXY", 0)
-		cmds.setAttr(bone+".shearXZ", 0)
-		cmds.setAttr(bone+".shearYZ", 0)
+		modifier.setAttr(bone+".shearXY", 0)
+		modifier.setAttr(bone+".shearXZ", 0)
+		modifier.setAttr(bone+".shearYZ", 0)
 
-		dmNode = cmds.createNode("decomposeMatrix", name=name+"{s}".format(node="FKIKDcpMat", s=s))
+		dmNode = modifier.createNode("decomposeMatrix", name=name+"{s}".format(node="FKIKDcpMat", s=s))
 
-		cmds.connectAttr(fkikNode+".bone{}Tfm".format(s), dmNode+".inputMatrix")
+		modifier.connectAttr(fkikNode+".bone{}Tfm".format(s), dmNode+".inputMatrix")
 
-		cmds.connectAttr(dmNode+".outputTranslate", bone+".translate")
-		cmds.connectAttr(dmNode+".outputRotate", bone+".rotate")
-		cmds.connectAttr(dmNode+".outputScale", bone+".scale")
+		modifier.connectAttr(dmNode+".outputTranslate", bone+".translate")
+		modifier.connectAttr(dmNode+".outputRotate", bone+".rotate")
+		modifier.connectAttr(dmNode+".outputScale", bone+".scale")
 
 	return fkikNode
 
@@ -196,16 +218,16 @@ def aimConstraint(name, slave, master, axis="xy", upMaster=None, upVector=None,
 
 	# UpVector
 	if upVector is None:
-		dmNode = cmds.createNode("decomposeMatrix", name=name.format(node="DcpMatrix"))
-		cmds.connectAttr(upMaster+".worldMatrix[0]", dmNode+".inputMatrix")
-		cmds.connectAttr(dmNode+".outputTranslate", cns+".worldUpVector")
+		dmNode = modifier.createNode("decomposeMatrix", name=name.format(node="DcpMatrix"))
+		modifier.connectAttr(upMaster+".worldMatrix[0]", dmNode+".inputMatrix")
+		modifier.connectAttr(dmNode+".outputTranslate", cns+".worldUpVector")
 	else:
-		cmds.setAttr(cns+".worldUpVectorX", upVector[0])
-		cmds.setAttr(cns+".worldUpVectorY", upVector[1])
-		cmds.setAttr(cns+".worldUpVectorZ", upVector[2])
+		modifier.setAttr(cns+".worldUpVectorX", upVector[0])
+		modifier.setAttr(cns+".worldUpVectorY", upVector[1])
+		modifier.setAttr(cns+".worldUpVectorZ", upVector[2])
 
 	if upMaster is not None:
-		cmds.connectAttr(upMaster+".worldMatrix[0]", cns+".worldUpMatrix")
+		modifier.connectAttr(upMaster+".worldMatrix[0]", cns+".worldUpMatrix")
 
 	# Direction Axis
 	aimAttr = ["aimVectorX", "aimVectorY", "aimVectorZ", "upVectorX", "upVectorY", "upVectorZ"]
@@ -214,7 +236,7 @@ def aimConstraint(name, slave, master, axis="xy", upMaster=None, upVector=None,
 	out["xyz".index(a[0])] = -1 if axis[0] == "-" else 1
 	out["xyz".index(a[1])+3] = -1 if axis[-2] == "-" else 1
 	for attr, value in izip(aimAttr, out):
-		cmds.setAttr(cns+"."+attr, value)
+		modifier.setAttr(cns+"."+attr, value)
 
 	return cns
 
@@ -282,21 +304,21 @@ def harmonic(name, slave, master, amplitude=1.0, decay=8.0, frequency=0.5, termi
 	if not cmds.pluginInfo("harmonics", q=True,  loaded=True):
 		cmds.loadPlugin("harmonics")
 
-	hNode = cmds.createNode("harmonics", name=name.format(node="Harmonic"))
+	hNode = modifier.createNode("harmonics", name=name.format(node="Harmonic"))
 
-	cmds.connectAttr(hNode+".output", slave+".translate")
-	cmds.connectAttr(master+".wm", hNode+".input")
-	cmds.connectAttr(master+".pim", hNode+".parentInverse")
-	cmds.connectAttr("time1.o", hNode+".timeIn")
+	modifier.connectAttr(hNode+".output", slave+".translate")
+	modifier.connectAttr(master+".wm", hNode+".input")
+	modifier.connectAttr(master+".pim", hNode+".parentInverse")
+	modifier.connectAttr("time1.o", hNode+".timeIn")
 
-	cmds.setAttr(hNode+".update", True)
-	cmds.setAttr(hNode+".amplitude", amplitude)
-	cmds.setAttr(hNode+".axisAmp0", amplitudeAxis[0])
-	cmds.setAttr(hNode+".axisAmp1", amplitudeAxis[1])
-	cmds.setAttr(hNode+".axisAmp2", amplitudeAxis[2])
-	cmds.setAttr(hNode+".decay", decay)
-	cmds.setAttr(hNode+".frequencyMult", frequency)
-	cmds.setAttr(hNode+".termination", termination)
+	modifier.setAttr(hNode+".update", True)
+	modifier.setAttr(hNode+".amplitude", amplitude)
+	modifier.setAttr(hNode+".axisAmp0", amplitudeAxis[0])
+	modifier.setAttr(hNode+".axisAmp1", amplitudeAxis[1])
+	modifier.setAttr(hNode+".axisAmp2", amplitudeAxis[2])
+	modifier.setAttr(hNode+".decay", decay)
+	modifier.setAttr(hNode+".frequencyMult", frequency)
+	modifier.setAttr(hNode+".termination", termination)
 
 	return hNode
 
@@ -321,13 +343,13 @@ def pointAtDoubleAxis(name, cns, masterA, masterB, axis="z"):
 	if not cmds.pluginInfo("HarbieNodes", q=True, loaded=True):
 		cmds.loadPlugin("HarbieNodes")
 
-	node = cmds.createNode("PointAtDoubleAxis", name=name.format(node="PtAtDouble"))
-	cmds.connectAttr(masterA+".worldMatrix[0]", node+".ref")
-	cmds.connectAttr(masterB+".worldMatrix[0]", node+".trk")
-	cmds.setAttr(node+".axis", "zy".index(axis))
+	node = modifier.createNode("PointAtDoubleAxis", name=name.format(node="PtAtDouble"))
+	modifier.connectAttr(masterA+".worldMatrix[0]", node+".ref")
+	modifier.connectAttr(masterB+".worldMatrix[0]", node+".trk")
+	modifier.setAttr(node+".axis", "zy".index(axis))
 
-	cmds.setAttr(cns+".worldUpType", 3)
-	cmds.connectAttr(node+".out", cns+".worldUpVector")
+	modifier.setAttr(cns+".worldUpType", 3)
+	modifier.connectAttr(node+".out", cns+".worldUpVector")
 
 def pointAtBlendedAxis(name, cns, masterA, masterB, blend=.5, axis="Z"):
 	'''	Create a pointAtBlendedAxis compound
@@ -348,15 +370,15 @@ def pointAtBlendedAxis(name, cns, masterA, masterB, blend=.5, axis="Z"):
 	if not cmds.pluginInfo("HarbieNodes", q=True, loaded=True):
 		cmds.loadPlugin("HarbieNodes")
 
-	node = cmds.createNode("PointAtBlendedAxis", name=name.format(node="PtAtBlended"))
-	cmds.connectAttr(masterA+".worldMatrix[0]", node+".mA")
-	cmds.connectAttr(masterB+".worldMatrix[0]", node+".mB")
+	node = modifier.createNode("PointAtBlendedAxis", name=name.format(node="PtAtBlended"))
+	modifier.connectAttr(masterA+".worldMatrix[0]", node+".mA")
+	modifier.connectAttr(masterB+".worldMatrix[0]", node+".mB")
 
-	cmds.setAttr(node+".axis", POINTAT_AXIS.index(axis))
-	cmds.setAttr(node+".blend", blend)
+	modifier.setAttr(node+".axis", POINTAT_AXIS.index(axis))
+	modifier.setAttr(node+".blend", blend)
 
-	cmds.setAttr(cns+".worldUpType", 3)
-	cmds.connectAttr(node+".out", cns+".worldUpVector")
+	modifier.setAttr(cns+".worldUpType", 3)
+	modifier.connectAttr(node+".out", cns+".worldUpVector")
 
 	return node
 
@@ -381,20 +403,20 @@ def spinePointAt(name, cnsNode, masterA, masterB, blend=.5, axis="-Z", solver=0)
 	if not cmds.pluginInfo("HarbieNodes", q=True, loaded=True):
 		cmds.loadPlugin("HarbieNodes")
 
-	spaNode = cmds.createNode("SpinePointAt", name=name.format(node="SpPtAt"))
+	spaNode = modifier.createNode("SpinePointAt", name=name.format(node="SpPtAt"))
 
-	cmds.setAttr(spaNode+".blend", blend)
-	cmds.setAttr(spaNode+".axis", POINTAT_AXIS.index(axis))
+	modifier.setAttr(spaNode+".blend", blend)
+	modifier.setAttr(spaNode+".axis", POINTAT_AXIS.index(axis))
 	# 
-	cmds.setAttr(spaNode+".alg", solver)
+	modifier.setAttr(spaNode+".alg", solver)
 
-	cmds.connectAttr(masterA+".worldMatrix[0]", spaNode+".tfmA")
-	cmds.connectAttr(masterB+".worldMatrix[0]", spaNode+".tfmB")
+	modifier.connectAttr(masterA+".worldMatrix[0]", spaNode+".tfmA")
+	modifier.connectAttr(masterB+".worldMatrix[0]", spaNode+".tfmB")
 
 	# Outputs
-	cmds.setAttr(cnsNode+".worldUpType", 3)
+	modifier.setAttr(cnsNode+".worldUpType", 3)
 
-	cmds.connectAttr(spaNode+".pointAt", cnsNode+".worldUpVector")
+	modifier.connectAttr(spaNode+".pointAt", cnsNode+".worldUpVector")
 
 	return spaNode
 
@@ -416,10 +438,10 @@ def rotationTracker(name, attr, reference, tracker):
 	if not cmds.pluginInfo("HarbieNodes", q=True, loaded=True):
 		cmds.loadPlugin("HarbieNodes")
 
-	node = cmds.createNode("RotationTracker", name=name.format(node="RotTrk"))
+	node = modifier.createNode("RotationTracker", name=name.format(node="RotTrk"))
 
-	cmds.connectAttr(reference+".worldMatrix[0]", node+".reference")
-	cmds.connectAttr(tracker+".worldMatrix[0]", node+".tracker")
+	modifier.connectAttr(reference+".worldMatrix[0]", node+".reference")
+	modifier.connectAttr(tracker+".worldMatrix[0]", node+".tracker")
 
 	# Offset
 	tMatrix = Matrix4(cmds.xform(tracker, q=True, matrix=True, worldSpace=True))
@@ -429,11 +451,11 @@ def rotationTracker(name, attr, reference, tracker):
 	x = math.degrees(er.x)
 	y = math.degrees(er.y)
 	z = math.degrees(er.z)
-	cmds.setAttr(node+".restX", x)
-	cmds.setAttr(node+".restY", y)
-	cmds.setAttr(node+".restZ", z)
+	modifier.setAttr(node+".restX", x)
+	modifier.setAttr(node+".restY", y)
+	modifier.setAttr(node+".restZ", z)
 
-	cmds.connectAttr(node+".output", attr, force=True)
+	modifier.connectAttr(node+".output", attr, force=True)
 
 	return node
 
@@ -456,13 +478,13 @@ def rotationToSlider(name, attr, rotMin=-90, rotMax=90, slideMin=0, slideMax=1):
 	if not cmds.pluginInfo("HarbieNodes", q=True, loaded=True):
 		cmds.loadPlugin("HarbieNodes")
 
-	node = cmds.createNode("RotationToSlider", name=name.format(node="RotToSld"))
+	node = modifier.createNode("RotationToSlider", name=name.format(node="RotToSld"))
 
-	cmds.connectAttr(node+".output", attr)
-	cmds.setAttr(node+".rotMin", rotMin)
-	cmds.setAttr(node+".rotMax", rotMax)
-	cmds.setAttr(node+".sliderMin", slideMin)
-	cmds.setAttr(node+".sliderMax", slideMax)
+	modifier.connectAttr(node+".output", attr)
+	modifier.setAttr(node+".rotMin", rotMin)
+	modifier.setAttr(node+".rotMax", rotMax)
+	modifier.setAttr(node+".sliderMin", slideMin)
+	modifier.setAttr(node+".sliderMax", slideMax)
 
 	return node
 
@@ -515,8 +537,8 @@ def curveConstraints(name, slave, curve, axis="xy", parametric=True, u=.5, perce
 	'''
 	shape = cmds.listRelatives(curve, shapes=True)[0]
 
-	mpNode = cmds.createNode("motionPath", name=name.format(node="MoPath"))
-	cmds.connectAttr(shape+".worldSpace[0]", mpNode+".geometryPath")
+	mpNode = modifier.createNode("motionPath", name=name.format(node="MoPath"))
+	modifier.connectAttr(shape+".worldSpace[0]", mpNode+".geometryPath")
 
 	# Maya doesn't compute the orientation properly at 1.0
 	# So we need to make it very close to 1 but not 1
@@ -534,33 +556,31 @@ def curveConstraints(name, slave, curve, axis="xy", parametric=True, u=.5, perce
 	inverseFront = axis[0] == "-"
 	inverseUp = axis[-2] == "-"
 	axis = axis.replace("-", "")
-	cmds.setAttr(mpNode+".inverseFront", inverseFront)
-	cmds.setAttr(mpNode+".frontAxis", "xyz".index(axis[0].lower()))
-	cmds.setAttr(mpNode+".inverseUp", inverseUp)
-	cmds.setAttr(mpNode+".upAxis", "xyz".index(axis[1].lower()))
-	cmds.setAttr(mpNode+".fractionMode", not parametric)
-	cmds.setAttr(mpNode+".uValue", u)
-	cmds.setAttr(mpNode+".follow", True)
-
-	pmmNode = cmds.createNode("pointMatrixMult", name=name.format(node="PtMatMul"))
-	cmds.connectAttr(slave+".parentInverseMatrix[0]", pmmNode+".inMatrix")
-	cmds.connectAttr(mpNode+".allCoordinates", pmmNode+".inPoint")
-	cmds.connectAttr(pmmNode+".output", slave+".translate")
-
-	mmNode = cmds.createNode("multMatrix", name=name.format(node="MulMat"))
-	cmds.connectAttr(mpNode+".orientMatrix", mmNode+".matrixIn[0]")
-	cmds.connectAttr(slave+".parentInverseMatrix[0]", mmNode+".matrixIn[1]")
-
-	dmNode = cmds.createNode("decomposeMatrix", name=name.format(node="DcpMat"))
-	cmds.connectAttr(mmNode+".matrixSum", dmNode+".inputMatrix")
-	cmds.connectAttr(dmNode+".outputRotate", slave+".rotate")
+	modifier.setAttr(mpNode+".inverseFront", inverseFront)
+	modifier.setAttr(mpNode+".frontAxis", "xyz".index(axis[0].lower()))
+	modifier.setAttr(mpNode+".inverseUp", inverseUp)
+	modifier.setAttr(mpNode+".upAxis", "xyz".index(axis[1].lower()))
+	modifier.setAttr(mpNode+".fractionMode", not parametric)
+	modifier.setAttr(mpNode+".uValue", u)
+	modifier.setAttr(mpNode+".follow", True)
+
+	pmmNode = modifier.createNode("pointMatrixMult", name=name.format(node="PtMatMul"))
+	modifier.connectAttr(slave+".parentInverseMatrix[0]", pmmNode+".inMatrix")
+	modifier.connectAttr(mpNode+".allCoordinates", pmmNode+".inPoint")
+	modifier.connectAttr(pmmNode+".output", slave+".translate")
+
+	mmNode = modifier.createNode("multMatrix", name=name.format(node="MulMat"))
+	modifier.connectAttr(mpNode+".orientMatrix", mmNode+".matrixIn[0]")
+	modifier.connectAttr(slave+".parentInverseMatrix[0]", mmNode+".matrixIn[1]")
+
+	dmNode = modifier.createNode("decomposeMatrix", name=name.format(node="DcpMat"))
+	modifier.connectAttr(mmNode+".matrixSum", dmNode+".inputMatrix")
+	modifier.connectAttr(dmNode+".outputRotate", slave+".rotate")
 
 	return mpNode
 
 def surfaceAttach(name, slave, surface, u=None, v=None):
 	'''	Create a surfaceAttach compound
-	
-	# TODO This can't possibly work, the variable position isn't defined
 
 	Args:
 		slave (str): Node to attach to the Surface
@@ -571,10 +591,46 @@ def surfaceAttach(name, slave, surface, u=None, v=None):
 	Returns:
 		str: The SurfaceMultiAttach node
 	'''
-	if u is None or v is None:
-		u, v = self._getClosestUV(surface, position, globalSpace=True)
+	uv = None if u is None or v is None else (u, v)
+	return surfaceAttaches(name, [slave], surface, uvs=[uv])[0]
 
-	return compounds.surfaceMultiAttach(name, [[slave]], surface, 0, [u], [v])
+def surfaceAttaches(name, slaves, surface, positions=None, uvs=None):
+	'''	Create a surfaceAttach compound for each slave
+
+	The closest UVs are all solved at once. Each slave gets its own SurfaceMultiAttach with a single UV,
+	a node sharing its u[] and v[] arrays would evaluate the whole u/v grid on every frame.
+
+	Args:
+		name (str): name of the nodes
+		slaves (list of str): Nodes to attach to the Surface
+		surface (str): Surface to drive the nodes
+		positions (list of triplet of float||None): World positions to attach. None for the positions of the slaves
+		uvs (list of pair of float||None): UV of each slave. None, or a None item, for the closest UV of its position
+
+	Returns:
+		list of str: The SurfaceMultiAttach node of each slave
+	'''
+	if "{node}" not in name:
+		name += "{node}"
+	if uvs is None:
+		uvs = [None] * len(slaves)
+
+	# The closest UVs are all solved at once
+	missing = [i for i, uv in enumerate(uvs) if uv is None]
+	if missing:
+		if positions is None:
+			positions = [cmds.xform(slaves[i], q=True, translation=True, worldSpace=True) for i in missing]
+		else:
+			positions = [positions[i] for i in missing]
+		uvs = list(uvs)
+		for i, uv in izip(missing, _getClosestUVs(surface, positions)):
+			uvs[i] = uv
+
+	nodes = []
+	for i, (slave, (u, v)) in enumerate(izip(slaves, uvs)):
+		nodeName = name if len(slaves) == 1 else name.format(node="{node}%s"%i)
+		nodes.append(surfaceMultiAttach(nodeName, [[slave]], surface, 0, [u], [v]))
+	return nodes
 
 def surfaceMultiAttach(name, slaves, surface, attach=0, uParams=None, vParams=None, evenly=False):
 	'''	Create a surfaceMultiAttach compound
@@ -606,13 +662,13 @@ def surfaceMultiAttach(name, slaves, surface, attach=0, uParams=None, vParams=No
 	# This is a custom command part of the Harbie Plugin
 	length = cmds.surfaceInfo(surface, length=True)
 
-	cmaNode = cmds.createNode("SurfaceMultiAttach", name=name.format(node="SrfMAttch"))
+	cmaNode = modifier.createNode("SurfaceMultiAttach", name=name.format(node="SrfMAttch"))
 
-	cmds.connectAttr(shape+".local", cmaNode+".surface")
-	cmds.connectAttr(surface+".worldMatrix[0]", cmaNode+".surfaceMatrix")
-	cmds.connectAttr(slaves[0][0]+".parentInverseMatrix[0]", cmaNode+".parentInverse")
-	cmds.setAttr(cmaNode+".attach", attach)
-	cmds.setAttr(cmaNode+".length", length)
+	modifier.connectAttr(shape+".local", cmaNode+".surface")
+	modifier.connectAttr(surface+".worldMatrix[0]", cmaNode+".surfaceMatrix")
+	modifier.connectAttr(slaves[0][0]+".parentInverseMatrix[0]", cmaNode+".parentInverse")
+	modifier.setAttr(cmaNode+".attach", attach)
+	modifier.setAttr(cmaNode+".length", length)
 
 	# V
 	if vParams is None:
@@ -638,18 +694,17 @@ def surfaceMultiAttach(name, slaves, surface, attach=0, uParams=None, vParams=No
 					uParams.append(step)
 
 			
-	for j, v in enumerate(vParams):
-		cmds.setAttr(cmaNode+".v[%s]"%j, v)
-	for i, u in enumerate(uParams):
-		cmds.setAttr(cmaNode+".u[%s]"%i, u)
-
+	modifier.setMultiAttr(cmaNode+".v", vParams)
+	modifier.setMultiAttr(cmaNode+".u", uParams)
 
 	for j in range(vCount):
 		for i in range(uCount):
 			index = j*uCount+i
 			slave = slaves[j][i]
-			cmds.connectAttr(cmaNode+".output[%s].translate"%index, slave+".translate")
-			cmds.connectAttr(cmaNode+".output[%s].rotate"%index, slave+".rotate")
+			modifier.connectAttr(cmaNode+".output[%s].translate"%index, slave+".translate")
+			modifier.connectAttr(cmaNode+".output[%s].rotate"%index, slave+".rotate")
+
+	return cmaNode
 
 
 def meshMultiAttach(name, slave, mesh, attach=0, index=-1, orient=False):
@@ -670,148 +725,47 @@ def meshMultiAttach(name, slave, mesh, attach=0, index=-1, orient=False):
 
 	shape = cmds.listRelatives(mesh, shapes=True, path=True)[0]
 
-	if index == -1:
-		pos = cmds.xform(slave, q=True, translation=True, worldSpace=True)
-		index = _closestComponentIndex(shape, pos, attach)
-
-	# We're not creating a new node if there is already one available using the correct attach method
-	mmaNode = _getMeshMultiAttachNode(shape, attach)
-	if mmaNode is None:
-		mmaNode = cmds.createNode("MeshMultiAttach", name=name.format(node="MshMAttch"))
-	attrIndex = _getNextAvailableIndex(mmaNode)
-
-	cmds.connectAttr(shape+".outMesh", mmaNode+".mesh", force=True)
-	cmds.connectAttr(mesh+".worldMatrix[0]", mmaNode+".meshMatrix", force=True)
-	cmds.setAttr(mmaNode+".attach", attach)
-
-	cmds.connectAttr(slave+".parentInverseMatrix[0]", mmaNode+".component[%s].parentInverse"%attrIndex)
-	cmds.setAttr(mmaNode+".component[%s].index"%attrIndex, index)
-	cmds.setAttr(mmaNode+".component[%s].orient"%attrIndex, orient)
-
-	cmds.connectAttr(mmaNode+".output[%s].translate"%attrIndex, slave+".translate")
-	if orient:
-		cmds.connectAttr(mmaNode+".output[%s].rotate"%attrIndex, slave+".rotate")
+	# The nodes are shared by mesh and attach method for the whole build
+	with pool.pooling() as meshPool:
+		return meshPool.add(name.format(node="MshMAttch"), slave, mesh, shape, attach, index, orient)
 
 # ----------------------------------------------------------------------------------
 # MISC
 # ----------------------------------------------------------------------------------
-def _getMeshMultiAttachNode(shape, attach):
-	'''	Find existing MeshMultiAttachNode if any
-
-	Args:
-		shape (str): Mesh to drive the node
-		attach (int): 0 Vertex, 1 Edge, 2 Polygon
-
-	Returns:
-		str||None: The MeshMultiAttach node if any
-	'''
-	nodes = cmds.listConnections(shape, type="MeshMultiAttach")
-	if nodes:
-		for node in nodes:
-			if cmds.getAttr(node+".attach") == attach:
-				return node
+def _getClosestUVs(surface, points, globalSpace=True):
+	'''Returns the Closest UV values on a NurbsSurface to each point
 
-def _getNextAvailableIndex(node):
-	'''	Get the next port available to attach to
+	The UV values are normalized between 0.0 and 1.0
 
 	Args:
-		node (str): MeshMultiAttach Node
-
-	Returns:
-		int: MNext available port
-	'''
-	indices = cmds.getAttr(node+".component", mi=True)
-	if indices:
-		return max(indices) + 1
-	else:
-		return 0
-
-def _closestComponentIndex(shape, position, componentType):
-	'''	Get the closest component Index to given position
-
-	Args:
-		shape (str):
-		position (triplet of float): 
-		componentType (int): 0 Vertex, 1 Edge, 2 Polygon
-
-	Return:
-		int
-	'''
-	point = om.MPoint(*position)
-	shape = cast.toMFn(shape)
-
-	util = om.MScriptUtil()
-	util.createFromInt(0)
-	idPointer = util.asIntPtr()
-
-	shape.getClosestPoint(point, om.MPoint(), om.MSpace.kObject, idPointer)
-	faceId = om.MScriptUtil(idPointer).asInt()
-	if componentType == 2: #Face
-		return faceId
-
-	elif componentType == 1: # Edge
-		faceIter = om.MItMeshPolygon(shape.object())
-		faceIter.setIndex(faceId, idPointer)
-		array = om.MIntArray()
-		faceIter.getEdges(array)
-
-		edgeIter = om.MItMeshEdge(shape.object())
-
-		length = 99999999999.999
-		edgeId = None
-		for i, currentEdgeId in enumerate(array):
-			edgeIter.setIndex(currentEdgeId, idPointer)
-			edgePoint = edgeIter.center(om.MSpace.kObject)
-			currentLenght = point.distanceTo(edgePoint)
-			if currentLenght < length:
-				length = currentLenght
-				edgeId = currentEdgeId
-		return edgeId
-
-	elif componentType == 0: # Vertex
-		faceIter = om.MItMeshPolygon(shape.object())
-		faceIter.setIndex(faceId, idPointer)
-		array = om.MIntArray()
-		faceIter.getVertices(array)
-		length = 99999999999.999
-		vertexId = None
-		for i, currentVertexId in enumerate(array):
-			vertexPoint = om.MPoint()
-			shape.getPoint(currentVertexId, vertexPoint, om.MSpace.kObject)
-			currentLenght = point.distanceTo(vertexPoint)
-			if currentLenght < length:
-				length = currentLenght
-				vertexId = currentVertexId
-		return vertexId
-
-def _getClosestUV(surface, point, globalSpace=True):
-	'''Returns the Closest UV values on a NurbsSurface to 'point'
-
-	Args:
-		surface (MDagPath): dagPath to the nurbsSurface shapeNode
-		point (MPoint): get the closest UV to this point
+		surface (str): The nurbsSurface transform
+		points (list of triplet of float): get the closest UV to these points
 		globalSpace( bool): globalSpace?
 	Returns:
-		list of float: float UV values
+		list of pair of float: float UV values
 	'''
 	if globalSpace:
 		space = om.MSpace.kWorld
 	else:
 		space = om.MSpace.kObject
 
-	point = om.MPoint(*point)
-
 	shape = cmds.listRelatives(surface, shapes=True, path=True)[0]
-	fnSurface = cast.toMFn(shape)
-
-	utilA = om.MScriptUtil()
-	utilB = om.MScriptUtil()
-
-	closestPointU = utilA.asDoublePtr()
-	closestPointV = utilB.asDoublePtr()
-
-	fnSurface.closestPoint(point, closestPointU, closestPointV, False, 1e-4, space)
-
-	closestPointU = utilA.getDouble(closestPointU)
-	closestPointV = utilB.getDouble(closestPointV)
-	return [closestPointU, closestPointV]
+	fnSurface = om.MFnNurbsSurface(cast.toMDagPath(shape))
+
+	# The pointers are created once and reused for each point
+	utils = [om.MScriptUtil() for i in range(4)]
+	pointers = [util.asDoublePtr() for util in utils]
+
+	fnSurface.getKnotDomain(*pointers)
+	startU, endU, startV, endV = [om.MScriptUtil.getDouble(pointer) for pointer in pointers]
+	rangeU = (endU - startU) or 1.0
+	rangeV = (endV - startV) or 1.0
+
+	pointerU, pointerV = pointers[:2]
+	uvs = []
+	for point in points:
+		fnSurface.closestPoint(om.MPoint(*point), pointerU, pointerV, False, 1e-4, space)
+		u = om.MScriptUtil.getDouble(pointerU)
+		v = om.MScriptUtil.getDouble(pointerV)
+		uvs.append(((u - startU) / rangeU, (v - startV) / rangeV))
+	return uvs
@@ -23,15 +23,52 @@ def selection(*args, **kwargs):
 		else:
 			cmds.select(clear=True)
 
+@contextlib.contextmanager
+def fastEdit(enabled=True):
+	'''A context that disables the undo queue, the viewport refresh and the evaluation manager
+
+	The undo queue is flushed, the edits made before and in the context can't be undone.
+	Everything is restored when exiting, even if an error is raised.
+	Inside an undoChunk, the queue can't be flushed without breaking the chunk,
+	so nothing is disabled and the edits can be undone.
+
+	Args:
+		enabled (bool): False to do nothing
+	'''
+	if enabled and undoChunk.depth:
+		logging.warning("Brigks: Fast edit is disabled inside an undo chunk")
+		enabled = False
+
+	if not enabled:
+		yield
+		return
+
+	undoState = cmds.undoInfo(q=True, state=True)
+	evaluationMode = cmds.evaluationManager(q=True, mode=True)[0]
+	cmds.undoInfo(state=False)
+	cmds.refresh(suspend=True)
+	# The parallel evaluation graph would be invalidated by every new node
+	cmds.evaluationManager(mode="off")
+	try:
+		yield
+	finally:
+		cmds.evaluationManager(mode=evaluationMode)
+		cmds.refresh(suspend=False)
+		cmds.undoInfo(state=undoState)
+
 class undoChunk(object):
 	'''A context to wrap your script in single undo chunk
 	'''
+	# Number of chunks opened
+	depth = 0
+
 	def __init__(self, name="", raise_error=True):
 		self.raise_error = raise_error
 		self.name = name
 
 	def __enter__(self):
 		cmds.undoInfo(openChunk=True, chunkName=self.name)
+		undoChunk.depth += 1
 		cmds.waitCursor(state=True)
 		cmds.refresh(suspend =True)
 
@@ -40,6 +77,7 @@ class undoChunk(object):
 		cmds.refresh(suspend =False)
 		cmds.refresh()
 		cmds.waitCursor(state=False)
+		undoChunk.depth -= 1
 		cmds.undoInfo(closeChunk=True)
 		if exc_type is not None:
 			if self.raise_error:
@@ -119,10 +119,7 @@ def convertXmlHarbie(xmlHarbie, useSymmetrySystems=False):
 
 	# Settings
 	xmlHarbieParameters = xmlHarbie.find("Parameters")
-	settings = json.loads(xmlHarbieParameters.get("value", {}))
-	if settings["stopAfter"] == "All":
-		settings["stopAfter"] = "Post Script"
-	xmlRoot.set("settings", json.dumps(settings))
+	_convertXmlSettings(xmlRoot, xmlHarbieParameters)
 
 	# Layers
 	xmlHarbieLayers = xmlHarbie.find("Layers")
@@ -132,6 +129,49 @@ def convertXmlHarbie(xmlHarbie, useSymmetrySystems=False):
 
 	return xmlRoot
 
+def convertXmlHarbieFile(path, useSymmetrySystems=False):
+	'''Convert a Harbie xml file, streaming it so only one Harbie Layer is held in memory at a time
+
+	Args:
+		path (str): Path of the Harbie xml
+		useSymmetrySystems (bool): Convert the L systems to X systems and skip the R systems
+
+	Returns:
+		etree.Element: The Brigks Guide definition
+	'''
+	xmlRoot = etree.Element("Guide")
+	xmlRoot.set("user", getpass.getuser())
+	xmlRoot.set("date", str(datetime.datetime.now()))
+
+	xmlParents = []
+	for event, xmlElement in etree.iterparse(path, events=("start", "end")):
+		if event == "start":
+			xmlParents.append(xmlElement)
+			continue
+
+		xmlParents.pop()
+		if len(xmlParents) == 1 and xmlElement.tag == "Parameters":
+			# Settings
+			_convertXmlSettings(xmlRoot, xmlElement)
+		elif len(xmlParents) == 2 and xmlParents[-1].tag == "Layers":
+			# Layers
+			xmlLayer = _convertXmlLayer(xmlElement, useSymmetrySystems)
+			xmlRoot.append(xmlLayer)
+		else:
+			continue
+
+		# Free the converted element
+		xmlElement.clear()
+		xmlParents[-1].remove(xmlElement)
+
+	return xmlRoot
+
+def _convertXmlSettings(xmlRoot, xmlHarbieParameters):
+	settings = json.loads(xmlHarbieParameters.get("value", {}))
+	if settings["stopAfter"] == "All":
+		settings["stopAfter"] = "Post Script"
+	xmlRoot.set("settings", json.dumps(settings))
+
 
 # ----------------------------------------------------------------------------------
 # LAYERS
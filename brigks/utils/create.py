@@ -10,7 +10,7 @@ from math3d.transformation import TransformationArray, Transformation
 from math3d.vectorN import Vector3
 from math3d.matrixN import Matrix4
 
-from brigks.utils import attributes, compounds, cast, skin
+from brigks.utils import attributes, compounds, cast, skin, index, plan, membership
 
 ICONS = ["arrow", "bone", "circle", "compass", "cross", "crossarrow", "cube", "cubewithpeak",
 	"cylinder", "diamond", "flower", "jaw", "null", "pyramid", "sphere", "spine", "square",
@@ -33,6 +33,10 @@ def transform(name, parent=None, matrix=None, icon=None, size=1, po=None, ro=Non
 	Returns:
 		str
 	'''
+	# Recorded to be created later with the other objects of the plan
+	if plan.active() is not None:
+		return plan.active().addTransform(name, parent, matrix, color)
+
 	node = cmds.createNode("transform", name=name)
 	if parent:
 		node = cmds.parent(node, parent)[0]
@@ -43,6 +47,8 @@ def transform(name, parent=None, matrix=None, icon=None, size=1, po=None, ro=Non
 	if matrix is not None:
 		attributes.setMatrix(node, matrix, worldSpace=True)
 
+	index.register(node)
+	membership.register(node)
 	return node
 
 def joint(name, parent=None, matrix=None, color=None, radius=1, useJointOrient=False):
@@ -93,6 +99,8 @@ def joint(name, parent=None, matrix=None, color=None, radius=1, useJointOrient=F
 		except:
 			pass
 
+	index.register(jnt)
+	membership.register(jnt)
 	return jnt
 
 def camera(name, parent=None, matrix=None, color=None, **kwargs):
@@ -165,6 +173,8 @@ def camera(name, parent=None, matrix=None, color=None, **kwargs):
 
 	attributes.setColor(camera, color)
 
+	index.register(camera)
+	membership.register(camera)
 	return camera
 
 def icon(icon, parent=None, size=1, po=None, ro=None, so=None, showCenter=False, showOrientation=False, centerScale=1.0):
@@ -184,6 +194,9 @@ def icon(icon, parent=None, size=1, po=None, ro=None, so=None, showCenter=False,
 	Returns:
 		str
 	'''
+	if plan.planned(parent) and not showCenter and not showOrientation:
+		return plan.active().setIcon(parent, icon, size, po, ro, so)
+
 	if not cmds.pluginInfo("harbieLocator.mll", q=True, loaded=True): 
 		cmds.loadPlugin("harbieLocator.mll")
 
@@ -331,6 +344,8 @@ def chain(name, parent, positions, normal=None, axis="xz", negate=False, size=1,
 	handle = cmds.rename(handle, name+"Hdl")
 	if parent:
 		handle = cmds.parent(handle, parent, absolute=True)[0]
+		index.register(handle)
+		membership.register(handle)
 
 	cmds.delete(joints.pop(-1))
 
@@ -387,6 +402,8 @@ def curve(name, points, closed=False, degree=3, parent=None, color=None):
 	
 	if parent:
 		curve = cmds.parent(curve, parent)[0]
+		index.register(curve)
+		membership.register(curve)
 
 	return curve
 
@@ -419,6 +436,8 @@ def bezier(name, parent=None, points=None, matrix=None, color=None):
 	
 	if parent:
 		crv = cmds.parent(crv, parent)[0]
+		index.register(crv)
+		membership.register(crv)
 
 	if matrix:
 		if isinstance(matrix, Transformation):
@@ -519,6 +538,8 @@ def cnsSurface(name="cnsSurface", parent=None, centers=[], closed=False, degree=
 	cmds.delete(pcrv, ncrv)
 	if parent:
 		surface = cmds.parent(surface, parent)[0]
+		index.register(surface)
+		membership.register(surface)
 
 	# cmds is not create to bind to transform, so we bind to temp joints
 	tmpJnts = []
@@ -0,0 +1,52 @@
+'''Graph Module
+
+This modules provides convinient method to sort dependency graphs
+'''
+import heapq
+from collections import defaultdict
+
+def topologicalSort(graph):
+	'''Sort the nodes of a dependency graph so each node comes after the nodes it depends on
+
+	Nodes that don't depend on each other are sorted alphabetically, so the order is always the same.
+	Dependencies that are not nodes of the graph are ignored.
+
+	Args:
+		graph (dict of set): For each node, the nodes it depends on
+
+	Returns:
+		tuple of list: The sorted nodes, and the nodes that couldn't be sorted because of a cycle
+	'''
+	dependencies = {node:set(dep for dep in deps if dep in graph and dep != node) for node, deps in graph.iteritems()}
+	dependents = defaultdict(set)
+	for node, deps in dependencies.iteritems():
+		for dep in deps:
+			dependents[dep].add(node)
+
+	ready = [node for node, deps in dependencies.iteritems() if not deps]
+	heapq.heapify(ready)
+
+	ordered = []
+	while ready:
+		node = heapq.heappop(ready)
+		ordered.append(node)
+		for dependent in dependents[node]:
+			dependencies[dependent].discard(node)
+			if not dependencies[dependent]:
+				heapq.heappush(ready, dependent)
+
+	cycles = sorted(node for node, deps in dependencies.iteritems() if deps)
+	return ordered, cycles
+
+def dependents(graph, nodes):
+	'''Returns the nodes that directly depend on the given nodes
+
+	Args:
+		graph (dict of set): For each node, the nodes it depends on
+		nodes (list of str): The nodes to search the dependents of
+
+	Returns:
+		list of str
+	'''
+	nodes = set(nodes)
+	return sorted(node for node, deps in graph.iteritems() if node not in nodes and deps & nodes)
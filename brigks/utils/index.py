@@ -0,0 +1,260 @@
+'''Index Module
+
+This modules provides a name index of the transforms under a model (the rig or the guide).
+The index is built once with a single walk of the hierarchy, and kept up to date
+by the create module while it is open, so looking up an object by name doesn't
+need to scan the whole scene anymore.
+
+	with index.indexing(builder.model(), guide.model()):
+		index.get("Ctl_L_Arm_Fk1", builder.model())
+		index.find("Rig_*", builder.model())
+
+When no index is open for the given model, the functions fall back on a cmds.ls search.
+'''
+import contextlib
+import fnmatch
+
+from maya import cmds
+import maya.OpenMaya as om
+
+_indices = {}
+
+class NodeIndex(object):
+	'''Index of the transforms under a root node, by short name
+
+	The nodes are stored as MObjectHandle, so the index stays valid when nodes are
+	reparented, and deleted or renamed nodes are dropped on lookup.
+	'''
+	def __init__(self, root):
+		'''NodeIndex Init
+
+		Args:
+			root (str): Root node of the index
+
+		Returns:
+			NodeIndex
+		'''
+		self._root = cmds.ls(root, long=True)[0]
+		self._handles = {}
+		self._attributes = {}
+		self.reload()
+
+	def root(self):
+		return self._root
+
+	def reload(self):
+		'''Walk the hierarchy under the root and index all the transforms
+		'''
+		self._handles = {}
+		self._attributes = {}
+
+		selectionList = om.MSelectionList()
+		selectionList.add(self._root)
+		rootObject = om.MObject()
+		selectionList.getDependNode(0, rootObject)
+
+		iterator = om.MItDag(om.MItDag.kDepthFirst, om.MFn.kTransform)
+		iterator.reset(rootObject, om.MItDag.kDepthFirst, om.MFn.kTransform)
+		while not iterator.isDone():
+			mobject = iterator.currentItem()
+			name = om.MFnDependencyNode(mobject).name()
+			self._handles[name] = om.MObjectHandle(mobject)
+			iterator.next()
+
+	def add(self, node):
+		'''Add a node to the index
+
+		Args:
+			node (str): The node
+		'''
+		selectionList = om.MSelectionList()
+		selectionList.add(node)
+		mobject = om.MObject()
+		selectionList.getDependNode(0, mobject)
+		name = om.MFnDependencyNode(mobject).name()
+		self._handles[name] = om.MObjectHandle(mobject)
+
+	def addAttribute(self, node, attr):
+		'''Add an attribute to the index
+
+		Args:
+			node (str): The node holding the attribute
+			attr (str): The attribute long name
+		'''
+		self._attributes[attr] = node.split("|")[-1]
+
+	def get(self, name, long=True):
+		'''Returns the node of the given name
+
+		Args:
+			name (str): Short name of the node
+			long (bool): True to return the full path, False the shortest unique path
+
+		Returns:
+			str||None
+		'''
+		handle = self._handles.get(name)
+		if handle is None:
+			return
+
+		path = self._path(handle, long)
+		if path is None or path.split("|")[-1] != name:
+			# The node has been deleted or renamed since it was indexed
+			self._handles.pop(name)
+			return
+		return path
+
+	def find(self, pattern, long=True):
+		'''Returns the nodes matching the given pattern
+
+		Args:
+			pattern (str): Short name pattern, ie: Ctl_L_Arm_*
+			long (bool): True to return the full paths, False the shortest unique paths
+
+		Returns:
+			list of str
+		'''
+		names = [name for name in self._handles if fnmatch.fnmatchcase(name, pattern)]
+		nodes = [self.get(name, long) for name in names]
+		return [node for node in nodes if node is not None]
+
+	def getAttribute(self, attr):
+		'''Returns the given attribute if it has been indexed
+
+		Args:
+			attr (str): The attribute long name
+
+		Returns:
+			str||None
+		'''
+		if attr not in self._attributes:
+			return
+		node = self.get(self._attributes[attr])
+		if node is None or not cmds.attributeQuery(attr, node=node, exists=True):
+			self._attributes.pop(attr)
+			return
+		return node+"."+attr
+
+	def _path(self, handle, long):
+		'''Private Method. Returns the path of the given handle, None if it's been deleted
+		'''
+		if not handle.isValid():
+			return
+		dagPath = om.MDagPath()
+		om.MDagPath.getAPathTo(handle.object(), dagPath)
+		return dagPath.fullPathName() if long else dagPath.partialPathName()
+
+# ----------------------------------------------------------------------------------
+# INDEXING
+# ----------------------------------------------------------------------------------
+@contextlib.contextmanager
+def indexing(*roots):
+	'''A context that keeps an index of the nodes under the given roots
+
+	Nested contexts reuse the indices already opened.
+
+	Args:
+		roots (list of str): Root nodes to index. None are ignored
+	'''
+	opened = []
+	for root in roots:
+		if not root:
+			continue
+		root = cmds.ls(root, long=True)[0]
+		if root not in _indices:
+			_indices[root] = NodeIndex(root)
+			opened.append(root)
+	try:
+		yield
+	finally:
+		for root in opened:
+			_indices.pop(root, None)
+
+def register(node):
+	'''Add a newly created node to the opened indices it belongs to
+
+	Args:
+		node (str): The node
+	'''
+	if not _indices:
+		return
+	path = cmds.ls(node, long=True)[0]
+	for root, nodeIndex in _indices.iteritems():
+		if path.startswith(root+"|"):
+			nodeIndex.add(path)
+
+def registerAttribute(node, attr):
+	'''Add a newly created attribute to the opened indices it belongs to
+
+	Args:
+		node (str): The node holding the attribute
+		attr (str): The attribute long name
+	'''
+	if not _indices:
+		return
+	path = cmds.ls(node, long=True)[0]
+	for root, nodeIndex in _indices.iteritems():
+		if path.startswith(root+"|"):
+			nodeIndex.addAttribute(path, attr)
+
+def get(name, root, long=True):
+	'''Returns the node of the given name under the given root
+
+	Args:
+		name (str): Short name of the node
+		root (str): Full path of the root node
+		long (bool): True to return the full path, False the shortest unique path
+
+	Returns:
+		str||None
+	'''
+	nodeIndex = _indices.get(root)
+	if nodeIndex is not None:
+		return nodeIndex.get(name, long)
+
+	nodes = [x for x in cmds.ls(name, type="transform", long=True) if x.startswith(root+"|")]
+	if nodes:
+		return nodes[0] if long else cmds.ls(nodes[0])[0]
+
+def find(pattern, root, long=True):
+	'''Returns the nodes matching the given pattern under the given root
+
+	Args:
+		pattern (str): Short name pattern, ie: Ctl_L_Arm_*
+		root (str): Full path of the root node
+		long (bool): True to return the full paths, False the shortest unique paths
+
+	Returns:
+		list of str
+	'''
+	nodeIndex = _indices.get(root)
+	if nodeIndex is not None:
+		return nodeIndex.find(pattern, long)
+
+	nodes = [x for x in cmds.ls(pattern, type="transform", long=True) if x.startswith(root+"|")]
+	return nodes if long or not nodes else cmds.ls(nodes)
+
+def getAttribute(attr, root):
+	'''Returns the attribute of the given name on a node under the given root
+
+	Args:
+		attr (str): The attribute long name
+		root (str): Full path of the root node
+
+	Returns:
+		str||None
+	'''
+	nodeIndex = _indices.get(root)
+	if nodeIndex is not None:
+		result = nodeIndex.getAttribute(attr)
+		if result is not None:
+			return result
+
+	# Attributes created before the index was opened
+	# Only the nodes of the root are searched, not the whole scene
+	nodes = [root] + (cmds.listRelatives(root, allDescendents=True, fullPath=True) or [])
+	attributes = cmds.ls([node+"."+attr for node in nodes], long=True)
+	if attributes:
+		if nodeIndex is not None:
+			nodeIndex.addAttribute(attributes[0].split(".")[0], attr)
+		return attributes[0]
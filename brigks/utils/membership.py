@@ -0,0 +1,204 @@
+'''Membership Module
+
+This modules keeps track of the nodes created by each system.
+Each system has a tag node, a network node with a multi message attribute connected
+to all the nodes the system created. The nodes are registered by the helpers
+when they are created, and connected to the tag at once when the recording is closed.
+
+The tags are connected to the model of the rig and hold the key of their system,
+so they are found by rig and key, never by name.
+
+	with membership.recording(builder.model(), builder.key(), "Nde_L_Arm_Members"):
+		builder.createObjects()
+	membership.getMembers(builder.model(), builder.key(), "joint")
+
+Deleting, selecting or rebuilding a system iterates its members instead of searching the scene by name.
+'''
+import contextlib
+from collections import OrderedDict
+
+from maya import cmds
+import maya.OpenMaya as om
+
+ATTRIBUTE = "brigksMembers"
+MODEL_ATTRIBUTE = "brigksModel"
+KEY_ATTRIBUTE = "brigksKey"
+
+_recorder = None
+_tags = {}
+
+class MemberRecorder(object):
+	'''Record the nodes created for a tag and connect them all at once
+	'''
+	def __init__(self, model, key, name):
+		'''MemberRecorder Init
+
+		Args:
+			model (str): The model of the rig
+			key (str): The key of the system
+			name (str): Name of the tag node, if it needs to be created on flush
+
+		Returns:
+			MemberRecorder
+		'''
+		self._model = model
+		self._key = key
+		self._name = name
+		self._handles = []
+		self._hashes = set()
+
+	def register(self, node):
+		'''Record a node
+
+		The node is stored as an MObjectHandle, so it can be renamed or reparented before the flush.
+
+		Args:
+			node (str): The node
+		'''
+		handle = om.MObjectHandle(_getObject(node))
+		if handle.hashCode() in self._hashes:
+			return
+		self._hashes.add(handle.hashCode())
+		self._handles.append(handle)
+
+	def flush(self):
+		'''Connect the recorded nodes to the tag with a single MDGModifier
+		'''
+		handles = [handle for handle in self._handles if handle.isValid()]
+		self._handles = []
+		self._hashes = set()
+		if not handles:
+			return
+
+		tag = getTag(self._model, self._key, self._name)
+		indices = cmds.getAttr(tag+"."+ATTRIBUTE, multiIndices=True) or []
+		nextIndex = max(indices) + 1 if indices else 0
+		membersPlug = om.MFnDependencyNode(_getObject(tag)).findPlug(ATTRIBUTE)
+
+		mod = om.MDGModifier()
+		for i, handle in enumerate(handles, nextIndex):
+			messagePlug = om.MFnDependencyNode(handle.object()).findPlug("message")
+			mod.connect(messagePlug, membersPlug.elementByLogicalIndex(i))
+		mod.doIt()
+
+# ----------------------------------------------------------------------------------
+# RECORDING
+# ----------------------------------------------------------------------------------
+@contextlib.contextmanager
+def recording(model, key, name):
+	'''A context that registers the nodes created to the tag of the given system
+
+	Nested recordings register to the inner tag.
+
+	Args:
+		model (str): The model of the rig
+		key (str): The key of the system
+		name (str): Name of the tag node, if it needs to be created
+	'''
+	global _recorder
+	previous = _recorder
+	recorder = MemberRecorder(model, key, name)
+	_recorder = recorder
+	try:
+		yield recorder
+	finally:
+		_recorder = previous
+		# Flushed even if the step failed, the nodes it created are still tagged and deleted on rebuild
+		recorder.flush()
+
+def active():
+	'''Returns the MemberRecorder being recorded
+
+	Returns:
+		MemberRecorder||None
+	'''
+	return _recorder
+
+def register(node):
+	'''Register a newly created node to the active recording, if any
+
+	Args:
+		node (str): The node
+	'''
+	if _recorder is not None:
+		_recorder.register(node)
+
+# ----------------------------------------------------------------------------------
+# TAGS
+# ----------------------------------------------------------------------------------
+def getTag(model, key, name=None):
+	'''Returns the tag of a system
+
+	Args:
+		model (str): The model of the rig
+		key (str): The key of the system
+		name (str||None): Name of the tag node to create if it doesn't exist. None to not create it
+
+	Returns:
+		str||None: None if the tag doesn't exist
+	'''
+	model = cmds.ls(model, long=True)[0]
+	handle = _tags.get((model, key))
+	if handle is None or not handle.isValid():
+		_tags.pop((model, key), None)
+		for node in cmds.listConnections(model+".message", type="network", source=False, destination=True) or []:
+			if cmds.attributeQuery(KEY_ATTRIBUTE, node=node, exists=True) and cmds.getAttr(node+"."+KEY_ATTRIBUTE) == key:
+				handle = om.MObjectHandle(_getObject(node))
+				_tags[(model, key)] = handle
+				break
+		else:
+			handle = None
+
+	if handle is not None:
+		return om.MFnDependencyNode(handle.object()).name()
+	if name is None:
+		return
+
+	node = cmds.createNode("network", name=name)
+	cmds.addAttr(node, longName=ATTRIBUTE, attributeType="message", multi=True)
+	cmds.addAttr(node, longName=MODEL_ATTRIBUTE, attributeType="message")
+	cmds.addAttr(node, longName=KEY_ATTRIBUTE, dataType="string")
+	cmds.connectAttr(model+".message", node+"."+MODEL_ATTRIBUTE)
+	cmds.setAttr(node+"."+KEY_ATTRIBUTE, key, type="string")
+	_tags[(model, key)] = om.MObjectHandle(_getObject(node))
+	return node
+
+def getMembers(model, key, nodeType=None):
+	'''Returns the members of the tag of a system
+
+	Args:
+		model (str): The model of the rig
+		key (str): The key of the system
+		nodeType (str||None): Only returns the members of this type. None for all the members
+
+	Returns:
+		list of str||None: The long names of the members. None if the tag doesn't exist
+	'''
+	tag = getTag(model, key)
+	if tag is None:
+		return
+
+	members = cmds.listConnections(tag+"."+ATTRIBUTE, source=True, destination=False) or []
+	if not members:
+		return []
+	if nodeType is None:
+		return list(OrderedDict.fromkeys(cmds.ls(members, long=True)))
+	return list(OrderedDict.fromkeys(cmds.ls(members, type=nodeType, long=True)))
+
+# ----------------------------------------------------------------------------------
+# PRIVATE
+# ----------------------------------------------------------------------------------
+def _getObject(node):
+	'''Private Method. Returns the MObject of the given node
+
+	Args:
+		node (str): The node
+
+	Returns:
+		om.MObject
+	'''
+	selectionList = om.MSelectionList()
+	selectionList.add(node)
+	mobject = om.MObject()
+	selectionList.getDependNode(0, mobject)
+	return mobject
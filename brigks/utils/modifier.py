@@ -0,0 +1,289 @@
+'''Modifier Module
+
+This modules provides a way to batch the connections and attribute values set by the compounds.
+While a batch is open, connectAttr and setAttr are recorded and applied all at once
+with a single MDGModifier when the batch is flushed.
+
+The nodes are still created right away, the compounds and the builders rely on their names.
+
+	with modifier.batch():
+		compounds.blendMatrix(name, slave, masters)
+
+The builders mix the compounds with direct Maya commands. While a batch is open, every command
+of maya.cmds applies the recorded edits first, so the commands query and edit the scene
+as if nothing was recorded. The edits applied by the MDGModifier can't be undone.
+'''
+import contextlib
+import logging
+from collections import OrderedDict
+from functools import wraps
+
+from maya import cmds
+import maya.OpenMaya as om
+
+from brigks.utils import membership
+
+_modifier = None
+# The original commands of maya.cmds, while a batch is open
+_commands = {}
+
+class GraphModifier(object):
+	'''Record the graph edits and apply them with a single MDGModifier
+	'''
+	def __init__(self):
+		self._nodes = []
+		self._connections = []
+		self._values = []
+
+	def nodes(self):
+		'''Returns the nodes created thru this modifier
+
+		Returns:
+			list of str
+		'''
+		return self._nodes
+
+	def createNode(self, nodeType, name):
+		'''Create a node and keep track of it
+
+		Args:
+			nodeType (str): Node type
+			name (str): Name of the node
+
+		Returns:
+			str
+		'''
+		# Creating a node doesn't need the recorded edits
+		node = _commands.get("createNode", cmds.createNode)(nodeType, name=name)
+		membership.register(node)
+		self._nodes.append(node)
+		return node
+
+	def connectAttr(self, source, destination, force=False):
+		'''Record a connection
+
+		Args:
+			source (str): Source attribute
+			destination (str): Destination attribute
+			force (bool): True to replace any existing connection of the destination
+		'''
+		self._connections.append((source, destination, force))
+
+	def setAttr(self, attr, value, attrType=None):
+		'''Record an attribute value
+
+		Args:
+			attr (str): Attribute
+			value (bool||int||float||list of float): Value of the attribute
+			attrType (None||str): None for numeric attributes, "matrix" for matrices
+		'''
+		self._values.append((attr, value, attrType))
+
+	def setMultiAttr(self, attr, values):
+		'''Record the values of the elements of a numeric multi attribute
+
+		Args:
+			attr (str): Multi attribute
+			values (list of float): Values of the elements, from index 0
+		'''
+		self._values.append((attr, list(values), "multi"))
+
+	def pending(self):
+		'''Returns True if there are recorded edits not applied yet
+
+		Returns:
+			bool
+		'''
+		return bool(self._connections or self._values)
+
+	def doIt(self):
+		'''Apply all the recorded edits in one MDGModifier and clear them
+		'''
+		if not self.pending():
+			return
+
+		mod = om.MDGModifier()
+
+		# A destination can only be connected once
+		connections = OrderedDict()
+		for source, destination, force in self._connections:
+			if destination in connections and not force:
+				logging.warning("{d} is already connected to {s}".format(d=destination, s=connections[destination][0]))
+				continue
+			connections[destination] = (source, force)
+
+		for destination, (source, force) in connections.iteritems():
+			srcPlug = _getPlug(source)
+			dstPlug = _getPlug(destination)
+			sources = om.MPlugArray()
+			dstPlug.connectedTo(sources, True, False)
+			if sources.length() and not force:
+				logging.warning("{d} is already connected to {s}".format(d=destination, s=sources[0].name()))
+				continue
+			for i in xrange(sources.length()):
+				mod.disconnect(sources[i], dstPlug)
+			mod.connect(srcPlug, dstPlug)
+
+		for attr, value, attrType in self._values:
+			if attrType == "multi":
+				# All the elements are set with a single command
+				mod.commandToExecute('setAttr "{a}[0:{n}]" {v}'.format(a=attr, n=len(value)-1, v=" ".join(str(float(x)) for x in value)))
+				continue
+
+			plug = _getPlug(attr)
+			if attrType == "matrix":
+				matrix = om.MMatrix()
+				om.MScriptUtil.createMatrixFromList(list(value), matrix)
+				data = om.MFnMatrixData().create(matrix)
+				mod.newPlugValue(plug, data)
+			elif plug.attribute().hasFn(om.MFn.kUnitAttribute):
+				# Angles, distances and times are stored in internal units, let setAttr do the conversion
+				mod.commandToExecute('setAttr "{a}" {v}'.format(a=attr, v=float(value)))
+			elif isinstance(value, bool):
+				mod.newPlugValueBool(plug, value)
+			elif isinstance(value, int):
+				mod.newPlugValueInt(plug, value)
+			else:
+				mod.newPlugValueDouble(plug, value)
+
+		# Cleared first, so an error doesn't apply the same edits again
+		self._nodes = []
+		self._connections = []
+		self._values = []
+
+		mod.doIt()
+
+# ----------------------------------------------------------------------------------
+# BATCH
+# ----------------------------------------------------------------------------------
+@contextlib.contextmanager
+def batch(enabled=True):
+	'''A context that records the graph edits and flush them when exiting
+
+	Nested batches are flushed by the outer one.
+	The commands of maya.cmds flush the recorded edits before they run, until the batch is closed.
+
+	Args:
+		enabled (bool): False to apply the edits right away
+	'''
+	global _modifier
+	if not enabled or _modifier is not None:
+		yield _modifier
+		return
+
+	_modifier = GraphModifier()
+	for name, command in vars(cmds).items():
+		if name.startswith("_") or not callable(command):
+			continue
+		_commands[name] = command
+		setattr(cmds, name, _flushing(command))
+
+	try:
+		yield _modifier
+		_modifier.doIt()
+	finally:
+		for name, command in _commands.iteritems():
+			setattr(cmds, name, command)
+		_commands.clear()
+		_modifier = None
+
+def flush():
+	'''Apply the edits recorded by the current batch, if any
+	'''
+	if _modifier is not None:
+		_modifier.doIt()
+
+def active():
+	'''Returns the GraphModifier of the current batch
+
+	Returns:
+		GraphModifier||None
+	'''
+	return _modifier
+
+def createNode(nodeType, name):
+	'''Create a node, tracked by the current batch if any
+
+	Args:
+		nodeType (str): Node type
+		name (str): Name of the node
+
+	Returns:
+		str
+	'''
+	if _modifier is None:
+		node = cmds.createNode(nodeType, name=name)
+		membership.register(node)
+		return node
+	return _modifier.createNode(nodeType, name)
+
+def connectAttr(source, destination, force=False):
+	'''Connect two attributes, or record the connection if a batch is open
+
+	Args:
+		source (str): Source attribute
+		destination (str): Destination attribute
+		force (bool): True to replace any existing connection of the destination
+	'''
+	if _modifier is None:
+		cmds.connectAttr(source, destination, force=force)
+	else:
+		_modifier.connectAttr(source, destination, force)
+
+def setAttr(attr, value, attrType=None):
+	'''Set an attribute value, or record it if a batch is open
+
+	Args:
+		attr (str): Attribute
+		value (bool||int||float||list of float): Value of the attribute
+		attrType (None||str): None for numeric attributes, "matrix" for matrices
+	'''
+	if _modifier is None:
+		if attrType is None:
+			cmds.setAttr(attr, value)
+		else:
+			cmds.setAttr(attr, value, type=attrType)
+	else:
+		_modifier.setAttr(attr, value, attrType)
+
+def setMultiAttr(attr, values):
+	'''Set the values of the elements of a numeric multi attribute at once, or record them if a batch is open
+
+	Args:
+		attr (str): Multi attribute
+		values (list of float): Values of the elements, from index 0
+	'''
+	if not values:
+		return
+	if _modifier is None:
+		cmds.setAttr("{a}[0:{n}]".format(a=attr, n=len(values)-1), *values)
+	else:
+		_modifier.setMultiAttr(attr, values)
+
+# ----------------------------------------------------------------------------------
+# PRIVATE
+# ----------------------------------------------------------------------------------
+def _flushing(command):
+	'''Private Method. Wrap a Maya command to apply the recorded edits before it runs
+	'''
+	@wraps(command)
+	def wrapper(*args, **kwargs):
+		if _modifier is not None:
+			_modifier.doIt()
+		return command(*args, **kwargs)
+	return wrapper
+
+def _getPlug(attr):
+	'''Private Method. Returns the MPlug of the given attribute
+
+	Args:
+		attr (str): Attribute
+
+	Returns:
+		om.MPlug
+	'''
+	selectionList = om.MSelectionList()
+	selectionList.add(attr)
+	plug = om.MPlug()
+	selectionList.getPlug(0, plug)
+	return plug
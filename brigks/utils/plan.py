@@ -0,0 +1,361 @@
+'''Plan Module
+
+This modules provides a declarative description of the objects created by the builders.
+While a plan is open, the transforms, their icons, keyables and rotation orders
+are recorded instead of being created, and the names are returned as if they were.
+The plan is plain data, so it can be hashed, compared and saved, and is applied
+all at once when the plan is closed, or later with apply().
+
+	with plan.planning() as buildPlan:
+		builder.createObjects()
+
+Only the builders whose createObjects solely use the helpers can be planned (See SystemBuilder.declarative).
+'''
+import contextlib
+import json
+import hashlib
+from collections import OrderedDict
+
+from maya import cmds
+import maya.OpenMaya as om
+
+from math3d.transformation import Transformation
+from math3d.matrixN import Matrix4
+
+from brigks.utils import constants
+
+_plan = None
+
+class BuildPlan(object):
+	'''Record the objects to create and create them in bulk
+	'''
+	def __init__(self, data=None):
+		'''BuildPlan Init
+
+		Args:
+			data (dict||None): Data returned by BuildPlan.data() to initialize the plan with
+
+		Returns:
+			BuildPlan
+		'''
+		self._nodes = OrderedDict()
+		if data:
+			for node in data["nodes"]:
+				self._nodes[node["name"]] = node
+
+	def __contains__(self, name):
+		return name in self._nodes
+
+	def nodes(self):
+		'''Returns the names of the nodes of the plan, parents first
+
+		Returns:
+			list of str
+		'''
+		return self._nodes.keys()
+
+	def data(self):
+		'''Returns the plan as plain data
+
+		Returns:
+			dict
+		'''
+		return dict(nodes=self._nodes.values())
+
+	def hash(self):
+		'''Returns a hash of the plan
+
+		Returns:
+			str
+		'''
+		return hashlib.md5(json.dumps(self.data(), sort_keys=True)).hexdigest()
+
+	# ----------------------------------------------------------------------------------
+	# RECORD
+	# ----------------------------------------------------------------------------------
+	def addTransform(self, name, parent=None, matrix=None, color=None):
+		'''Record a transform node
+
+		Args:
+			name (str): Name of the node
+			parent (str): Parent node
+			matrix (math3d.Transformation||math3d.Matrix4||list of float): The world transformation
+			color (triplet of float): Color of the shape
+
+		Returns:
+			str
+		'''
+		if isinstance(matrix, Transformation):
+			matrix = matrix.asMatrix().flattened()
+		elif isinstance(matrix, Matrix4):
+			matrix = matrix.flattened()
+
+		self._nodes[name] = dict(name=name,
+								type="transform",
+								parent=parent or None,
+								matrix=[float(v) for v in matrix] if matrix is not None else None,
+								color=list(color) if color is not None and not isinstance(color, int) else color,
+								icon=None,
+								keyables=None,
+								lock=True,
+								rotOrder=None)
+		return name
+
+	def setIcon(self, name, icon, size=1, po=None, ro=None, so=None):
+		'''Record the icon of a node
+
+		Args:
+			name (str): Name of the node
+			icon (str): Type of nurbscurve shape
+			size (float): Size of the shape
+			po (triplet of float): Position offset of the shape
+			ro (triplet of float): Rotation offset of the shape
+			so (triplet of float): Scale offset of the shape
+
+		Returns:
+			str: The name of the shape
+		'''
+		self._nodes[name]["icon"] = dict(icon=icon, size=size,
+			po=list(po) if po else None, ro=list(ro) if ro else None, so=list(so) if so else None)
+		return name+"Shape"
+
+	def setKeyables(self, name, attrs, lock=True):
+		'''Record the keyable attributes of a node
+
+		Args:
+			name (str): Name of the node
+			attrs (list of str||None): The transform attributes to make keyable. None for all
+			lock (bool): True to lock the non keyable attributes
+		'''
+		self._nodes[name]["keyables"] = list(attrs if attrs is not None else constants.ATTRS_TRS)
+		self._nodes[name]["lock"] = lock
+
+	def setRotOrder(self, name, rotOrder):
+		'''Record the rotation order of a node
+
+		Args:
+			name (str): Name of the node
+			rotOrder (str): rotation order ["xyz", "yzx", "zxy", "xzy", "yxz", "zyx"]
+		'''
+		self._nodes[name]["rotOrder"] = rotOrder.lower()
+
+	def nodeHashes(self):
+		'''Returns a hash of each node of the plan
+
+		Returns:
+			dict: The hash by node name
+		'''
+		return {name:hashlib.md5(json.dumps(node, sort_keys=True)).hexdigest() for name, node in self._nodes.iteritems()}
+
+	# ----------------------------------------------------------------------------------
+	# APPLY
+	# ----------------------------------------------------------------------------------
+	def apply(self):
+		'''Create all the nodes of the plan
+
+		The transforms are created and parented with a single MDagModifier and their
+		local matrices are computed from the plan, so the scene is not queried for each node.
+
+		Returns:
+			list of str: The created nodes
+		'''
+		return self.reconcile()
+
+	def reconcile(self, existing=None, previous=None, orphanParent=None):
+		'''Create, update and delete the nodes so the scene matches the plan
+
+		Existing nodes that are in the plan are kept, with their external connections.
+		They are only updated if their hash changed since the plan was last applied.
+
+		Args:
+			existing (list of str||None): The nodes already in the scene that the plan replaces
+			previous (dict||None): The hash of each node when the plan was last applied (See nodeHashes)
+			orphanParent (str||None): Where to move the children of the deleted nodes that are not deleted
+
+		Returns:
+			list of str: The created and updated nodes
+		'''
+		# Imported here, these modules are recording to the plan
+		from brigks.utils import attributes, create, index, membership
+
+		existing = {node.split("|")[-1]:cmds.ls(node, long=True)[0] for node in existing or []}
+		previous = previous or {}
+		hashes = self.nodeHashes()
+
+		toCreate = [name for name in self._nodes if name not in existing]
+
+		# The hashes store the world matrices, so the children of a changed node are updated too
+		# even if their own hash didn't change, their local matrix has to be set again
+		changed = set(toCreate)
+		toUpdate = []
+		for name, node in self._nodes.iteritems():
+			if name in existing and (previous.get(name) != hashes[name] or node["parent"] in changed):
+				toUpdate.append(name)
+				changed.add(name)
+		toDelete = [path for name, path in existing.iteritems() if name not in self._nodes]
+
+		# Nodes
+		mod = om.MDagModifier()
+		mobjects = {}
+		for name in toCreate:
+			parentObject = self._parentObject(name, mobjects, existing)
+			mobjects[name] = mod.createNode("transform", parentObject)
+			mod.renameNode(mobjects[name], name)
+		for name in toUpdate:
+			mobjects[name] = _getDagPath(existing[name]).node()
+			parentObject = self._parentObject(name, mobjects, existing)
+			currentParent = om.MFnDagNode(mobjects[name]).parent(0)
+			if parentObject.isNull() or currentParent != parentObject:
+				mod.reparentNode(mobjects[name], parentObject)
+		mod.doIt()
+
+		# Matrices
+		worlds = {}
+		for name, node in self._nodes.iteritems():
+			parent = node["parent"]
+			if parent in worlds:
+				parentWorld = worlds[parent]
+			elif parent:
+				parentWorld = _getDagPath(existing.get(parent, parent)).inclusiveMatrix()
+			else:
+				parentWorld = om.MMatrix()
+
+			if node["matrix"] is None:
+				worlds[name] = parentWorld
+				world = parentWorld
+			else:
+				world = om.MMatrix()
+				om.MScriptUtil.createMatrixFromList(node["matrix"], world)
+				worlds[name] = world
+
+			if name not in mobjects:
+				continue
+
+			if name in existing:
+				for attrName in constants.ATTRS_TRS:
+					cmds.setAttr(existing[name]+"."+attrName, lock=False)
+
+			tfm = om.MTransformationMatrix(world * parentWorld.inverse())
+			if node["rotOrder"]:
+				# MTransformationMatrix.RotationOrder starts with kInvalid
+				tfm.reorderRotation(constants.ROT_ORDERS.index(node["rotOrder"])+1)
+			om.MFnTransform(mobjects[name]).set(tfm)
+
+		# Shapes and Attributes
+		nodes = []
+		for name in toUpdate + toCreate:
+			node = self._nodes[name]
+			path = om.MDagPath()
+			om.MDagPath.getAPathTo(mobjects[name], path)
+			path = path.fullPathName()
+			nodes.append(path)
+
+			if name in existing:
+				# The icons are created again
+				shapes = cmds.listRelatives(path, shapes=True, path=True) or []
+				history = cmds.listConnections(shapes, source=True, destination=False, type="makeHarbieCurve") or []
+				if shapes:
+					cmds.delete(shapes + history)
+			else:
+				index.register(path)
+				membership.register(path)
+
+			attributes.setColor(path, node["color"])
+			if node["icon"]:
+				icon = node["icon"]
+				create.icon(icon["icon"], path, icon["size"], icon["po"], icon["ro"], icon["so"])
+			if node["keyables"] is not None:
+				attributes.setKeyables(path, node["keyables"], node["lock"])
+
+		# Removed nodes
+		if toDelete:
+			children = cmds.listRelatives(toDelete, children=True, type="transform", path=True)
+			children = [x for x in cmds.ls(children, long=True) if x not in toDelete]
+			children = [x for x in children if x.split("|")[-1] not in self._nodes]
+			if children and orphanParent:
+				cmds.parent(children, orphanParent)
+			cmds.delete(toDelete)
+
+		return nodes
+
+	def _parentObject(self, name, mobjects, existing):
+		'''Private Method. Returns the MObject of the parent of the given node
+
+		Args:
+			name (str): Name of the node
+			mobjects (dict): The MObject of the nodes created or updated, by name
+			existing (dict): The path of the existing nodes, by name
+
+		Returns:
+			om.MObject
+		'''
+		parent = self._nodes[name]["parent"]
+		if parent in mobjects:
+			return mobjects[parent]
+		elif parent:
+			return _getDagPath(existing.get(parent, parent)).node()
+		return om.MObject.kNullObj
+
+# ----------------------------------------------------------------------------------
+# PLANNING
+# ----------------------------------------------------------------------------------
+@contextlib.contextmanager
+def planning(apply=True):
+	'''A context that records the objects created by the helpers in a BuildPlan
+
+	Nested plans are recorded in the outer one.
+
+	Args:
+		apply (bool): True to create the objects when exiting. False to only return the plan
+	'''
+	global _plan
+	if _plan is not None:
+		yield _plan
+		return
+
+	_plan = BuildPlan()
+	try:
+		buildPlan = _plan
+		yield buildPlan
+	finally:
+		_plan = None
+
+	if apply:
+		buildPlan.apply()
+
+def active():
+	'''Returns the BuildPlan being recorded
+
+	Returns:
+		BuildPlan||None
+	'''
+	return _plan
+
+def planned(node):
+	'''Returns True if the node is recorded in the active plan
+
+	Args:
+		node (str): The node
+
+	Returns:
+		bool
+	'''
+	return _plan is not None and node in _plan
+
+# ----------------------------------------------------------------------------------
+# PRIVATE
+# ----------------------------------------------------------------------------------
+def _getDagPath(node):
+	'''Private Method. Returns the MDagPath of the given node
+
+	Args:
+		node (str): The node
+
+	Returns:
+		om.MDagPath
+	'''
+	selectionList = om.MSelectionList()
+	selectionList.add(node)
+	dagPath = om.MDagPath()
+	selectionList.getDagPath(0, dagPath)
+	return dagPath
@@ -0,0 +1,151 @@
+'''Pool Module
+
+This modules provides a pool of the MeshMultiAttach nodes, shared by all the systems of a build.
+There is one node per mesh and attach type. The existing node and its used component indices
+are queried once, then the component indices are given in memory.
+
+	with pool.pooling():
+		compounds.meshMultiAttach(name, slave, mesh, attach=1)
+
+The components are connected right away, so the slaves are driven as soon as they are attached.
+When no pool is open, meshMultiAttach opens one for the call.
+'''
+import contextlib
+
+from maya import cmds
+import maya.OpenMaya as om
+
+from brigks.utils import modifier, spatial
+
+_pool = None
+
+class MeshAttachPool(object):
+	'''Share the MeshMultiAttach nodes and give their component indices in memory
+	'''
+	def __init__(self):
+		# The node, its MObjectHandle and its next component index by (shape, attach)
+		self._nodes = {}
+
+	def add(self, name, slave, mesh, shape, attach=0, index=-1, orient=False):
+		'''Attach a slave to a component of the mesh
+
+		Args:
+			name (str): Name of the node, if a new one is created
+			slave (str): Node to attach to the mesh
+			mesh (str): Mesh to drive the node
+			shape (str): Shape of the mesh
+			attach (int): 0 Vertex, 1 Edge, 2 Polygon
+			index (int): -1 to use the closest component to the slave
+			orient (bool): True to compute orientation from component normal/tangent (slower)
+
+		Returns:
+			str: The MeshMultiAttach node
+		'''
+		key = (cmds.ls(shape, long=True)[0], attach)
+		data = self._nodes.get(key)
+		if data is None or not data["handle"].isValid():
+			data = self._getNode(key, name, mesh, shape, attach)
+			self._nodes[key] = data
+
+		if index == -1:
+			position = cmds.xform(slave, q=True, translation=True, worldSpace=True)
+			index = spatial.closestComponent(shape, position, attach)
+
+		node = data["node"]
+		attrIndex = data["nextIndex"]
+		data["nextIndex"] += 1
+
+		# Connected right away, the callers read the transform of the slave once it's attached
+		cmds.connectAttr(slave+".parentInverseMatrix[0]", node+".component[%s].parentInverse"%attrIndex)
+		cmds.setAttr(node+".component[%s].index"%attrIndex, index)
+		cmds.setAttr(node+".component[%s].orient"%attrIndex, orient)
+
+		cmds.connectAttr(node+".output[%s].translate"%attrIndex, slave+".translate")
+		if orient:
+			cmds.connectAttr(node+".output[%s].rotate"%attrIndex, slave+".rotate")
+
+		return node
+
+	def _getNode(self, key, name, mesh, shape, attach):
+		'''Private Method. Returns the node of the given mesh and attach method, created if needed
+
+		Returns:
+			dict: The node, its MObjectHandle and its next component index
+		'''
+		# We're not creating a new node if there is already one available using the correct attach method
+		node = _getMeshMultiAttachNode(shape, attach)
+		if node is None:
+			node = modifier.createNode("MeshMultiAttach", name)
+
+		cmds.connectAttr(shape+".outMesh", node+".mesh", force=True)
+		cmds.connectAttr(mesh+".worldMatrix[0]", node+".meshMatrix", force=True)
+		cmds.setAttr(node+".attach", attach)
+
+		selectionList = om.MSelectionList()
+		selectionList.add(node)
+		mobject = om.MObject()
+		selectionList.getDependNode(0, mobject)
+
+		return dict(node=node, handle=om.MObjectHandle(mobject), nextIndex=_getNextAvailableIndex(node))
+
+# ----------------------------------------------------------------------------------
+# POOLING
+# ----------------------------------------------------------------------------------
+@contextlib.contextmanager
+def pooling():
+	'''A context that shares the MeshMultiAttach nodes until it's closed
+
+	Nested pools reuse the outer one.
+	'''
+	global _pool
+	if _pool is not None:
+		yield _pool
+		return
+
+	_pool = MeshAttachPool()
+	try:
+		yield _pool
+	finally:
+		_pool = None
+
+def active():
+	'''Returns the MeshAttachPool opened
+
+	Returns:
+		MeshAttachPool||None
+	'''
+	return _pool
+
+# ----------------------------------------------------------------------------------
+# PRIVATE
+# ----------------------------------------------------------------------------------
+def _getMeshMultiAttachNode(shape, attach):
+	'''	Find existing MeshMultiAttachNode if any
+
+	Args:
+		shape (str): Mesh to drive the node
+		attach (int): 0 Vertex, 1 Edge, 2 Polygon
+
+	Returns:
+		str||None: The MeshMultiAttach node if any
+	'''
+	nodes = cmds.listConnections(shape, type="MeshMultiAttach")
+	if nodes:
+		for node in nodes:
+			if cmds.getAttr(node+".attach") == attach:
+				return node
+
+def _getNextAvailableIndex(node):
+	'''	Get the next port available to attach to
+
+	Args:
+		node (str): MeshMultiAttach Node
+
+	Returns:
+		int: MNext available port
+	'''
+	indices = cmds.getAttr(node+".component", mi=True)
+	if indices:
+		return max(indices) + 1
+	else:
+		return 0
@@ -0,0 +1,153 @@
+'''Precompute Module
+
+This modules provides a way to run the transformation math of the builders in a pool of processes,
+before the objects are created in Maya.
+
+The settings and the marker matrices of each system are copied in a plain snapshot.
+The builders reimplementing SystemBuilder.computeTransforms are given a SnapshotGuide, which offers
+the same accessors as the builder (settings, translations, directions...), so the same code runs
+in the workers or in Maya.
+
+	results = precompute.compute(builders, workers=4)
+
+The workers are started with mayapy, they only use math3d and never initialize Maya.
+'''
+import multiprocessing
+
+from math3d.matrixN import Matrix4
+from math3d.vectorN import Vector3, Vector3Array
+from math3d.transformation import TransformationArray
+
+from brigks.systems import getSystemBuilderClass
+from brigks.systems.systemBuilder import SystemBuilder
+from brigks.utils import processes
+
+class SnapshotGuide(object):
+	'''Gives access to the settings and markers of a system snapshot (See SystemBuilder.snapshot)
+	'''
+	def __init__(self, snapshot):
+		'''SnapshotGuide Init
+
+		Args:
+			snapshot (dict): The settings, marker matrices and multi markers parts of the system
+
+		Returns:
+			SnapshotGuide
+		'''
+		self._settings = snapshot["settings"]
+		self._matrices = snapshot["markers"]
+		self._multi = snapshot["multi"]
+		self._transforms = {}
+
+	def settings(self, key=None):
+		return self._settings if key is None else self._settings[key]
+
+	def negate(self):
+		return self._settings["location"] == "R"
+
+	def sign(self):
+		return "-" if self.negate() else ""
+
+	def nsign(self):
+		return "" if self.negate() else "-"
+
+	def factor(self):
+		return -1 if self.negate() else 1
+
+	def count(self, part):
+		if part not in self._multi:
+			raise RuntimeError("Can't count single Markers")
+		return len(self._multi[part])
+
+	def transforms(self, name=None):
+		if name is None:
+			return {part:self._transform(part) for part in self._matrices}
+		elif name in self._multi:
+			return TransformationArray([self._transform(part) for part in self._multi[name]])
+		else:
+			return self._transform(name)
+
+	def translations(self, name=None):
+		if name is None:
+			return {part:self._row(part, 3) for part in self._matrices}
+		elif name in self._multi:
+			return Vector3Array([self._row(part, 3) for part in self._multi[name]])
+		else:
+			return self._row(name, 3)
+
+	def directions(self, name=None, axis="x"):
+		row = "xyz".index(axis)
+		if name is None:
+			return {part:self._row(part, row) for part in self._matrices}
+		elif name in self._multi:
+			return Vector3Array([self._row(part, row) for part in self._multi[name]])
+		else:
+			return self._row(name, row)
+
+	def _transform(self, part):
+		'''Private Method. Returns the transformation of a marker, without scaling
+		'''
+		if part not in self._transforms:
+			tfm = Matrix4(self._matrices[part]).asTransform()
+			tfm.scale = Vector3([1,1,1])
+			self._transforms[part] = tfm
+		return self._transforms[part]
+
+	def _row(self, part, row):
+		'''Private Method. Returns a row of the matrix of a marker as a Vector3
+		'''
+		return Vector3(self._matrices[part][row*4:row*4+3])
+
+# ----------------------------------------------------------------------------------
+# COMPUTE
+# ----------------------------------------------------------------------------------
+def compute(builders, workers=None):
+	'''Compute the transformations of the given builders in a pool of processes
+
+	Only the builders reimplementing computeTransforms are computed, if not already read from the cache.
+
+	Args:
+		builders (list of SystemBuilder): The builders
+		workers (int||None): Number of processes. None for the number of cores. 1 to compute in this process
+
+	Returns:
+		dict: The result of computeTransforms, by system key
+	'''
+	jobs = [(builder.key(), builder.type(), builder.guide.version(), builder.snapshot())
+			for builder in builders if builder.precomputed is None and precomputable(builder)]
+	if not jobs:
+		return {}
+
+	workers = min(workers or multiprocessing.cpu_count(), len(jobs))
+	if workers < 2:
+		return dict(_compute(job) for job in jobs)
+
+	processes.setExecutable()
+	pool = multiprocessing.Pool(workers)
+	try:
+		results = pool.map(_compute, jobs, chunksize=max(1, len(jobs) // (workers * 4)))
+	finally:
+		pool.close()
+		pool.join()
+	return dict(results)
+
+def precomputable(builder):
+	'''Returns True if the builder reimplements computeTransforms
+
+	Args:
+		builder (SystemBuilder): The builder
+
+	Returns:
+		bool
+	'''
+	return builder.computeTransforms.im_func is not SystemBuilder.computeTransforms.im_func
+
+# ----------------------------------------------------------------------------------
+# PRIVATE
+# ----------------------------------------------------------------------------------
+def _compute(job):
+	'''Private Method. Runs computeTransforms for a job of compute(). This runs in the workers
+	'''
+	key, systemType, version, snapshot = job
+	BuilderClass = getSystemBuilderClass(systemType, version)
+	return key, BuilderClass.computeTransforms(SnapshotGuide(snapshot))
@@ -0,0 +1,23 @@
+'''Processes Module
+
+This modules provides helpers for the pools of processes started from Maya
+(See brigks.utils.precompute and brigks.utils.service)
+'''
+import os
+import sys
+import multiprocessing
+
+_executableSet = False
+
+def setExecutable():
+	'''Makes sure the child processes are started with mayapy and not with the Maya UI
+	'''
+	global _executableSet
+	if _executableSet:
+		return
+
+	folder, name = os.path.split(sys.executable)
+	baseName, ext = os.path.splitext(name)
+	if baseName.lower() == "maya":
+		multiprocessing.set_executable(os.path.join(folder, "mayapy"+ext))
+	_executableSet = True
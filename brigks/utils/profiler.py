@@ -0,0 +1,161 @@
+'''Profiler Module
+
+This modules provides a Profiler to record the time, the number of Maya commands
+and the number of nodes created by each step of a build.
+The commands are counted by wrapping maya.cmds, and the nodes by a node added callback,
+so the nodes created with the API are counted too.
+
+	profiler = Profiler()
+	with profiler.record("Create Objects", key="Arm_L", systemType="arm"):
+		builder.stepObjects()
+	profiler.write(path)
+'''
+import contextlib
+import csv
+import json
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from maya import cmds
+import maya.OpenMaya as om
+
+FIELDS = ["key", "type", "step", "time", "commands", "nodes"]
+
+class Profiler(object):
+	'''Record the cost of each step of a build
+	'''
+	def __init__(self, enabled=True):
+		'''Profiler Init
+
+		Args:
+			enabled (bool): False to ignore all the records
+
+		Returns:
+			Profiler
+		'''
+		self._enabled = enabled
+		self._records = []
+		self._commands = 0
+		self._nodes = 0
+		self._original = {}
+		self._callback = None
+
+	def enabled(self):
+		'''Returns False if the records are ignored
+
+		Returns:
+			bool
+		'''
+		return self._enabled
+
+	def start(self):
+		'''Start counting the Maya commands and the nodes created
+
+		Every command of the maya.cmds module is wrapped, until stop is called
+		'''
+		if not self._enabled or self._original:
+			return
+
+		self._callback = om.MDGMessage.addNodeAddedCallback(self._nodeAdded)
+
+		for name, command in vars(cmds).items():
+			if name.startswith("_") or not callable(command):
+				continue
+			self._original[name] = command
+			setattr(cmds, name, self._counted(command))
+
+	def stop(self):
+		'''Stop counting the Maya commands and the nodes created, and restore the maya.cmds module
+		'''
+		if self._callback is not None:
+			om.MMessage.removeCallback(self._callback)
+			self._callback = None
+
+		for name, command in self._original.iteritems():
+			setattr(cmds, name, command)
+		self._original = {}
+
+	@contextlib.contextmanager
+	def record(self, step, key=None, systemType=None):
+		'''A context recording the time, commands and nodes created in the given step
+
+		Args:
+			step (str): Name of the step
+			key (str||None): Key of the system
+			systemType (str||None): Type of the system
+		'''
+		if not self._enabled:
+			yield
+			return
+
+		nodes = self._nodes
+		commands = self._commands
+		start = time.time()
+		try:
+			yield
+		finally:
+			record = OrderedDict()
+			record["key"] = key
+			record["type"] = systemType
+			record["step"] = step
+			record["time"] = time.time() - start
+			record["commands"] = self._commands - commands
+			record["nodes"] = self._nodes - nodes
+			self._records.append(record)
+
+	def records(self):
+		'''Returns all the records
+
+		Returns:
+			list of dict
+		'''
+		return self._records
+
+	def summary(self, field="type"):
+		'''Returns the records summed by system type, key or step
+
+		Args:
+			field (str): "type", "key" or "step"
+
+		Returns:
+			dict of dict
+		'''
+		summary = OrderedDict()
+		for record in self._records:
+			total = summary.setdefault(record[field], dict(time=0, commands=0, nodes=0))
+			for k in total:
+				total[k] += record[k]
+		return summary
+
+	def write(self, path):
+		'''Write the records to a json or csv file
+
+		Args:
+			path (str): Output path. The extension defines the format (.json or .csv)
+		'''
+		if path.lower().endswith(".csv"):
+			with open(path, "wb") as f:
+				writer = csv.DictWriter(f, FIELDS)
+				writer.writeheader()
+				writer.writerows(self._records)
+		else:
+			data = dict(records=self._records,
+						types=self.summary("type"),
+						steps=self.summary("step"))
+			with open(path, "w") as f:
+				json.dump(data, f, indent=4)
+
+	def _counted(self, command):
+		'''Private Method. Wrap a Maya command to count its calls
+		'''
+		@wraps(command)
+		def wrapper(*args, **kwargs):
+			self._commands += 1
+			return command(*args, **kwargs)
+		return wrapper
+
+	def _nodeAdded(self, node, clientData):
+		'''Private Method. Node added callback, counts the nodes created
+		'''
+		self._nodes += 1
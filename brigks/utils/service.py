@@ -0,0 +1,358 @@
+'''Service Module
+
+This modules provides a local build service for batch builds.
+A pool of mayapy processes is started once and kept warm, so the jobs don't pay
+the startup of Maya and the import of brigks and math3d each time.
+The jobs are sent over a local socket and run concurrently, one per worker.
+
+	# Server, in mayapy
+	from brigks.utils import service
+	buildService = service.BuildService(workers=4)
+	buildService.serve()
+
+	# Client, in any python
+	client = service.BuildClient()
+	jobId = client.build(r"C:/guides/harbie.xml", r"C:/rigs/harbie.ma")
+	print client.result(jobId)["timings"]
+	client.stop()
+
+The function run by the workers and their initializer are given by their import path,
+so the service can be used with a stand-in of maya.cmds, ie: for tests.
+'''
+import time
+import os
+import uuid
+import threading
+import logging
+import multiprocessing
+from multiprocessing.connection import Listener, Client
+
+from brigks.utils import processes
+
+ADDRESS = ("localhost", 6100)
+AUTHKEY = "brigks"
+
+RUNNER = "brigks.utils.service.buildJob"
+INITIALIZER = "brigks.utils.service.initMaya"
+
+class BuildService(object):
+	'''Pool of warm workers building guides to scenes
+	'''
+	def __init__(self, workers=None, address=ADDRESS, authkey=AUTHKEY, runner=RUNNER, initializer=INITIALIZER):
+		'''BuildService Init
+
+		Args:
+			workers (int||None): Number of processes. None for the number of cores
+			address (tuple of str, int): Host and port of the socket
+			authkey (str): Key the clients must use to connect
+			runner (str): Import path of the function running a job. Called with the guide path and the scene path
+			initializer (str||None): Import path of the function initializing each worker
+
+		Returns:
+			BuildService
+		'''
+		self._workers = workers or multiprocessing.cpu_count()
+		self._address = address
+		self._authkey = authkey
+		self._runner = runner
+		self._initializer = initializer
+
+		self._pool = None
+		self._jobs = {}
+		self._lock = threading.Lock()
+		self._stopped = threading.Event()
+
+	def start(self):
+		'''Start the workers. They are started once and reused for all the jobs
+		'''
+		if self._pool is not None:
+			return
+
+		processes.setExecutable()
+		self._pool = multiprocessing.Pool(self._workers, _initWorker, (self._initializer,))
+
+	def stop(self):
+		'''Stop the workers, once the submitted jobs are done
+		'''
+		self._stopped.set()
+		if self._pool is None:
+			return
+		self._pool.close()
+		self._pool.join()
+		self._pool = None
+
+	# ----------------------------------------------------------------------------------
+	# JOBS
+	# ----------------------------------------------------------------------------------
+	def submit(self, guidePath, scenePath):
+		'''Queue a build
+
+		Args:
+			guidePath (str): Path of the guide xml file
+			scenePath (str): Path of the scene to save the rig to
+
+		Returns:
+			str: The id of the job
+		'''
+		self.start()
+		jobId = uuid.uuid4().hex
+		asyncResult = self._pool.apply_async(_runJob, (self._runner, guidePath, scenePath))
+		with self._lock:
+			self._jobs[jobId] = dict(result=asyncResult, submitted=time.time(), guide=guidePath, scene=scenePath)
+		return jobId
+
+	def result(self, jobId, timeout=None):
+		'''Returns the result of a job, waiting for it if needed
+
+		Args:
+			jobId (str): The id of the job returned by submit()
+			timeout (float||None): Maximum time to wait in seconds. None to wait for the job to finish
+
+		Returns:
+			dict||None: The status, error and timings of the job. None if it's still running
+		'''
+		with self._lock:
+			if jobId not in self._jobs:
+				raise KeyError("Unknown job {}".format(jobId))
+			job = self._jobs[jobId]
+
+		job["result"].wait(timeout)
+		if not job["result"].ready():
+			return
+
+		with self._lock:
+			self._jobs.pop(jobId, None)
+
+		result = job["result"].get()
+		result["guide"] = job["guide"]
+		result["scene"] = job["scene"]
+		# Time spent in the queue, waiting for a free worker
+		result["timings"]["wait"] = result["started"] - job["submitted"]
+		result["timings"]["total"] = result["finished"] - job["submitted"]
+		return result
+
+	def pending(self):
+		'''Returns the ids of the jobs not collected yet
+
+		Returns:
+			list of str
+		'''
+		with self._lock:
+			return self._jobs.keys()
+
+	# ----------------------------------------------------------------------------------
+	# SERVE
+	# ----------------------------------------------------------------------------------
+	def serve(self):
+		'''Start the workers and answer the clients until one of them stops the service
+		'''
+		self.start()
+		self._stopped.clear()
+		listener = Listener(self._address, authkey=self._authkey)
+		logging.info("Brigks: Build service listening on {}:{}".format(*self._address))
+		try:
+			while not self._stopped.is_set():
+				connection = listener.accept()
+				thread = threading.Thread(target=self._handle, args=(connection,))
+				thread.daemon = True
+				thread.start()
+		finally:
+			listener.close()
+			self.stop()
+
+	def _handle(self, connection):
+		'''Private Method. Answers the requests of a client. This runs in its own thread
+
+		Args:
+			connection (multiprocessing.connection.Connection): Connection to the client
+		'''
+		try:
+			while True:
+				try:
+					request = connection.recv()
+				except EOFError:
+					break
+
+				action = request.get("action")
+				try:
+					if action == "build":
+						reply = dict(jobId=self.submit(request["guide"], request["scene"]))
+					elif action == "result":
+						reply = dict(result=self.result(request["jobId"], request.get("timeout")))
+					elif action == "pending":
+						reply = dict(jobs=self.pending())
+					elif action == "stop":
+						reply = dict(stopped=True)
+					else:
+						raise ValueError("Unknown action {}".format(action))
+				except Exception as e:
+					reply = dict(error=str(e))
+				connection.send(reply)
+
+				if action == "stop":
+					self._stopped.set()
+					# Wakes up the listener, so serve() can return
+					self._wakeUp()
+					break
+		finally:
+			connection.close()
+
+	def _wakeUp(self):
+		'''Private Method. Connects to the listener so it stops waiting for a client
+		'''
+		try:
+			Client(self._address, authkey=self._authkey).close()
+		except Exception:
+			pass
+
+class BuildClient(object):
+	'''Sends the builds to a BuildService
+	'''
+	def __init__(self, address=ADDRESS, authkey=AUTHKEY):
+		'''BuildClient Init
+
+		Args:
+			address (tuple of str, int): Host and port of the service
+			authkey (str): Key of the service
+
+		Returns:
+			BuildClient
+		'''
+		self._connection = Client(address, authkey=authkey)
+
+	def build(self, guidePath, scenePath):
+		'''Queue a build
+
+		Args:
+			guidePath (str): Path of the guide xml file
+			scenePath (str): Path of the scene to save the rig to
+
+		Returns:
+			str: The id of the job
+		'''
+		return self._request(action="build", guide=guidePath, scene=scenePath)["jobId"]
+
+	def result(self, jobId, timeout=None):
+		'''Returns the result of a job, waiting for it if needed
+
+		Args:
+			jobId (str): The id of the job returned by build()
+			timeout (float||None): Maximum time to wait in seconds. None to wait for the job to finish
+
+		Returns:
+			dict||None: The status, error and timings of the job. None if it's still running
+		'''
+		return self._request(action="result", jobId=jobId, timeout=timeout)["result"]
+
+	def pending(self):
+		'''Returns the ids of the jobs not collected yet
+
+		Returns:
+			list of str
+		'''
+		return self._request(action="pending")["jobs"]
+
+	def stop(self):
+		'''Stop the service, once the submitted jobs are done
+		'''
+		self._request(action="stop")
+		self.close()
+
+	def close(self):
+		self._connection.close()
+
+	def _request(self, **request):
+		'''Private Method. Sends a request and returns the reply
+
+		Returns:
+			dict
+		'''
+		self._connection.send(request)
+		reply = self._connection.recv()
+		if "error" in reply:
+			raise RuntimeError(reply["error"])
+		return reply
+
+# ----------------------------------------------------------------------------------
+# WORKERS
+# ----------------------------------------------------------------------------------
+def initMaya():
+	'''Initialize Maya and import brigks in the worker, once
+	'''
+	import maya.standalone
+	maya.standalone.initialize()
+
+	import brigks
+
+def buildJob(guidePath, scenePath):
+	'''Build a guide xml file and save the rig in a new scene
+
+	Args:
+		guidePath (str): Path of the guide xml file
+		scenePath (str): Path of the scene to save the rig to
+
+	Returns:
+		dict: The timings of the stages of the job
+	'''
+	from maya import cmds
+	from brigks import Guide
+
+	timings = {}
+
+	start = time.time()
+	cmds.file(new=True, force=True)
+	timings["new"] = time.time() - start
+
+	start = time.time()
+	guide = Guide.fromXml(guidePath)
+	timings["load"] = time.time() - start
+
+	start = time.time()
+	guide.build()
+	timings["build"] = time.time() - start
+
+	start = time.time()
+	ext = os.path.splitext(scenePath)[1].lower()
+	cmds.file(rename=scenePath)
+	cmds.file(save=True, force=True, type="mayaBinary" if ext == ".mb" else "mayaAscii")
+	timings["save"] = time.time() - start
+
+	return timings
+
+# ----------------------------------------------------------------------------------
+# PRIVATE
+# ----------------------------------------------------------------------------------
+def _importFunction(path):
+	'''Private Method. Returns the function of the given import path
+
+	Args:
+		path (str): ie: "brigks.utils.service.buildJob"
+
+	Returns:
+		function
+	'''
+	moduleName, functionName = path.rsplit(".", 1)
+	module = __import__(moduleName, globals(), locals(), [functionName], -1)
+	return getattr(module, functionName)
+
+def _initWorker(initializer):
+	'''Private Method. Runs the initializer of the service. This runs in the workers
+	'''
+	if initializer:
+		_importFunction(initializer)()
+
+def _runJob(runner, guidePath, scenePath):
+	'''Private Method. Runs a job and catches its error. This runs in the workers
+
+	Returns:
+		dict
+	'''
+	result = dict(pid=os.getpid(), started=time.time(), status="done", error=None, timings={})
+	try:
+		result["timings"] = _importFunction(runner)(guidePath, scenePath) or {}
+	except Exception as e:
+		logging.exception("Brigks: Build of {} failed".format(guidePath))
+		result["status"] = "failed"
+		result["error"] = "{}: {}".format(type(e).__name__, e)
+	result["finished"] = time.time()
+	return result
@@ -0,0 +1,211 @@
+'''Spatial Module
+
+This modules provides a spatial index of the meshes, to find the closest component to a position.
+The index of a mesh is built once, with an MMeshIntersector for the closest face and the
+world positions of the vertices and the vertices and edges of each face.
+It is kept for the whole build while a context is open, so the attach connections
+to the same body mesh don't query the mesh again.
+
+	with spatial.indexing():
+		spatial.closestComponents(shape, positions, componentType=1)
+
+When no context is open, the index of the mesh is built for each query.
+'''
+import contextlib
+
+import maya.OpenMaya as om
+
+from brigks.utils import cast
+
+VERTEX = 0
+EDGE = 1
+POLYGON = 2
+
+_indices = None
+
+class MeshIndex(object):
+	'''Spatial index of the components of a mesh, in world space
+	'''
+	def __init__(self, shape):
+		'''MeshIndex Init
+
+		Args:
+			shape (str): The mesh shape
+
+		Returns:
+			MeshIndex
+		'''
+		self._dagPath = cast.toMDagPath(shape)
+		self._handle = om.MObjectHandle(self._dagPath.node())
+		self._fnMesh = om.MFnMesh(self._dagPath)
+
+		self._intersector = om.MMeshIntersector()
+		self._intersector.create(self._dagPath.node(), self._dagPath.inclusiveMatrix())
+
+		self._points = om.MPointArray()
+		self._fnMesh.getPoints(self._points, om.MSpace.kWorld)
+		self._vertexCount = self._points.length()
+
+		# Read on first use, the vertex attach doesn't need the edges
+		self._faceVertices = None
+		self._faceEdges = None
+		self._edgeCenters = None
+
+	def isValid(self):
+		'''Returns False if the mesh has been deleted or its topology changed since it was indexed
+
+		Returns:
+			bool
+		'''
+		return self._handle.isValid() and self._fnMesh.numVertices() == self._vertexCount
+
+	def closestFace(self, position):
+		'''Returns the index of the closest face to the given position
+
+		Args:
+			position (triplet of float): World position
+
+		Returns:
+			int
+		'''
+		pointOnMesh = om.MPointOnMesh()
+		self._intersector.getClosestPoint(om.MPoint(*position), pointOnMesh)
+		return pointOnMesh.faceIndex()
+
+	def closest(self, positions, componentType):
+		'''Returns the index of the closest component to each of the given positions
+
+		Args:
+			positions (list of triplet of float): World positions
+			componentType (int): 0 Vertex, 1 Edge, 2 Polygon
+
+		Returns:
+			list of int
+		'''
+		indices = []
+		for position in positions:
+			faceId = self.closestFace(position)
+			if componentType == POLYGON:
+				indices.append(faceId)
+				continue
+
+			point = om.MPoint(*position)
+			if componentType == EDGE:
+				candidates = self._getFaceEdges()[faceId]
+				centers = self._getEdgeCenters()
+			else:
+				candidates = self._getFaceVertices()[faceId]
+				centers = self._points
+
+			indices.append(min(candidates, key=lambda i: point.distanceTo(centers[i])))
+		return indices
+
+	def _getFaceVertices(self):
+		'''Private Method. Returns the vertices of each face
+		'''
+		if self._faceVertices is None:
+			counts = om.MIntArray()
+			vertices = om.MIntArray()
+			self._fnMesh.getVertices(counts, vertices)
+
+			self._faceVertices = []
+			offset = 0
+			for count in counts:
+				self._faceVertices.append([vertices[offset+i] for i in xrange(count)])
+				offset += count
+		return self._faceVertices
+
+	def _getFaceEdges(self):
+		'''Private Method. Returns the edges of each face
+		'''
+		if self._faceEdges is None:
+			self._faceEdges = []
+			edges = om.MIntArray()
+			faceIter = om.MItMeshPolygon(self._dagPath)
+			while not faceIter.isDone():
+				faceIter.getEdges(edges)
+				self._faceEdges.append(list(edges))
+				faceIter.next()
+		return self._faceEdges
+
+	def _getEdgeCenters(self):
+		'''Private Method. Returns the world position of the center of each edge
+		'''
+		if self._edgeCenters is None:
+			self._edgeCenters = om.MPointArray()
+			self._edgeCenters.setLength(self._fnMesh.numEdges())
+
+			util = om.MScriptUtil()
+			util.createFromList([0, 0], 2)
+			vertices = util.asInt2Ptr()
+			for edgeId in xrange(self._fnMesh.numEdges()):
+				self._fnMesh.getEdgeVertices(edgeId, vertices)
+				a = self._points[om.MScriptUtil.getInt2ArrayItem(vertices, 0, 0)]
+				b = self._points[om.MScriptUtil.getInt2ArrayItem(vertices, 0, 1)]
+				self._edgeCenters.set(om.MPoint((a.x+b.x)*.5, (a.y+b.y)*.5, (a.z+b.z)*.5), edgeId)
+		return self._edgeCenters
+
+# ----------------------------------------------------------------------------------
+# INDEXING
+# ----------------------------------------------------------------------------------
+@contextlib.contextmanager
+def indexing():
+	'''A context that keeps the index of the meshes queried until it's closed
+
+	Nested contexts reuse the indices already built.
+	'''
+	global _indices
+	if _indices is not None:
+		yield
+		return
+
+	_indices = {}
+	try:
+		yield
+	finally:
+		_indices = None
+
+def getIndex(shape):
+	'''Returns the index of the given mesh, built once while a context is open
+
+	Args:
+		shape (str): The mesh shape
+
+	Returns:
+		MeshIndex
+	'''
+	if _indices is None:
+		return MeshIndex(shape)
+
+	path = cast.toMDagPath(shape).fullPathName()
+	meshIndex = _indices.get(path)
+	if meshIndex is None or not meshIndex.isValid():
+		meshIndex = MeshIndex(path)
+		_indices[path] = meshIndex
+	return meshIndex
+
+def closestComponent(shape, position, componentType):
+	'''Returns the index of the closest component to the given position
+
+	Args:
+		shape (str): The mesh shape
+		position (triplet of float): World position
+		componentType (int): 0 Vertex, 1 Edge, 2 Polygon
+
+	Returns:
+		int
+	'''
+	return getIndex(shape).closest([position], componentType)[0]
+
+def closestComponents(shape, positions, componentType):
+	'''Returns the index of the closest component to each of the given positions
+
+	Args:
+		shape (str): The mesh shape
+		positions (list of triplet of float): World positions
+		componentType (int): 0 Vertex, 1 Edge, 2 Polygon
+
+	Returns:
+		list of int
+	'''
+	return getIndex(shape).closest(positions, componentType)
@@ -1,8 +1,14 @@
 from copy import copy
+from itertools import izip
 
 from math3d.transformation import Transformation, TransformationArray
-from math3d.vectorN import Vector3
+from math3d.vectorN import Vector3, Vector3Array
 
+# NumPy is optional, the batched methods fall back on math3d when it's not available
+try:
+	import numpy
+except ImportError:
+	numpy = None
 
 
 def createTransform(t=None, r=None, s=None):
@@ -35,4 +41,104 @@ def upVector(posA, posB, normal, ratio, negate=False):
 
 	pos += posA.lerp(posB, ratio)
 
-	return pos 
\ No newline at end of file
+	return pos 
+
+# ----------------------------------------------------------------------------------
+# BATCHED
+# ----------------------------------------------------------------------------------
+def distances(positions):
+	'''Return the distance between each consecutive positions of a chain
+
+	Args:
+		positions (math3d.Vector3Array): 
+
+	Returns:
+		list of float
+	'''
+	if numpy is not None:
+		points = numpy.asarray(positions, dtype=float)
+		return numpy.sqrt(((points[1:] - points[:-1]) ** 2).sum(axis=1)).tolist()
+	return [Vector3.distance(a, b) for a, b in izip(positions[:-1], positions[1:])]
+
+def distancesTo(position, positions):
+	'''Return the distance between a position and each given positions
+
+	Args:
+		position (math3d.Vector3): 
+		positions (math3d.Vector3Array): 
+
+	Returns:
+		list of float
+	'''
+	if numpy is not None:
+		points = numpy.asarray(positions, dtype=float) - numpy.asarray(position, dtype=float)
+		return numpy.sqrt((points ** 2).sum(axis=1)).tolist()
+	return [position.distance(p) for p in positions]
+
+def lerp(positionsA, positionsB, ratio):
+	'''Return the linear interpolation between two sets of positions
+
+	Args:
+		positionsA (math3d.Vector3Array): 
+		positionsB (math3d.Vector3Array): 
+		ratio (float||list of float): One ratio for all the positions or one per position
+
+	Returns:
+		math3d.Vector3Array
+	'''
+	ratios = ratio if isinstance(ratio, (list, tuple)) else [ratio] * len(positionsA)
+	if numpy is not None:
+		a = numpy.asarray(positionsA, dtype=float)
+		b = numpy.asarray(positionsB, dtype=float)
+		r = numpy.asarray(ratios, dtype=float).reshape(-1, 1)
+		return Vector3Array((a + (b - a) * r).tolist())
+	return Vector3Array([a.lerp(b, r) for a, b, r in izip(positionsA, positionsB, ratios)])
+
+def mirror(positions):
+	'''Return the positions mirrored on the YZ plane
+
+	Args:
+		positions (math3d.Vector3Array): 
+
+	Returns:
+		math3d.Vector3Array
+	'''
+	if numpy is not None:
+		points = numpy.array(positions, dtype=float)
+		points[:, 0] *= -1
+		return Vector3Array(points.tolist())
+	return Vector3Array([[-p[0], p[1], p[2]] for p in positions])
+
+def upVectors(positionsA, positionsB, normal, ratio, negate=False):
+	'''Return the position of the Upvector for each segment of a chain
+
+	Batched version of upVector()
+
+	Args:
+		positionsA (math3d.Vector3Array): Start of each segment
+		positionsB (math3d.Vector3Array): End of each segment
+		normal (math3d.Vector3||list of math3d.Vector3): One normal for all the segments or one per segment
+		ratio (float||list of float): One ratio for all the segments or one per segment
+		negate (bool): Position for negative side
+
+	Returns:
+		math3d.Vector3Array
+	'''
+	count = len(positionsA)
+	normals = [normal] * count if isinstance(normal, Vector3) else normal
+	ratios = ratio if isinstance(ratio, (list, tuple)) else [ratio] * count
+	if numpy is None:
+		return Vector3Array([upVector(a, b, n, r, negate) for a, b, n, r in izip(positionsA, positionsB, normals, ratios)])
+
+	a = numpy.asarray(positionsA, dtype=float)
+	b = numpy.asarray(positionsB, dtype=float)
+	n = numpy.asarray(normals, dtype=float) * (-1 if negate else 1)
+	r = numpy.asarray(ratios, dtype=float).reshape(-1, 1)
+
+	segments = b - a
+	lengths = numpy.sqrt((segments ** 2).sum(axis=1)).reshape(-1, 1)
+	pos = numpy.cross(n, segments)
+	pos /= numpy.sqrt((pos ** 2).sum(axis=1)).reshape(-1, 1)
+	pos *= lengths
+	pos += a + segments * r
+	return Vector3Array(pos.tolist())